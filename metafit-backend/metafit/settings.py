@@ -75,6 +75,47 @@ DATABASES = {
     }
 }
 
+# Connection pool for raw SQL (nutrition.database, users.views)
+# Django keeps no persistent MySQL connections of its own, so every request
+# would otherwise pay a fresh TCP + auth handshake.
+DB_POOL = {
+    'ENABLED': config('DB_POOL_ENABLED', default=True, cast=bool),
+    'MAX_SIZE': config('DB_POOL_MAX_SIZE', default=10, cast=int),
+    'MIN_IDLE': config('DB_POOL_MIN_IDLE', default=1, cast=int),
+    'IDLE_TIMEOUT': config('DB_POOL_IDLE_TIMEOUT', default=300, cast=int),  # seconds
+    'CHECKOUT_TIMEOUT': config('DB_POOL_CHECKOUT_TIMEOUT', default=5, cast=int),  # seconds
+    'HEALTH_CHECK_INTERVAL': config('DB_POOL_HEALTH_CHECK_INTERVAL', default=30, cast=int),  # seconds
+}
+
+# Process-local food catalog cache (nutrition.database.FoodDatabase)
+# Workers compare their copy against the shared foodcatalogversion row,
+# which create/update/delete_food bump.
+FOOD_CATALOG_CACHE = {
+    'VERSION_CHECK_INTERVAL': config('FOOD_CATALOG_VERSION_CHECK_INTERVAL', default=1.0, cast=float),  # seconds
+    'MAX_SEARCH_ENTRIES': config('FOOD_CATALOG_MAX_SEARCH_ENTRIES', default=512, cast=int),
+}
+
+# Meal plan generation (nutrition.views.MealPlanGeneratorView)
+# Generation runs inside the request, so every plan gets a time budget;
+# once it runs out the generator returns the best plan found so far.
+# With the process pool on, generation is CPU-bound work handed to worker
+# processes (one pool per server process, catalog preloaded in each worker)
+# instead of holding the GIL in the request thread.
+MEAL_PLAN_GENERATION = {
+    'DEFAULT_DEADLINE_MS': config('MEAL_PLAN_DEFAULT_DEADLINE_MS', default=5000, cast=int),
+    'MAX_DEADLINE_MS': config('MEAL_PLAN_MAX_DEADLINE_MS', default=30000, cast=int),
+    'PROCESS_POOL_ENABLED': config('MEAL_PLAN_PROCESS_POOL_ENABLED', default=True, cast=bool),
+    'PROCESS_POOL_WORKERS': config('MEAL_PLAN_PROCESS_POOL_WORKERS', default=0, cast=int),  # 0 = one per CPU
+    'PROCESS_POOL_START_METHOD': config('MEAL_PLAN_PROCESS_POOL_START_METHOD', default='spawn'),
+    'PROCESS_POOL_TIMEOUT_GRACE_MS': config('MEAL_PLAN_PROCESS_POOL_TIMEOUT_GRACE_MS', default=5000, cast=int),
+    # Finished plans kept per process for identical requests (0 disables)
+    'RESULT_CACHE_SIZE': config('MEAL_PLAN_RESULT_CACHE_SIZE', default=256, cast=int),
+    # Asynchronous jobs (meal-plans/jobs/), run by `manage.py run_meal_plan_worker`
+    'JOB_POLL_INTERVAL': config('MEAL_PLAN_JOB_POLL_INTERVAL', default=1.0, cast=float),  # seconds
+    'JOB_STALE_AFTER_SECONDS': config('MEAL_PLAN_JOB_STALE_AFTER_SECONDS', default=600, cast=int),
+    'JOB_MAX_ATTEMPTS': config('MEAL_PLAN_JOB_MAX_ATTEMPTS', default=3, cast=int),
+}
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
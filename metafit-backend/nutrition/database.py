@@ -1,9 +1,17 @@
 # nutrition/database.py
 
-from django.db import connection
+from django.conf import settings
 from typing import List, Dict, Optional, Any
-from datetime import datetime, date
+from collections import OrderedDict
+from datetime import datetime, date, timedelta
+import json
 import logging
+import re
+import threading
+import time
+
+from .db_pool import get_cursor, atomic
+from .utils import local_day_bounds, encode_cursor, decode_cursor
 
 logger = logging.getLogger(__name__)
 
@@ -15,7 +23,7 @@ class DatabaseManager:
     def execute_query(query: str, params: tuple = None, fetch_one: bool = False) -> Optional[Any]:
         """Execute SELECT query and return results"""
         try:
-            with connection.cursor() as cursor:
+            with get_cursor() as cursor:
                 cursor.execute(query, params or ())
                 
                 if fetch_one:
@@ -39,7 +47,7 @@ class DatabaseManager:
     def execute_update(query: str, params: tuple = None) -> int:
         """Execute INSERT, UPDATE, DELETE and return affected rows"""
         try:
-            with connection.cursor() as cursor:
+            with get_cursor() as cursor:
                 cursor.execute(query, params or ())
                 return cursor.rowcount
         except Exception as e:
@@ -50,17 +58,194 @@ class DatabaseManager:
     def execute_insert(query: str, params: tuple = None) -> int:
         """Execute INSERT and return last inserted ID"""
         try:
-            with connection.cursor() as cursor:
+            with get_cursor() as cursor:
                 cursor.execute(query, params or ())
                 return cursor.lastrowid
         except Exception as e:
             logger.error(f"Insert execution error: {e}")
             raise
+    
+    @staticmethod
+    def execute_many(query: str, params_list: List[tuple]) -> Optional[int]:
+        """
+        Execute a single-row INSERT template as one multi-row INSERT in a transaction.
+        
+        The query must end in one VALUES (...) row; it is repeated once per params tuple.
+        Returns the ID generated for the first row (InnoDB assigns consecutive IDs to the
+        rows of a single multi-row INSERT), or None when params_list is empty.
+        """
+        if not params_list:
+            return None
+        
+        head, sep, row_template = query.rpartition('VALUES')
+        if not sep:
+            raise ValueError("execute_many requires an INSERT ... VALUES (...) query")
+        row_template = row_template.strip()
+        
+        multi_row_query = f"{head}VALUES " + ", ".join([row_template] * len(params_list))
+        params = tuple(value for row in params_list for value in row)
+        
+        try:
+            with atomic():
+                with get_cursor() as cursor:
+                    cursor.execute(multi_row_query, params)
+                    return cursor.lastrowid
+        except Exception as e:
+            logger.error(f"Batch insert execution error: {e}")
+            raise
+
+
+class FoodCatalog:
+    """
+    Read-only snapshot of the allfood table at one catalog version.
+    
+    Rows are kept as tuples in CATALOG_COLUMNS order, sorted by FoodName,
+    with an id -> position index; dicts are only built when requested.
+    Values derived from the rows (see derived) live as long as the snapshot.
+    """
+    
+    CATALOG_COLUMNS = (
+        'FoodID', 'FoodName', 'BrandName', 'Unit', 'Quantity',
+        'Calories', 'Carbs', 'Protein', 'Fat', 'Sugar', 'Fiber', 'CreatedAt'
+    )
+    
+    def __init__(self, version: int, rows: List[tuple]):
+        self.version = version
+        self.rows = rows
+        self.positions = {row[0]: i for i, row in enumerate(rows)}
+        self._derived = {}
+        self._derived_lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        return len(self.rows)
+    
+    def get(self, food_id: int) -> Optional[Dict]:
+        """Get one food as a dict, or None if it is not in the catalog"""
+        position = self.positions.get(food_id)
+        if position is None:
+            return None
+        return dict(zip(self.CATALOG_COLUMNS, self.rows[position]))
+    
+    def foods(self, limit: int = None, offset: int = 0) -> List[Dict]:
+        """Get foods ordered by FoodName as dicts (same shape as get_all_foods)"""
+        end = None if limit is None else offset + limit
+        return [dict(zip(self.CATALOG_COLUMNS, row)) for row in self.rows[offset:end]]
+    
+    def derived(self, key: str, build) -> Any:
+        """
+        Get a value computed from this snapshot, building it with build(catalog)
+        on first use; later calls (from any thread) share the same object
+        """
+        with self._derived_lock:
+            if key not in self._derived:
+                self._derived[key] = build(self)
+            return self._derived[key]
 
 
 class FoodDatabase(DatabaseManager):
     """Database operations for allfood table"""
     
+    # Process-local catalog cache, refreshed when foodcatalogversion changes
+    _catalog = None
+    _catalog_version = None
+    _version_checked_at = 0.0
+    _search_cache = OrderedDict()
+    _cache_lock = threading.Lock()
+    
+    # Must match the server's ngram_token_size used by ft_allfood_name_brand
+    NGRAM_TOKEN_SIZE = 2
+    
+    @staticmethod
+    def _fulltext_query(search: str) -> Optional[str]:
+        """
+        Build a BOOLEAN MODE query requiring every search word as an ngram phrase,
+        which matches words anywhere inside FoodName/BrandName like LIKE '%word%'.
+        Returns None when no word is long enough for the ngram index.
+        """
+        words = [
+            word for word in re.findall(r'\w+', search or '')
+            if len(word) >= FoodDatabase.NGRAM_TOKEN_SIZE
+        ]
+        if not words:
+            return None
+        return ' '.join(f'+"{word}"' for word in words)
+    
+    @staticmethod
+    def _prefix_pattern(search: str) -> str:
+        """LIKE pattern matching names that start with search (index-friendly)"""
+        escaped = search.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        return f"{escaped}%"
+    
+    @staticmethod
+    def _search_filter(search: str) -> tuple:
+        """
+        WHERE fragment and params for a name/brand search.
+        Uses the FULLTEXT ngram index; searches too short for it fall back to
+        a FoodName prefix match served by idx_allfood_name_id.
+        """
+        boolean_query = FoodDatabase._fulltext_query(search)
+        if boolean_query is None:
+            return "FoodName LIKE %s", [FoodDatabase._prefix_pattern(search.strip())]
+        return "MATCH(FoodName, BrandName) AGAINST (%s IN BOOLEAN MODE)", [boolean_query]
+    
+    @staticmethod
+    def get_catalog_version() -> int:
+        """
+        Current catalog version shared by all workers.
+        Re-read from the database at most every VERSION_CHECK_INTERVAL seconds.
+        """
+        interval = settings.FOOD_CATALOG_CACHE.get('VERSION_CHECK_INTERVAL', 1.0)
+        now = time.monotonic()
+        
+        if FoodDatabase._catalog_version is None or now - FoodDatabase._version_checked_at >= interval:
+            row = DatabaseManager.execute_query(
+                "SELECT Version FROM foodcatalogversion WHERE ID = 1", fetch_one=True
+            )
+            FoodDatabase._catalog_version = row['Version'] if row else 0
+            FoodDatabase._version_checked_at = now
+        
+        return FoodDatabase._catalog_version
+    
+    @staticmethod
+    def get_catalog() -> FoodCatalog:
+        """Get the cached catalog snapshot, reloading it if the version has moved on"""
+        version = FoodDatabase.get_catalog_version()
+        catalog = FoodDatabase._catalog
+        if catalog is not None and catalog.version == version:
+            return catalog
+        
+        with FoodDatabase._cache_lock:
+            catalog = FoodDatabase._catalog
+            if catalog is None or catalog.version != version:
+                columns = ', '.join(FoodCatalog.CATALOG_COLUMNS)
+                with get_cursor() as cursor:
+                    cursor.execute(f"SELECT {columns} FROM allfood ORDER BY FoodName")
+                    rows = [tuple(row) for row in cursor.fetchall()]
+                
+                catalog = FoodCatalog(version, rows)
+                FoodDatabase._catalog = catalog
+                FoodDatabase._search_cache = OrderedDict()
+                logger.info(f"Loaded food catalog version {version} ({len(rows)} foods)")
+        
+        return catalog
+    
+    @staticmethod
+    def get_cached_food(food_id: int) -> Optional[Dict]:
+        """Get food by ID from the catalog cache"""
+        return FoodDatabase.get_catalog().get(food_id)
+    
+    @staticmethod
+    def _bump_catalog_version():
+        """Advance the shared catalog version (call inside the write transaction)"""
+        DatabaseManager.execute_update(
+            "UPDATE foodcatalogversion SET Version = Version + 1 WHERE ID = 1"
+        )
+    
+    @staticmethod
+    def _expire_catalog_version():
+        """Force the next cache access in this process to re-read the version"""
+        FoodDatabase._catalog_version = None
+    
     @staticmethod
     def get_all_foods(search: str = None, limit: int = 100, offset: int = 0) -> List[Dict]:
         """Get all foods with optional search"""
@@ -72,15 +257,68 @@ class FoodDatabase(DatabaseManager):
         
         params = []
         if search:
-            query += " WHERE FoodName LIKE %s OR BrandName LIKE %s"
-            search_param = f"%{search}%"
-            params.extend([search_param, search_param])
+            search_sql, search_params = FoodDatabase._search_filter(search)
+            query += f" WHERE {search_sql}"
+            params.extend(search_params)
         
         query += " ORDER BY FoodName LIMIT %s OFFSET %s"
         params.extend([limit, offset])
         
         return DatabaseManager.execute_query(query, tuple(params))
     
+    @staticmethod
+    def get_foods_page(search: str = None, limit: int = 100, cursor: str = None) -> tuple:
+        """
+        Get one page of foods ordered by (FoodName, FoodID) using keyset pagination.
+        
+        Every page is a range scan on idx_allfood_name_id starting after the cursor,
+        so deep pages cost the same as the first one.
+        
+        Returns:
+            (foods, next_cursor) - next_cursor is None on the last page
+        
+        Raises:
+            ValueError: If the cursor is malformed or limit is below 1
+        """
+        if limit < 1:
+            raise ValueError("limit must be at least 1")
+        
+        query = """
+            SELECT FoodID, FoodName, BrandName, Unit, Quantity,
+                   Calories, Carbs, Protein, Fat, Sugar, Fiber, CreatedAt
+            FROM allfood
+            WHERE 1 = 1
+        """
+        
+        params = []
+        if search:
+            search_sql, search_params = FoodDatabase._search_filter(search)
+            query += f" AND {search_sql}"
+            params.extend(search_params)
+        
+        if cursor:
+            values = decode_cursor(cursor)
+            if (len(values) != 2 or not isinstance(values[0], str)
+                    or not isinstance(values[1], int) or isinstance(values[1], bool)):
+                raise ValueError("Invalid cursor")
+            last_name, last_id = values
+            query += " AND (FoodName > %s OR (FoodName = %s AND FoodID > %s))"
+            params.extend([last_name, last_name, last_id])
+        
+        # Fetch one extra row to know whether another page exists
+        query += " ORDER BY FoodName, FoodID LIMIT %s"
+        params.append(limit + 1)
+        
+        foods = DatabaseManager.execute_query(query, tuple(params))
+        
+        next_cursor = None
+        if len(foods) > limit:
+            foods = foods[:limit]
+            last = foods[-1]
+            next_cursor = encode_cursor([last['FoodName'], last['FoodID']])
+        
+        return foods, next_cursor
+    
     @staticmethod
     def get_food_by_id(food_id: int) -> Optional[Dict]:
         """Get food by ID"""
@@ -112,11 +350,20 @@ class FoodDatabase(DatabaseManager):
             data.get('Sugar', 0),
             data.get('Fiber', 0),
         )
-        return DatabaseManager.execute_insert(query, params)
+        with atomic():
+            food_id = DatabaseManager.execute_insert(query, params)
+            FoodDatabase._bump_catalog_version()
+        FoodDatabase._expire_catalog_version()
+        return food_id
     
     @staticmethod
     def update_food(food_id: int, data: Dict) -> int:
-        """Update food entry"""
+        """
+        Update food entry
+        
+        Logged nutrition is computed from the food row, so the rollup rows of
+        every day with logs of this food are re-derived in the same transaction.
+        """
         query = """
             UPDATE allfood
             SET FoodName = %s, BrandName = %s, Unit = %s, Quantity = %s,
@@ -136,32 +383,206 @@ class FoodDatabase(DatabaseManager):
             data.get('Fiber', 0),
             food_id
         )
-        return DatabaseManager.execute_update(query, params)
+        with atomic():
+            DailyNutritionSummaryDatabase.apply_logs("ufl.FoodID = %s", (food_id,), sign=-1)
+            rows_affected = DatabaseManager.execute_update(query, params)
+            DailyNutritionSummaryDatabase.apply_logs("ufl.FoodID = %s", (food_id,))
+            FoodDatabase._bump_catalog_version()
+        FoodDatabase._expire_catalog_version()
+        return rows_affected
     
     @staticmethod
     def delete_food(food_id: int) -> int:
-        """Delete food entry"""
+        """
+        Delete food entry
+        
+        Logs of the food no longer join to allfood, so they drop out of the
+        rollup (as they would on rebuild) in the same transaction.
+        """
         query = "DELETE FROM allfood WHERE FoodID = %s"
-        return DatabaseManager.execute_update(query, (food_id,))
+        with atomic():
+            DailyNutritionSummaryDatabase.apply_logs("ufl.FoodID = %s", (food_id,), sign=-1)
+            rows_affected = DatabaseManager.execute_update(query, (food_id,))
+            FoodDatabase._bump_catalog_version()
+        FoodDatabase._expire_catalog_version()
+        return rows_affected
     
     @staticmethod
     def search_foods(search_term: str, limit: int = 50) -> List[Dict]:
-        """Search foods by name or brand"""
+        """
+        Search foods by name or brand, most relevant first
+        
+        Names starting with the search term rank first, then FULLTEXT relevance.
+        Results are memoised per catalog version.
+        """
+        version = FoodDatabase.get_catalog_version()
+        cache_key = (version, search_term, limit)
+        with FoodDatabase._cache_lock:
+            cached = FoodDatabase._search_cache.get(cache_key)
+            if cached is not None:
+                FoodDatabase._search_cache.move_to_end(cache_key)
+                return list(cached)
+        
+        results = FoodDatabase._search_foods_uncached(search_term, limit)
+        
+        max_entries = settings.FOOD_CATALOG_CACHE.get('MAX_SEARCH_ENTRIES', 512)
+        with FoodDatabase._cache_lock:
+            FoodDatabase._search_cache[cache_key] = results
+            while len(FoodDatabase._search_cache) > max_entries:
+                FoodDatabase._search_cache.popitem(last=False)
+        
+        return list(results)
+    
+    @staticmethod
+    def _search_foods_uncached(search_term: str, limit: int) -> List[Dict]:
+        """Run the search query against the database"""
+        boolean_query = FoodDatabase._fulltext_query(search_term)
+        prefix_param = FoodDatabase._prefix_pattern(search_term.strip())
+        
+        if boolean_query is None:
+            query = """
+                SELECT FoodID, FoodName, BrandName, Unit, Quantity,
+                       Calories, Carbs, Protein, Fat, Sugar, Fiber
+                FROM allfood
+                WHERE FoodName LIKE %s
+                ORDER BY FoodName
+                LIMIT %s
+            """
+            return DatabaseManager.execute_query(query, (prefix_param, limit))
+        
         query = """
             SELECT FoodID, FoodName, BrandName, Unit, Quantity,
                    Calories, Carbs, Protein, Fat, Sugar, Fiber
             FROM allfood
-            WHERE FoodName LIKE %s OR BrandName LIKE %s
-            ORDER BY FoodName
+            WHERE MATCH(FoodName, BrandName) AGAINST (%s IN BOOLEAN MODE)
+            ORDER BY FoodName LIKE %s DESC,
+                     MATCH(FoodName, BrandName) AGAINST (%s) DESC,
+                     FoodName
             LIMIT %s
         """
-        search_param = f"%{search_term}%"
-        return DatabaseManager.execute_query(query, (search_param, search_param, limit))
+        return DatabaseManager.execute_query(
+            query, (boolean_query, prefix_param, search_term, limit)
+        )
+
+
+class DailyNutritionSummaryDatabase(DatabaseManager):
+    """Database operations for dailynutritionsummary rollup table"""
+    
+    # Per (UserID, day, MealType) nutrition of the userfoodlog rows matching a filter
+    DELTA_SELECT = """
+        SELECT ufl.UserID, DATE(ufl.LogDateTime) AS LogDate, ufl.MealType,
+               COUNT(*) AS LogCount,
+               SUM((ufl.Quantity / af.Quantity) * af.Calories) AS Calories,
+               SUM((ufl.Quantity / af.Quantity) * af.Protein) AS Protein,
+               SUM((ufl.Quantity / af.Quantity) * af.Carbs) AS Carbs,
+               SUM((ufl.Quantity / af.Quantity) * af.Fat) AS Fat,
+               SUM((ufl.Quantity / af.Quantity) * af.Sugar) AS Sugar,
+               SUM((ufl.Quantity / af.Quantity) * af.Fiber) AS Fiber
+        FROM userfoodlog ufl
+        INNER JOIN allfood af ON ufl.FoodID = af.FoodID
+        WHERE {where}
+        GROUP BY ufl.UserID, DATE(ufl.LogDateTime), ufl.MealType
+    """
+    
+    @staticmethod
+    def apply_logs(where: str, params: tuple, sign: int = 1) -> int:
+        """
+        Add (sign=1) or subtract (sign=-1) the nutrition of matching logs to the rollup.
+        
+        Must run in the same transaction as the userfoodlog change it mirrors:
+        subtract before an UPDATE/DELETE, add after an INSERT/UPDATE.
+        """
+        delta_select = DailyNutritionSummaryDatabase.DELTA_SELECT.format(where=where)
+        query = f"""
+            INSERT INTO dailynutritionsummary
+            (UserID, LogDate, MealType, LogCount, TotalCalories, TotalProtein,
+             TotalCarbs, TotalFat, TotalSugar, TotalFiber)
+            SELECT delta.UserID, delta.LogDate, delta.MealType,
+                   %s * delta.LogCount, %s * delta.Calories, %s * delta.Protein,
+                   %s * delta.Carbs, %s * delta.Fat, %s * delta.Sugar, %s * delta.Fiber
+            FROM ({delta_select}) AS delta
+            ON DUPLICATE KEY UPDATE
+                LogCount = dailynutritionsummary.LogCount + %s * delta.LogCount,
+                TotalCalories = dailynutritionsummary.TotalCalories + %s * delta.Calories,
+                TotalProtein = dailynutritionsummary.TotalProtein + %s * delta.Protein,
+                TotalCarbs = dailynutritionsummary.TotalCarbs + %s * delta.Carbs,
+                TotalFat = dailynutritionsummary.TotalFat + %s * delta.Fat,
+                TotalSugar = dailynutritionsummary.TotalSugar + %s * delta.Sugar,
+                TotalFiber = dailynutritionsummary.TotalFiber + %s * delta.Fiber
+        """
+        # Placeholders in textual order: 7 signs, the filter params, 7 signs
+        return DatabaseManager.execute_update(query, (sign,) * 7 + tuple(params) + (sign,) * 7)
+    
+    @staticmethod
+    def get_day(user_id: int, log_date: date) -> Dict:
+        """Get a day's totals across meal types (reads at most one row per meal type)"""
+        query = """
+            SELECT 
+                SUM(TotalCalories) as TotalCalories,
+                SUM(TotalProtein) as TotalProtein,
+                SUM(TotalCarbs) as TotalCarbs,
+                SUM(TotalFat) as TotalFat,
+                SUM(TotalSugar) as TotalSugar,
+                SUM(TotalFiber) as TotalFiber
+            FROM dailynutritionsummary
+            WHERE UserID = %s AND LogDate = %s
+        """
+        return DatabaseManager.execute_query(query, (user_id, log_date), fetch_one=True)
+    
+    @staticmethod
+    def get_range(user_id: int, start_date: date, end_date: date, by_meal_type: bool = False) -> List[Dict]:
+        """Get per-day (optionally per-meal-type) totals for a date range in one grouped query"""
+        group_by = "LogDate, MealType" if by_meal_type else "LogDate"
+        query = f"""
+            SELECT {group_by},
+                SUM(TotalCalories) as TotalCalories,
+                SUM(TotalProtein) as TotalProtein,
+                SUM(TotalCarbs) as TotalCarbs,
+                SUM(TotalFat) as TotalFat,
+                SUM(TotalSugar) as TotalSugar,
+                SUM(TotalFiber) as TotalFiber
+            FROM dailynutritionsummary
+            WHERE UserID = %s AND LogDate >= %s AND LogDate <= %s
+            GROUP BY {group_by}
+            ORDER BY {group_by}
+        """
+        return DatabaseManager.execute_query(query, (user_id, start_date, end_date))
+    
+    @staticmethod
+    def rebuild(user_id: int = None) -> int:
+        """Recompute the rollup from userfoodlog (all users, or one user)"""
+        where = "ufl.UserID = %s" if user_id is not None else "1 = 1"
+        params = (user_id,) if user_id is not None else ()
+        delta_select = DailyNutritionSummaryDatabase.DELTA_SELECT.format(where=where)
+        
+        with atomic():
+            if user_id is not None:
+                DatabaseManager.execute_update(
+                    "DELETE FROM dailynutritionsummary WHERE UserID = %s", (user_id,)
+                )
+            else:
+                DatabaseManager.execute_update("DELETE FROM dailynutritionsummary")
+            
+            query = f"""
+                INSERT INTO dailynutritionsummary
+                (UserID, LogDate, MealType, LogCount, TotalCalories, TotalProtein,
+                 TotalCarbs, TotalFat, TotalSugar, TotalFiber)
+                SELECT UserID, LogDate, MealType, LogCount, Calories, Protein,
+                       Carbs, Fat, Sugar, Fiber
+                FROM ({delta_select}) AS delta
+            """
+            return DatabaseManager.execute_update(query, params)
 
 
 class UserFoodLogDatabase(DatabaseManager):
     """Database operations for userfoodlog table"""
     
+    MEAL_TYPES = ['Breakfast', 'Lunch', 'Dinner', 'Snack']
+    SUMMARY_FIELDS = [
+        'TotalCalories', 'TotalProtein', 'TotalCarbs',
+        'TotalFat', 'TotalSugar', 'TotalFiber'
+    ]
+    
     @staticmethod
     def get_user_logs(user_id: int, start_date: date = None, end_date: date = None) -> List[Dict]:
         """Get user food logs with optional date filtering"""
@@ -177,13 +598,14 @@ class UserFoodLogDatabase(DatabaseManager):
         
         params = [user_id]
         
+        # Half-open datetime bounds so (UserID, LogDateTime) index can be used
         if start_date:
-            query += " AND DATE(ufl.LogDateTime) >= %s"
-            params.append(start_date)
+            query += " AND ufl.LogDateTime >= %s"
+            params.append(local_day_bounds(start_date)[0])
         
         if end_date:
-            query += " AND DATE(ufl.LogDateTime) <= %s"
-            params.append(end_date)
+            query += " AND ufl.LogDateTime < %s"
+            params.append(local_day_bounds(end_date)[1])
         
         query += " ORDER BY ufl.LogDateTime DESC"
         
@@ -218,7 +640,58 @@ class UserFoodLogDatabase(DatabaseManager):
             data.get('MealType', 'Breakfast'),
             data.get('LogDateTime', datetime.now()),
         )
-        return DatabaseManager.execute_insert(query, params)
+        with atomic():
+            log_id = DatabaseManager.execute_insert(query, params)
+            DailyNutritionSummaryDatabase.apply_logs("ufl.LogID = %s", (log_id,))
+        return log_id
+    
+    @staticmethod
+    def create_logs(logs: List[Dict]) -> List[int]:
+        """Create several food log entries with one multi-row INSERT"""
+        query = """
+            INSERT INTO userfoodlog 
+            (UserID, FoodID, Quantity, Unit, MealType, LogDateTime)
+            VALUES (%s, %s, %s, %s, %s, %s)
+        """
+        params_list = [
+            (
+                data.get('UserID'),
+                data.get('FoodID'),
+                data.get('Quantity', 100),
+                data.get('Unit', 'g'),
+                data.get('MealType', 'Breakfast'),
+                data.get('LogDateTime', datetime.now()),
+            )
+            for data in logs
+        ]
+        if not params_list:
+            return []
+        
+        with atomic():
+            first_id = DatabaseManager.execute_many(query, params_list)
+            last_id = first_id + len(params_list) - 1
+            DailyNutritionSummaryDatabase.apply_logs(
+                "ufl.LogID BETWEEN %s AND %s", (first_id, last_id)
+            )
+        return list(range(first_id, last_id + 1))
+    
+    @staticmethod
+    def get_logs_by_ids(log_ids: List[int]) -> List[Dict]:
+        """Get several food logs by ID in one query"""
+        if not log_ids:
+            return []
+        
+        placeholders = ", ".join(["%s"] * len(log_ids))
+        query = f"""
+            SELECT ufl.LogID, ufl.UserID, ufl.FoodID, ufl.Quantity, ufl.Unit,
+                   ufl.MealType, ufl.LogDateTime,
+                   af.FoodName, af.BrandName
+            FROM userfoodlog ufl
+            INNER JOIN allfood af ON ufl.FoodID = af.FoodID
+            WHERE ufl.LogID IN ({placeholders})
+            ORDER BY ufl.LogID
+        """
+        return DatabaseManager.execute_query(query, tuple(log_ids))
     
     @staticmethod
     def update_log(log_id: int, data: Dict) -> int:
@@ -236,30 +709,24 @@ class UserFoodLogDatabase(DatabaseManager):
             data.get('LogDateTime'),
             log_id
         )
-        return DatabaseManager.execute_update(query, params)
+        with atomic():
+            DailyNutritionSummaryDatabase.apply_logs("ufl.LogID = %s", (log_id,), sign=-1)
+            rows_affected = DatabaseManager.execute_update(query, params)
+            DailyNutritionSummaryDatabase.apply_logs("ufl.LogID = %s", (log_id,))
+        return rows_affected
     
     @staticmethod
     def delete_log(log_id: int) -> int:
         """Delete food log entry"""
         query = "DELETE FROM userfoodlog WHERE LogID = %s"
-        return DatabaseManager.execute_update(query, (log_id,))
+        with atomic():
+            DailyNutritionSummaryDatabase.apply_logs("ufl.LogID = %s", (log_id,), sign=-1)
+            return DatabaseManager.execute_update(query, (log_id,))
     
     @staticmethod
     def get_daily_summary(user_id: int, log_date: date) -> Dict:
-        """Get daily nutrition summary for a user"""
-        query = """
-            SELECT 
-                SUM((ufl.Quantity / af.Quantity) * af.Calories) as TotalCalories,
-                SUM((ufl.Quantity / af.Quantity) * af.Protein) as TotalProtein,
-                SUM((ufl.Quantity / af.Quantity) * af.Carbs) as TotalCarbs,
-                SUM((ufl.Quantity / af.Quantity) * af.Fat) as TotalFat,
-                SUM((ufl.Quantity / af.Quantity) * af.Sugar) as TotalSugar,
-                SUM((ufl.Quantity / af.Quantity) * af.Fiber) as TotalFiber
-            FROM userfoodlog ufl
-            INNER JOIN allfood af ON ufl.FoodID = af.FoodID
-            WHERE ufl.UserID = %s AND DATE(ufl.LogDateTime) = %s
-        """
-        result = DatabaseManager.execute_query(query, (user_id, log_date), fetch_one=True)
+        """Get daily nutrition summary for a user (from the dailynutritionsummary rollup)"""
+        result = DailyNutritionSummaryDatabase.get_day(user_id, log_date)
         
         # Handle None values
         if result:
@@ -268,6 +735,39 @@ class UserFoodLogDatabase(DatabaseManager):
                     result[key] = 0
         return result or {}
     
+    @staticmethod
+    def get_range_summary(user_id: int, start_date: date, end_date: date, by_meal_type: bool = False) -> List[Dict]:
+        """Get daily nutrition summaries for every day in a range, zero-filling days without logs"""
+        rows = DailyNutritionSummaryDatabase.get_range(user_id, start_date, end_date, by_meal_type)
+        
+        def empty_totals():
+            return {key: 0 for key in UserFoodLogDatabase.SUMMARY_FIELDS}
+        
+        days = {}
+        current = start_date
+        while current <= end_date:
+            day = {'date': current.strftime('%Y-%m-%d')}
+            day.update(empty_totals())
+            if by_meal_type:
+                day['meals'] = {meal_type: empty_totals() for meal_type in UserFoodLogDatabase.MEAL_TYPES}
+            days[current] = day
+            current += timedelta(days=1)
+        
+        for row in rows:
+            day = days.get(row['LogDate'])
+            if day is None:
+                continue
+            
+            totals = {key: row[key] or 0 for key in UserFoodLogDatabase.SUMMARY_FIELDS}
+            if by_meal_type:
+                day['meals'][row['MealType']] = totals
+                for key, value in totals.items():
+                    day[key] += value
+            else:
+                day.update(totals)
+        
+        return list(days.values())
+    
     @staticmethod
     def get_logs_by_meal_type(user_id: int, meal_type: str, log_date: date = None) -> List[Dict]:
         """Get logs filtered by meal type"""
@@ -282,8 +782,8 @@ class UserFoodLogDatabase(DatabaseManager):
         params = [user_id, meal_type]
         
         if log_date:
-            query += " AND DATE(ufl.LogDateTime) = %s"
-            params.append(log_date)
+            query += " AND ufl.LogDateTime >= %s AND ufl.LogDateTime < %s"
+            params.extend(local_day_bounds(log_date))
         
         query += " ORDER BY ufl.LogDateTime DESC"
         
@@ -373,27 +873,25 @@ class PresetMealDatabase(DatabaseManager):
     
     @staticmethod
     def create_preset_with_foods(user_id: int, preset_name: str, meal_type: str, foods: List[Dict]) -> int:
-        """Create preset meal with foods"""
-        # Create preset
-        preset_id = PresetMealDatabase.create_preset({
-            'UserID': user_id,
-            'PresetName': preset_name,
-            'MealType': meal_type
-        })
-        
-        # Add foods to preset
-        if foods:
-            query = """
-                INSERT INTO presetfooditems (PresetID, FoodID, Quantity)
-                VALUES (%s, %s, %s)
-            """
-            with connection.cursor() as cursor:
-                for food in foods:
-                    cursor.execute(query, (
-                        preset_id,
-                        food.get('FoodID'),
-                        food.get('Quantity', 100)
-                    ))
+        """Create preset meal with foods (one transaction, one INSERT for all foods)"""
+        with atomic():
+            # Create preset
+            preset_id = PresetMealDatabase.create_preset({
+                'UserID': user_id,
+                'PresetName': preset_name,
+                'MealType': meal_type
+            })
+            
+            # Add foods to preset
+            if foods:
+                query = """
+                    INSERT INTO presetfooditems (PresetID, FoodID, Quantity)
+                    VALUES (%s, %s, %s)
+                """
+                DatabaseManager.execute_many(query, [
+                    (preset_id, food.get('FoodID'), food.get('Quantity', 100))
+                    for food in foods
+                ])
         
         return preset_id
     
@@ -421,4 +919,259 @@ class PresetMealDatabase(DatabaseManager):
         
         # Then delete preset
         preset_query = "DELETE FROM presetmeals WHERE PresetID = %s"
-        return DatabaseManager.execute_update(preset_query, (preset_id,))
\ No newline at end of file
+        return DatabaseManager.execute_update(preset_query, (preset_id,))
+
+class MealPlanJobDatabase(DatabaseManager):
+    """Database operations for the mealplanjob queue table"""
+    
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_SUCCEEDED = 'succeeded'
+    STATUS_FAILED = 'failed'
+    
+    @staticmethod
+    def _decode(job: Optional[Dict]) -> Optional[Dict]:
+        """Parse the JSON columns of a job row"""
+        if job is None:
+            return None
+        for column in ('Request', 'Result'):
+            if isinstance(job.get(column), (str, bytes)):
+                job[column] = json.loads(job[column])
+        return job
+    
+    @staticmethod
+    def create_job(user_id: int, request_data: Dict, total_days: int = 7) -> int:
+        """Queue a generation job and return its ID"""
+        query = """
+            INSERT INTO mealplanjob (UserID, Status, Request, TotalDays, CreatedAt)
+            VALUES (%s, %s, %s, %s, NOW())
+        """
+        params = (user_id, MealPlanJobDatabase.STATUS_QUEUED, json.dumps(request_data), total_days)
+        return DatabaseManager.execute_insert(query, params)
+    
+    @staticmethod
+    def get_job(job_id: int) -> Optional[Dict]:
+        """Get a job with its request and (when finished) result"""
+        query = """
+            SELECT JobID, UserID, Status, Request, DaysCompleted, TotalDays, Attempts,
+                   Result, Error, CreatedAt, StartedAt, FinishedAt
+            FROM mealplanjob
+            WHERE JobID = %s
+        """
+        return MealPlanJobDatabase._decode(DatabaseManager.execute_query(query, (job_id,), fetch_one=True))
+    
+    @staticmethod
+    def claim_next_job() -> Optional[Dict]:
+        """
+        Atomically move the oldest queued job to running and return it.
+        SKIP LOCKED lets several workers poll the queue without blocking each other.
+        """
+        with atomic():
+            job = DatabaseManager.execute_query(
+                """
+                    SELECT JobID FROM mealplanjob
+                    WHERE Status = %s
+                    ORDER BY JobID
+                    LIMIT 1
+                    FOR UPDATE SKIP LOCKED
+                """,
+                (MealPlanJobDatabase.STATUS_QUEUED,),
+                fetch_one=True
+            )
+            if job is None:
+                return None
+            
+            DatabaseManager.execute_update(
+                """
+                    UPDATE mealplanjob
+                    SET Status = %s, StartedAt = NOW(), HeartbeatAt = NOW(),
+                        DaysCompleted = 0, Attempts = Attempts + 1
+                    WHERE JobID = %s
+                """,
+                (MealPlanJobDatabase.STATUS_RUNNING, job['JobID'])
+            )
+        
+        return MealPlanJobDatabase.get_job(job['JobID'])
+    
+    # The updates below take the Attempts value of the worker's claim and only
+    # touch the job while that claim still owns it, so a worker whose job was
+    # requeued as stale (and maybe claimed again) can't overwrite it
+    
+    @staticmethod
+    def update_progress(job_id: int, days_completed: int, attempt: int) -> int:
+        """Record how many days of a running job are built and refresh its heartbeat"""
+        query = """
+            UPDATE mealplanjob
+            SET DaysCompleted = %s, HeartbeatAt = NOW()
+            WHERE JobID = %s AND Status = %s AND Attempts = %s
+        """
+        return DatabaseManager.execute_update(
+            query, (days_completed, job_id, MealPlanJobDatabase.STATUS_RUNNING, attempt)
+        )
+    
+    @staticmethod
+    def complete_job(job_id: int, result: Dict, attempt: int) -> int:
+        """Store a finished plan; returns 0 if the claim no longer owns the job"""
+        query = """
+            UPDATE mealplanjob
+            SET Status = %s, Result = %s, DaysCompleted = TotalDays, Error = NULL, FinishedAt = NOW()
+            WHERE JobID = %s AND Status = %s AND Attempts = %s
+        """
+        params = (
+            MealPlanJobDatabase.STATUS_SUCCEEDED, json.dumps(result, default=str),
+            job_id, MealPlanJobDatabase.STATUS_RUNNING, attempt
+        )
+        return DatabaseManager.execute_update(query, params)
+    
+    @staticmethod
+    def fail_job(job_id: int, error: str, attempt: int) -> int:
+        """Mark a job as failed; returns 0 if the claim no longer owns the job"""
+        query = """
+            UPDATE mealplanjob
+            SET Status = %s, Error = %s, FinishedAt = NOW()
+            WHERE JobID = %s AND Status = %s AND Attempts = %s
+        """
+        params = (
+            MealPlanJobDatabase.STATUS_FAILED, error,
+            job_id, MealPlanJobDatabase.STATUS_RUNNING, attempt
+        )
+        return DatabaseManager.execute_update(query, params)
+    
+    @staticmethod
+    def requeue_stale_jobs(stale_after_seconds: int, max_attempts: int) -> int:
+        """
+        Recover jobs left running by a worker that died (no heartbeat for
+        stale_after_seconds): requeue them, or fail them once they have used
+        up max_attempts.
+        """
+        with atomic():
+            failed = DatabaseManager.execute_update(
+                """
+                    UPDATE mealplanjob
+                    SET Status = %s, Error = 'Worker stopped while running the job', FinishedAt = NOW()
+                    WHERE Status = %s AND COALESCE(HeartbeatAt, StartedAt) < NOW() - INTERVAL %s SECOND
+                      AND Attempts >= %s
+                """,
+                (MealPlanJobDatabase.STATUS_FAILED, MealPlanJobDatabase.STATUS_RUNNING,
+                 stale_after_seconds, max_attempts)
+            )
+            requeued = DatabaseManager.execute_update(
+                """
+                    UPDATE mealplanjob
+                    SET Status = %s, DaysCompleted = 0
+                    WHERE Status = %s AND COALESCE(HeartbeatAt, StartedAt) < NOW() - INTERVAL %s SECOND
+                """,
+                (MealPlanJobDatabase.STATUS_QUEUED, MealPlanJobDatabase.STATUS_RUNNING, stale_after_seconds)
+            )
+        
+        if failed or requeued:
+            logger.warning(f"Recovered stale meal plan jobs: {requeued} requeued, {failed} failed")
+        return requeued
+
+
+class MealPlanDatabase(DatabaseManager):
+    """Database operations for saved meal plans (mealplan and mealplanitem tables)"""
+    
+    PLAN_COLUMNS = """
+        mp.PlanID, mp.UserID, mp.StartDate, mp.Days, mp.CalorieTarget, mp.Gender,
+        mp.CustomMacros, mp.CreatedAt, mp.UpdatedAt
+    """
+    
+    @staticmethod
+    def _assemble(rows: List[Dict]) -> Optional[Dict]:
+        """Fold plan-with-items join rows into one plan dict with an Items list"""
+        if not rows:
+            return None
+        
+        first = rows[0]
+        plan = {key: first[key] for key in (
+            'PlanID', 'UserID', 'StartDate', 'Days', 'CalorieTarget', 'Gender', 'CustomMacros',
+            'CreatedAt', 'UpdatedAt'
+        )}
+        if isinstance(plan['CustomMacros'], (str, bytes)):
+            plan['CustomMacros'] = json.loads(plan['CustomMacros'])
+        plan['Items'] = [
+            (row['DayNumber'], row['MealType'], row['Position'], row['FoodID'], row['Quantity'])
+            for row in rows if row['FoodID'] is not None
+        ]
+        return plan
+    
+    @staticmethod
+    def save_plan(user_id: int, start_date: date, calorie_target: int, gender: str,
+                  custom_macros: Optional[Dict], items: List[tuple], days: int = 7) -> int:
+        """
+        Save a plan as the user's plan for start_date, replacing any plan
+        already saved for that date, in one transaction.
+        
+        Args:
+            items: (day, meal_type, position, food_id, quantity) tuples
+        
+        Returns:
+            int: PlanID
+        """
+        with atomic():
+            # LAST_INSERT_ID(PlanID) makes lastrowid the existing plan's ID on a replace
+            plan_id = DatabaseManager.execute_insert(
+                """
+                    INSERT INTO mealplan (UserID, StartDate, Days, CalorieTarget, Gender, CustomMacros, CreatedAt)
+                    VALUES (%s, %s, %s, %s, %s, %s, NOW())
+                    ON DUPLICATE KEY UPDATE
+                        PlanID = LAST_INSERT_ID(PlanID), Days = VALUES(Days),
+                        CalorieTarget = VALUES(CalorieTarget), Gender = VALUES(Gender),
+                        CustomMacros = VALUES(CustomMacros), UpdatedAt = NOW()
+                """,
+                (user_id, start_date, days, calorie_target, gender,
+                 json.dumps(custom_macros) if custom_macros else None)
+            )
+            DatabaseManager.execute_update("DELETE FROM mealplanitem WHERE PlanID = %s", (plan_id,))
+            DatabaseManager.execute_many(
+                """
+                    INSERT INTO mealplanitem (PlanID, DayNumber, MealType, Position, FoodID, Quantity)
+                    VALUES (%s, %s, %s, %s, %s, %s)
+                """,
+                [(plan_id,) + tuple(item) for item in items]
+            )
+        
+        return plan_id
+    
+    @staticmethod
+    def get_plan(plan_id: int) -> Optional[Dict]:
+        """Get a plan with its items (one query)"""
+        query = f"""
+            SELECT {MealPlanDatabase.PLAN_COLUMNS},
+                   mpi.DayNumber, mpi.MealType, mpi.Position, mpi.FoodID, mpi.Quantity
+            FROM mealplan mp
+            LEFT JOIN mealplanitem mpi ON mpi.PlanID = mp.PlanID
+            WHERE mp.PlanID = %s
+            ORDER BY mpi.DayNumber, mpi.MealType, mpi.Position
+        """
+        return MealPlanDatabase._assemble(DatabaseManager.execute_query(query, (plan_id,)))
+    
+    @staticmethod
+    def get_user_plans(user_id: int, start_date: date = None, limit: int = 50, offset: int = 0) -> List[Dict]:
+        """List a user's plans (without items), newest start date first"""
+        conditions = ["mp.UserID = %s"]
+        params = [user_id]
+        if start_date:
+            conditions.append("mp.StartDate = %s")
+            params.append(start_date)
+        
+        query = f"""
+            SELECT {MealPlanDatabase.PLAN_COLUMNS}
+            FROM mealplan mp
+            WHERE {' AND '.join(conditions)}
+            ORDER BY mp.StartDate DESC
+            LIMIT %s OFFSET %s
+        """
+        plans = DatabaseManager.execute_query(query, tuple(params + [limit, offset]))
+        for plan in plans:
+            if isinstance(plan['CustomMacros'], (str, bytes)):
+                plan['CustomMacros'] = json.loads(plan['CustomMacros'])
+        return plans
+    
+    @staticmethod
+    def delete_plan(plan_id: int) -> int:
+        """Delete a plan and its items"""
+        with atomic():
+            DatabaseManager.execute_update("DELETE FROM mealplanitem WHERE PlanID = %s", (plan_id,))
+            return DatabaseManager.execute_update("DELETE FROM mealplan WHERE PlanID = %s", (plan_id,))
@@ -0,0 +1,309 @@
+# nutrition/db_pool.py
+
+from django.conf import settings
+from django.db import connection as django_connection, transaction as django_transaction
+from contextlib import contextmanager
+import os
+import threading
+import time
+import logging
+
+import pymysql
+from pymysql.constants import CLIENT
+
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no pooled connection becomes free within the checkout timeout"""
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of PyMySQL connections.
+
+    - At most ``max_size`` connections are open at any time
+    - Connections idle longer than ``health_check_interval`` are pinged on checkout
+    - Connections idle longer than ``idle_timeout`` are closed (keeping ``min_idle``)
+    - Checkout waits are recorded and exposed through ``stats()``
+    """
+
+    def __init__(self, connect_kwargs: dict, max_size: int = 10, min_idle: int = 1,
+                 idle_timeout: float = 300, checkout_timeout: float = 5,
+                 health_check_interval: float = 30):
+        self.connect_kwargs = connect_kwargs
+        self.max_size = max_size
+        self.min_idle = min_idle
+        self.idle_timeout = idle_timeout
+        self.checkout_timeout = checkout_timeout
+        self.health_check_interval = health_check_interval
+
+        # Idle connections as (connection, last_used) - most recently used last
+        self._idle = []
+        self._size = 0
+        self._cond = threading.Condition()
+        self._local = threading.local()
+
+        self._stats = {
+            'checkouts': 0,
+            'waits': 0,
+            'total_wait_ms': 0.0,
+            'max_wait_ms': 0.0,
+            'timeouts': 0,
+            'created': 0,
+            'closed': 0,
+            'reaped': 0,
+            'health_check_failures': 0,
+        }
+
+    def _connect(self):
+        """Open a new raw connection"""
+        conn = pymysql.connect(**self.connect_kwargs)
+        with self._cond:
+            self._stats['created'] += 1
+        return conn
+
+    def _close(self, conn):
+        """Close a raw connection, ignoring errors from dead sockets"""
+        try:
+            conn.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._stats['closed'] += 1
+
+    def _is_healthy(self, conn) -> bool:
+        """Ping the server without reconnecting"""
+        try:
+            conn.ping(reconnect=False)
+            return True
+        except Exception as e:
+            logger.warning(f"Pooled connection failed health check: {e}")
+            with self._cond:
+                self._stats['health_check_failures'] += 1
+            return False
+
+    def _reap_idle_locked(self, now: float) -> list:
+        """Detach connections idle past idle_timeout (caller holds the lock)"""
+        expired = []
+        while len(self._idle) > self.min_idle:
+            conn, last_used = self._idle[0]
+            if now - last_used < self.idle_timeout:
+                break
+            self._idle.pop(0)
+            self._size -= 1
+            expired.append(conn)
+        self._stats['reaped'] += len(expired)
+        return expired
+
+    def acquire(self):
+        """Check out a connection, waiting up to checkout_timeout seconds"""
+        start = time.monotonic()
+        deadline = start + self.checkout_timeout
+        conn = None
+        last_used = None
+        waited = False
+
+        with self._cond:
+            expired = self._reap_idle_locked(start)
+            while True:
+                if self._idle:
+                    conn, last_used = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    self._size += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._stats['timeouts'] += 1
+                    raise PoolTimeoutError(
+                        f"No database connection available after {self.checkout_timeout}s "
+                        f"(max_size={self.max_size})"
+                    )
+                waited = True
+                self._cond.wait(remaining)
+
+            wait_ms = (time.monotonic() - start) * 1000
+            self._stats['checkouts'] += 1
+            if waited:
+                self._stats['waits'] += 1
+            self._stats['total_wait_ms'] += wait_ms
+            self._stats['max_wait_ms'] = max(self._stats['max_wait_ms'], wait_ms)
+
+        for stale in expired:
+            self._close(stale)
+
+        if conn is not None and time.monotonic() - last_used > self.health_check_interval:
+            if not self._is_healthy(conn):
+                self._close(conn)
+                conn = None
+
+        if conn is None:
+            try:
+                conn = self._connect()
+            except Exception:
+                with self._cond:
+                    self._size -= 1
+                    self._cond.notify()
+                raise
+
+        return conn
+
+    def release(self, conn, discard: bool = False):
+        """Return a connection to the pool, or close it if discard is set"""
+        if discard:
+            self._close(conn)
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            return
+
+        with self._cond:
+            self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self):
+        """
+        Check out a connection for the duration of the block.
+        Nested use on the same thread reuses the connection already held.
+        """
+        held = getattr(self._local, 'conn', None)
+        if held is not None:
+            yield held
+            return
+
+        conn = self.acquire()
+        self._local.conn = conn
+        broken = False
+        try:
+            yield conn
+        except (pymysql.err.OperationalError, pymysql.err.InterfaceError):
+            broken = True
+            raise
+        finally:
+            self._local.conn = None
+            self.release(conn, discard=broken)
+
+    @contextmanager
+    def transaction(self):
+        """
+        Run the block in a single transaction on one pooled connection.
+        Nested transactions join the outermost one.
+        """
+        with self.connection() as conn:
+            if getattr(self._local, 'in_transaction', False):
+                yield conn
+                return
+
+            conn.begin()
+            self._local.in_transaction = True
+            try:
+                yield conn
+                conn.commit()
+            except Exception:
+                try:
+                    conn.rollback()
+                except Exception as e:
+                    logger.error(f"Rollback failed: {e}")
+                raise
+            finally:
+                self._local.in_transaction = False
+
+    def stats(self) -> dict:
+        """Snapshot of pool size and checkout/wait metrics"""
+        with self._cond:
+            snapshot = dict(self._stats)
+            snapshot.update({
+                'max_size': self.max_size,
+                'size': self._size,
+                'idle': len(self._idle),
+                'in_use': self._size - len(self._idle),
+            })
+        checkouts = snapshot['checkouts']
+        snapshot['avg_wait_ms'] = round(snapshot['total_wait_ms'] / checkouts, 3) if checkouts else 0.0
+        return snapshot
+
+    def close_all(self):
+        """Close every idle connection"""
+        with self._cond:
+            idle = self._idle
+            self._idle = []
+            self._size -= len(idle)
+        for conn, _ in idle:
+            self._close(conn)
+
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+def _connect_kwargs(db: dict) -> dict:
+    """Translate a Django DATABASES entry into PyMySQL connect() arguments"""
+    options = db.get('OPTIONS', {})
+    return {
+        'host': db.get('HOST') or 'localhost',
+        'port': int(db.get('PORT') or 3306),
+        'user': db.get('USER'),
+        'password': db.get('PASSWORD'),
+        'database': db.get('NAME'),
+        'charset': options.get('charset', 'utf8mb4'),
+        'init_command': options.get('init_command'),
+        'autocommit': True,
+        # Match Django's MySQL backend: rowcount reports matched rows, not changed rows
+        'client_flag': CLIENT.FOUND_ROWS,
+    }
+
+
+def pool_enabled() -> bool:
+    """Whether raw SQL should go through the pool instead of Django's connection"""
+    return getattr(settings, 'DB_POOL', {}).get('ENABLED', False)
+
+
+def get_pool() -> ConnectionPool:
+    """Return the process-wide pool, rebuilding it after a fork"""
+    global _pool, _pool_pid
+
+    pid = os.getpid()
+    if _pool is not None and _pool_pid == pid:
+        return _pool
+
+    with _pool_lock:
+        if _pool is None or _pool_pid != pid:
+            config = getattr(settings, 'DB_POOL', {})
+            _pool = ConnectionPool(
+                _connect_kwargs(settings.DATABASES['default']),
+                max_size=config.get('MAX_SIZE', 10),
+                min_idle=config.get('MIN_IDLE', 1),
+                idle_timeout=config.get('IDLE_TIMEOUT', 300),
+                checkout_timeout=config.get('CHECKOUT_TIMEOUT', 5),
+                health_check_interval=config.get('HEALTH_CHECK_INTERVAL', 30),
+            )
+            _pool_pid = pid
+    return _pool
+
+
+@contextmanager
+def get_cursor():
+    """Yield a cursor from the pool, or from Django's connection when pooling is off"""
+    if not pool_enabled():
+        with django_connection.cursor() as cursor:
+            yield cursor
+        return
+
+    with get_pool().connection() as conn:
+        with conn.cursor() as cursor:
+            yield cursor
+
+
+@contextmanager
+def atomic():
+    """Run every get_cursor() call inside the block in one transaction"""
+    if not pool_enabled():
+        with django_transaction.atomic():
+            yield
+        return
+
+    with get_pool().transaction():
+        yield
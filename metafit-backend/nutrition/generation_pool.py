@@ -0,0 +1,347 @@
+# nutrition/generation_pool.py
+
+from django.conf import settings
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from collections import OrderedDict
+import atexit
+import copy
+import json
+import multiprocessing
+import os
+import random
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class GenerationTimeoutError(Exception):
+    """Raised when a pooled meal plan generation does not finish in time"""
+
+
+def build_generator_kwargs(request_data: dict) -> dict:
+    """
+    Map validated MealPlanRequestSerializer data to MealPlanGenerator arguments.
+
+    Args:
+        request_data (dict): Validated request data
+
+    Returns:
+        dict: Keyword arguments for MealPlanGenerator (without foods_list)
+    """
+    refinement = request_data.get('refinement', 'none')
+    return {
+        'calorie_target': request_data['calorie_target'],
+        'gender': request_data['gender'],
+        'custom_macros': request_data.get('custom_macros', None),
+        'strategy': request_data.get('strategy', 'greedy'),
+        'refinement': None if refinement == 'none' else refinement,
+        'refinement_iterations': request_data.get('refinement_iterations', None),
+        'seed': request_data.get('seed', None),
+        'scoring': request_data.get('scoring', 'calorie'),
+        'score_weights': request_data.get('score_weights', None) or None
+    }
+
+
+def get_generator_catalog():
+    """
+    MealPlanCatalog for the cached food catalog.
+
+    Built once per catalog version and shared by every generator in the
+    process, so requests don't re-derive per-food stats and arrays.
+
+    Returns:
+        MealPlanCatalog: Generator data for the current catalog (empty if allfood is)
+    """
+    from .database import FoodDatabase
+    from .services.meal_plan_generator import MealPlanCatalog
+
+    return FoodDatabase.get_catalog().derived(
+        'meal_plan_generator', lambda catalog: MealPlanCatalog(catalog.foods())
+    )
+
+
+def generate_meal_plan(generator_kwargs: dict, deadline_ms: float = None, progress_callback=None) -> dict:
+    """
+    Generate a meal plan against the cached food catalog.
+
+    Runs in a pool worker when the process pool is enabled, or inline otherwise.
+
+    Args:
+        generator_kwargs (dict): MealPlanGenerator arguments except foods_list
+        deadline_ms (float): Optional generate() time budget
+        progress_callback (callable): Optional generate() progress callback
+
+    Returns:
+        dict: MealPlanGenerator.generate() result
+
+    Raises:
+        ValueError: If the catalog is empty or the arguments are invalid
+    """
+    # Imported here so spawned workers can unpickle this module before django.setup()
+    from .services.meal_plan_generator import MealPlanGenerator
+
+    foods = get_generator_catalog()
+    if not foods:
+        raise ValueError('No foods available in database')
+
+    generator = MealPlanGenerator(foods_list=foods, **generator_kwargs)
+    return generator.generate(deadline_ms=deadline_ms, progress_callback=progress_callback)
+
+
+def _generate_in_worker(generator_kwargs: dict, deadline_ms: float, expires_at: float):
+    """
+    Pool entry point: generate within whatever is left of the caller's budget.
+
+    expires_at is the wall-clock time the generation budget ran out for the
+    caller, so time spent queued behind other requests comes out of this
+    run's deadline. Returns None without generating if it is already past.
+    """
+    remaining_ms = (expires_at - time.time()) * 1000
+    if remaining_ms <= 0:
+        return None
+    if deadline_ms:
+        remaining_ms = min(remaining_ms, deadline_ms)
+    return generate_meal_plan(generator_kwargs, remaining_ms)
+
+
+def _init_worker():
+    """Set up Django in a fresh worker and preload the food catalog"""
+    import django
+    from django.apps import apps
+
+    if not apps.ready:
+        django.setup()
+
+    from .database import FoodDatabase
+    try:
+        catalog = FoodDatabase.get_catalog()
+        get_generator_catalog()
+        logger.info(f"Generation worker {os.getpid()} loaded catalog version {catalog.version}")
+    except Exception as e:
+        # The first request retries the load; don't take the worker down
+        logger.error(f"Generation worker {os.getpid()} failed to preload catalog: {e}")
+
+
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+
+
+def pool_settings() -> dict:
+    """The MEAL_PLAN_GENERATION settings dict"""
+    return getattr(settings, 'MEAL_PLAN_GENERATION', {})
+
+
+def process_pool_enabled() -> bool:
+    """Whether generation should run in worker processes instead of the request thread"""
+    return pool_settings().get('PROCESS_POOL_ENABLED', False)
+
+
+def get_executor() -> ProcessPoolExecutor:
+    """Return the per-process generation pool, creating it on first use or after a fork"""
+    global _executor, _executor_pid
+
+    pid = os.getpid()
+    if _executor is not None and _executor_pid == pid:
+        return _executor
+
+    with _executor_lock:
+        if _executor is None or _executor_pid != pid:
+            config = pool_settings()
+            workers = config.get('PROCESS_POOL_WORKERS') or os.cpu_count() or 1
+            _executor = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context(config.get('PROCESS_POOL_START_METHOD', 'spawn')),
+                initializer=_init_worker
+            )
+            _executor_pid = pid
+            logger.info(f"Started meal plan generation pool with {workers} workers")
+    return _executor
+
+
+def _discard_executor(executor):
+    """Drop a broken pool so the next call starts a fresh one"""
+    global _executor
+
+    with _executor_lock:
+        if _executor is executor:
+            _executor = None
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown_executor():
+    """Stop the pool's workers (registered with atexit)"""
+    global _executor
+
+    with _executor_lock:
+        executor = _executor
+        _executor = None
+    if executor is not None and _executor_pid == os.getpid():
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+atexit.register(shutdown_executor)
+
+
+# Finished plans keyed on (catalog version, start date, normalized request)
+_result_cache = OrderedDict()
+_result_cache_lock = threading.Lock()
+
+
+def result_cache_key(generator_kwargs: dict, starts: int = 1):
+    """
+    Cache key for a generation request, or None when caching is off.
+
+    Equivalent requests (e.g. custom_macros {} vs. None, 150 vs. 150.0 g)
+    share a key; the catalog version and start date keep entries from
+    outliving the foods or dates they were built with.
+    """
+    if pool_settings().get('RESULT_CACHE_SIZE', 0) <= 0:
+        return None
+
+    from .database import FoodDatabase
+    from .utils import local_today
+
+    normalized = dict(generator_kwargs)
+    custom_macros = normalized.get('custom_macros') or None
+    if custom_macros:
+        custom_macros = {key: round(float(value), 2) for key, value in custom_macros.items()}
+    normalized['custom_macros'] = custom_macros
+    normalized['gender'] = str(normalized['gender']).lower()
+    normalized['starts'] = starts
+
+    return (
+        FoodDatabase.get_catalog_version(),
+        local_today().isoformat(),
+        json.dumps(normalized, sort_keys=True)
+    )
+
+
+def _cache_get(key):
+    with _result_cache_lock:
+        result = _result_cache.get(key)
+        if result is None:
+            return None
+        _result_cache.move_to_end(key)
+    return copy.deepcopy(result)
+
+
+def _cache_put(key, result: dict):
+    max_entries = pool_settings().get('RESULT_CACHE_SIZE', 0)
+    with _result_cache_lock:
+        _result_cache[key] = copy.deepcopy(result)
+        _result_cache.move_to_end(key)
+        while len(_result_cache) > max_entries:
+            _result_cache.popitem(last=False)
+
+
+def run_generation(generator_kwargs: dict, deadline_ms: float = None, use_cache: bool = True,
+                   starts: int = 1) -> dict:
+    """
+    Generate a meal plan, in the process pool when it is enabled.
+
+    Identical requests are served from a per-process LRU of finished plans
+    (MEAL_PLAN_GENERATION['RESULT_CACHE_SIZE'] entries); plans cut short by
+    the deadline are not cached. use_cache=False forces a fresh plan, which
+    then replaces the cached one.
+
+    With starts > 1, that many runs with consecutive seeds (from the request
+    seed, or a random one) are generated in parallel across the pool and the
+    plan with the lowest weekly macro_variance is returned.
+
+    The wait is bounded by the generation deadline plus
+    MEAL_PLAN_GENERATION['PROCESS_POOL_TIMEOUT_GRACE_MS'], which covers
+    queueing behind other requests and the result transfer.
+
+    Raises:
+        ValueError: Propagated from generation
+        GenerationTimeoutError: If no result arrives in time
+    """
+    key = result_cache_key(generator_kwargs, starts)
+    if key is not None and use_cache:
+        cached = _cache_get(key)
+        if cached is not None:
+            cached['cached'] = True
+            return cached
+
+    if starts > 1:
+        result = _run_multi_start(generator_kwargs, deadline_ms, starts)
+    else:
+        result = _run_uncached([generator_kwargs], deadline_ms)[0]
+
+    if key is not None and not result.get('stopped_early'):
+        _cache_put(key, result)
+    return result
+
+
+def _run_multi_start(generator_kwargs: dict, deadline_ms: float, starts: int) -> dict:
+    """Generate differently seeded plans and keep the one closest to the targets"""
+    base_seed = generator_kwargs.get('seed')
+    if base_seed is None:
+        base_seed = random.randrange(1 << 30)
+    seeds = [base_seed + i for i in range(starts)]
+
+    if not process_pool_enabled() and deadline_ms:
+        # Runs are sequential without the pool, so they share the budget
+        deadline_ms = deadline_ms / starts
+
+    results = _run_uncached([dict(generator_kwargs, seed=seed) for seed in seeds], deadline_ms)
+
+    best = min(results, key=lambda result: result['weekly_summary']['macro_variance'])
+    best['multi_start'] = {
+        'starts': starts,
+        'completed': len(results),
+        'seeds': [result['seed'] for result in results],
+        'macro_variances': [result['weekly_summary']['macro_variance'] for result in results],
+        'selected_seed': best['seed']
+    }
+    return best
+
+
+def _run_uncached(calls: list, deadline_ms: float = None) -> list:
+    """
+    Generate one plan per generator_kwargs in calls, inline or in the process pool.
+
+    In the pool, runs that miss the timeout are dropped as long as at least
+    one finished. A future that is already running can't be cancelled, so
+    each run is instead handed the time left in the budget as its own
+    deadline: it stops by the time this call stops waiting for it (the grace
+    period covers the result transfer), and a run that only starts after
+    that skips generating altogether.
+    """
+    if not process_pool_enabled():
+        return [generate_meal_plan(generator_kwargs, deadline_ms) for generator_kwargs in calls]
+
+    config = pool_settings()
+    budget_ms = deadline_ms or config.get('MAX_DEADLINE_MS', 30000)
+    timeout_ms = budget_ms + config.get('PROCESS_POOL_TIMEOUT_GRACE_MS', 5000)
+    expires_at = time.time() + budget_ms / 1000
+
+    executor = get_executor()
+    try:
+        futures = [
+            executor.submit(_generate_in_worker, generator_kwargs, deadline_ms, expires_at)
+            for generator_kwargs in calls
+        ]
+        done, not_done = wait(futures, timeout=timeout_ms / 1000)
+        for future in not_done:
+            # Only stops runs still queued; running ones end at expires_at
+            future.cancel()
+
+        # Keep submission order; re-raises generation errors (e.g. ValueError)
+        results = [future.result() for future in futures if future in done]
+    except BrokenProcessPool:
+        logger.error("Meal plan generation pool broke; restarting it on next use")
+        _discard_executor(executor)
+        raise
+
+    expired = len(futures) - len(done) + results.count(None)
+    results = [result for result in results if result is not None]
+    if not results:
+        raise GenerationTimeoutError(f"Meal plan generation did not finish within {timeout_ms} ms")
+    if expired:
+        logger.warning(f"{expired} of {len(futures)} meal plan runs timed out")
+    return results
@@ -0,0 +1,28 @@
+# nutrition/management/commands/rebuild_nutrition_summary.py
+
+from django.core.management.base import BaseCommand
+
+from nutrition.database import DailyNutritionSummaryDatabase
+
+
+class Command(BaseCommand):
+    """Recompute the dailynutritionsummary rollup from userfoodlog"""
+
+    help = "Rebuild the daily nutrition rollup table from raw food logs"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user-id',
+            type=int,
+            default=None,
+            help='Only rebuild rows for this user'
+        )
+
+    def handle(self, *args, **options):
+        user_id = options['user_id']
+        rows = DailyNutritionSummaryDatabase.rebuild(user_id)
+
+        scope = f"user {user_id}" if user_id is not None else "all users"
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt daily nutrition summary for {scope} ({rows} rows)"
+        ))
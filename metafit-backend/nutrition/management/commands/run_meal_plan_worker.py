@@ -0,0 +1,95 @@
+# nutrition/management/commands/run_meal_plan_worker.py
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+import time
+
+from nutrition.database import MealPlanJobDatabase
+from nutrition.generation_pool import build_generator_kwargs, generate_meal_plan
+from nutrition.plan_store import save_meal_plan
+
+
+class Command(BaseCommand):
+    """Run queued meal plan jobs from the mealplanjob table"""
+
+    help = "Poll the meal plan job queue and generate queued plans"
+
+    # Check for jobs orphaned by a dead worker every this many polls
+    STALE_CHECK_EVERY = 60
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Exit once the queue is empty instead of polling'
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=None,
+            help="Seconds to sleep when the queue is empty (default: MEAL_PLAN_GENERATION['JOB_POLL_INTERVAL'])"
+        )
+
+    def handle(self, *args, **options):
+        config = getattr(settings, 'MEAL_PLAN_GENERATION', {})
+        poll_interval = options['poll_interval'] or config.get('JOB_POLL_INTERVAL', 1.0)
+        stale_after = config.get('JOB_STALE_AFTER_SECONDS', 600)
+        max_attempts = config.get('JOB_MAX_ATTEMPTS', 3)
+
+        self.stdout.write("Meal plan worker started")
+        processed = 0
+        polls = 0
+
+        try:
+            while True:
+                if polls % self.STALE_CHECK_EVERY == 0:
+                    MealPlanJobDatabase.requeue_stale_jobs(stale_after, max_attempts)
+                polls += 1
+
+                job = MealPlanJobDatabase.claim_next_job()
+                if job is None:
+                    if options['once']:
+                        break
+                    time.sleep(poll_interval)
+                    continue
+
+                self.run_job(job)
+                processed += 1
+        except KeyboardInterrupt:
+            self.stdout.write("Meal plan worker interrupted")
+
+        self.stdout.write(self.style.SUCCESS(f"Meal plan worker stopped ({processed} jobs processed)"))
+
+    def run_job(self, job):
+        """Generate one claimed job's plan and store the outcome"""
+        job_id = job['JobID']
+        attempt = job['Attempts']
+        request_data = job['Request']
+
+        def report_progress(days_completed, total_days):
+            MealPlanJobDatabase.update_progress(job_id, days_completed, attempt)
+
+        try:
+            result = generate_meal_plan(
+                build_generator_kwargs(request_data),
+                deadline_ms=request_data.get('deadline_ms'),
+                progress_callback=report_progress
+            )
+            if request_data.get('save'):
+                result['plan_id'] = save_meal_plan(
+                    job['UserID'],
+                    result['meal_plan'],
+                    request_data['calorie_target'],
+                    request_data['gender'],
+                    request_data.get('custom_macros')
+                )
+            completed = MealPlanJobDatabase.complete_job(job_id, result, attempt)
+        except Exception as e:
+            MealPlanJobDatabase.fail_job(job_id, str(e), attempt)
+            self.stderr.write(f"Job {job_id} failed: {e}")
+            return
+
+        if not completed:
+            self.stderr.write(f"Job {job_id} was requeued while running; result discarded")
+            return
+        self.stdout.write(f"Job {job_id} succeeded")
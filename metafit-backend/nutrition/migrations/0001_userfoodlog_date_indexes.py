@@ -0,0 +1,24 @@
+# nutrition/migrations/0001_userfoodlog_date_indexes.py
+#
+# The nutrition tables are created outside Django (no models), so schema
+# changes are applied as raw SQL.
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.RunSQL(
+            sql="CREATE INDEX idx_userfoodlog_user_logdatetime ON userfoodlog (UserID, LogDateTime)",
+            reverse_sql="DROP INDEX idx_userfoodlog_user_logdatetime ON userfoodlog",
+        ),
+        migrations.RunSQL(
+            sql="CREATE INDEX idx_userfoodlog_user_mealtype_logdatetime ON userfoodlog (UserID, MealType, LogDateTime)",
+            reverse_sql="DROP INDEX idx_userfoodlog_user_mealtype_logdatetime ON userfoodlog",
+        ),
+    ]
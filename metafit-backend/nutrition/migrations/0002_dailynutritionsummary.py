@@ -0,0 +1,54 @@
+# nutrition/migrations/0002_dailynutritionsummary.py
+#
+# Per-user, per-day, per-meal-type nutrition rollup maintained by
+# UserFoodLogDatabase. Existing logs are backfilled here; run
+# `python manage.py rebuild_nutrition_summary` to recompute it later.
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nutrition', '0001_userfoodlog_date_indexes'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql="""
+                CREATE TABLE dailynutritionsummary (
+                    UserID INT NOT NULL,
+                    LogDate DATE NOT NULL,
+                    MealType VARCHAR(20) NOT NULL,
+                    LogCount INT NOT NULL DEFAULT 0,
+                    TotalCalories DECIMAL(14, 4) NOT NULL DEFAULT 0,
+                    TotalProtein DECIMAL(14, 4) NOT NULL DEFAULT 0,
+                    TotalCarbs DECIMAL(14, 4) NOT NULL DEFAULT 0,
+                    TotalFat DECIMAL(14, 4) NOT NULL DEFAULT 0,
+                    TotalSugar DECIMAL(14, 4) NOT NULL DEFAULT 0,
+                    TotalFiber DECIMAL(14, 4) NOT NULL DEFAULT 0,
+                    UpdatedAt DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+                    PRIMARY KEY (UserID, LogDate, MealType)
+                )
+            """,
+            reverse_sql="DROP TABLE dailynutritionsummary",
+        ),
+        migrations.RunSQL(
+            sql="""
+                INSERT INTO dailynutritionsummary
+                (UserID, LogDate, MealType, LogCount, TotalCalories, TotalProtein,
+                 TotalCarbs, TotalFat, TotalSugar, TotalFiber)
+                SELECT ufl.UserID, DATE(ufl.LogDateTime), ufl.MealType, COUNT(*),
+                       SUM((ufl.Quantity / af.Quantity) * af.Calories),
+                       SUM((ufl.Quantity / af.Quantity) * af.Protein),
+                       SUM((ufl.Quantity / af.Quantity) * af.Carbs),
+                       SUM((ufl.Quantity / af.Quantity) * af.Fat),
+                       SUM((ufl.Quantity / af.Quantity) * af.Sugar),
+                       SUM((ufl.Quantity / af.Quantity) * af.Fiber)
+                FROM userfoodlog ufl
+                INNER JOIN allfood af ON ufl.FoodID = af.FoodID
+                GROUP BY ufl.UserID, DATE(ufl.LogDateTime), ufl.MealType
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
@@ -0,0 +1,20 @@
+# nutrition/migrations/0003_allfood_name_index.py
+#
+# Backs keyset pagination in FoodDatabase.get_foods_page: ORDER BY
+# (FoodName, FoodID) with a "greater than last row" predicate.
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nutrition', '0002_dailynutritionsummary'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql="CREATE INDEX idx_allfood_name_id ON allfood (FoodName, FoodID)",
+            reverse_sql="DROP INDEX idx_allfood_name_id ON allfood",
+        ),
+    ]
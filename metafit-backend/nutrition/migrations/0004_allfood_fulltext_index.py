@@ -0,0 +1,26 @@
+# nutrition/migrations/0004_allfood_fulltext_index.py
+#
+# ngram FULLTEXT index for food search. InnoDB keeps it in sync with
+# INSERT/UPDATE/DELETE on allfood. Stopwords are disabled for the index:
+# with the ngram parser any token containing a stopword such as "a" would
+# otherwise be dropped.
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nutrition', '0003_allfood_name_index'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql=[
+                "SET SESSION innodb_ft_enable_stopword = 0",
+                "ALTER TABLE allfood ADD FULLTEXT INDEX ft_allfood_name_brand (FoodName, BrandName) WITH PARSER ngram",
+                "SET SESSION innodb_ft_enable_stopword = 1",
+            ],
+            reverse_sql="ALTER TABLE allfood DROP INDEX ft_allfood_name_brand",
+        ),
+    ]
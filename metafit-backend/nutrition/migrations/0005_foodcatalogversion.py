@@ -0,0 +1,28 @@
+# nutrition/migrations/0005_foodcatalogversion.py
+#
+# Single-row counter bumped by every allfood write so each worker's
+# catalog cache knows when to reload.
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nutrition', '0004_allfood_fulltext_index'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql=[
+                """
+                CREATE TABLE foodcatalogversion (
+                    ID TINYINT NOT NULL PRIMARY KEY,
+                    Version BIGINT NOT NULL DEFAULT 1
+                )
+                """,
+                "INSERT INTO foodcatalogversion (ID, Version) VALUES (1, 1)",
+            ],
+            reverse_sql="DROP TABLE foodcatalogversion",
+        ),
+    ]
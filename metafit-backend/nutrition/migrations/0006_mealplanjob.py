@@ -0,0 +1,38 @@
+# nutrition/migrations/0006_mealplanjob.py
+#
+# DB-backed queue for asynchronous meal plan generation. Rows are claimed
+# by `python manage.py run_meal_plan_worker`; finished plans are stored in
+# Result.
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nutrition', '0005_foodcatalogversion'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql="""
+                CREATE TABLE mealplanjob (
+                    JobID BIGINT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+                    UserID INT NOT NULL,
+                    Status VARCHAR(20) NOT NULL DEFAULT 'queued',
+                    Request JSON NOT NULL,
+                    DaysCompleted TINYINT NOT NULL DEFAULT 0,
+                    TotalDays TINYINT NOT NULL DEFAULT 7,
+                    Attempts INT NOT NULL DEFAULT 0,
+                    Result JSON NULL,
+                    Error TEXT NULL,
+                    CreatedAt DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                    StartedAt DATETIME NULL,
+                    FinishedAt DATETIME NULL,
+                    INDEX idx_mealplanjob_status (Status, JobID),
+                    INDEX idx_mealplanjob_user (UserID, JobID)
+                )
+            """,
+            reverse_sql="DROP TABLE mealplanjob",
+        ),
+    ]
@@ -0,0 +1,48 @@
+# nutrition/migrations/0007_mealplan.py
+#
+# Saved meal plans, one per user and start date. Items are stored as food
+# IDs and quantities only; names and nutrition are rebuilt from the food
+# catalog on read (nutrition.services.plan_codec).
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nutrition', '0006_mealplanjob'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql="""
+                CREATE TABLE mealplan (
+                    PlanID BIGINT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+                    UserID INT NOT NULL,
+                    StartDate DATE NOT NULL,
+                    Days TINYINT NOT NULL DEFAULT 7,
+                    CalorieTarget INT NOT NULL,
+                    Gender VARCHAR(10) NOT NULL,
+                    CustomMacros JSON NULL,
+                    CreatedAt DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                    UpdatedAt DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+                    UNIQUE KEY uq_mealplan_user_startdate (UserID, StartDate)
+                )
+            """,
+            reverse_sql="DROP TABLE mealplan",
+        ),
+        migrations.RunSQL(
+            sql="""
+                CREATE TABLE mealplanitem (
+                    PlanID BIGINT NOT NULL,
+                    DayNumber TINYINT NOT NULL,
+                    MealType ENUM('breakfast', 'lunch', 'dinner', 'snack') NOT NULL,
+                    Position TINYINT NOT NULL,
+                    FoodID INT NOT NULL,
+                    Quantity DECIMAL(10, 2) NOT NULL,
+                    PRIMARY KEY (PlanID, DayNumber, MealType, Position)
+                )
+            """,
+            reverse_sql="DROP TABLE mealplanitem",
+        ),
+    ]
@@ -0,0 +1,20 @@
+# nutrition/migrations/0008_mealplanjob_heartbeat.py
+#
+# Running jobs refresh HeartbeatAt on every progress write; only jobs whose
+# heartbeat has gone quiet are treated as orphaned by a dead worker.
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nutrition', '0007_mealplan'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql="ALTER TABLE mealplanjob ADD COLUMN HeartbeatAt DATETIME NULL AFTER StartedAt",
+            reverse_sql="ALTER TABLE mealplanjob DROP COLUMN HeartbeatAt",
+        ),
+    ]
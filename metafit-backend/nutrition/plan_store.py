@@ -0,0 +1,169 @@
+# nutrition/plan_store.py
+
+from datetime import datetime, time, timedelta
+import logging
+
+from .database import FoodDatabase, MealPlanDatabase, UserFoodLogDatabase
+from .services.plan_codec import MealPlanCodec
+
+logger = logging.getLogger(__name__)
+
+# Log times for applied plan days when the client gives none
+PLAN_MEAL_TIMES = {
+    'breakfast': time(8, 0),
+    'lunch': time(13, 0),
+    'snack': time(16, 0),
+    'dinner': time(19, 0)
+}
+
+
+def save_meal_plan(user_id: int, meal_plan: list, calorie_target: int, gender: str,
+                   custom_macros: dict = None, start_date=None) -> int:
+    """
+    Store a plan as the user's plan for its start date (replacing any plan
+    saved for that date).
+
+    Args:
+        user_id (int): Owner
+        meal_plan (list): Day plans as returned by MealPlanGenerator.generate()
+        calorie_target (int): Daily calorie target the plan was built for
+        gender (str): 'male' or 'female'
+        custom_macros (dict): Optional custom macro targets
+        start_date (date): Optional; defaults to the date of the plan's first day
+
+    Returns:
+        int: PlanID
+
+    Raises:
+        ValueError: If the plan has no days
+    """
+    if not meal_plan:
+        raise ValueError('Meal plan has no days')
+
+    if start_date is None:
+        first_day = min(meal_plan, key=lambda day_plan: day_plan['day'])
+        first_date = datetime.strptime(str(first_day['date']), '%Y-%m-%d').date()
+        start_date = first_date - timedelta(days=first_day['day'] - 1)
+
+    return MealPlanDatabase.save_plan(
+        user_id,
+        start_date,
+        calorie_target,
+        gender,
+        custom_macros or None,
+        MealPlanCodec.compact(meal_plan),
+        days=max(day_plan['day'] for day_plan in meal_plan)
+    )
+
+
+def load_meal_plan(plan: dict) -> dict:
+    """
+    Rebuild a saved plan (from MealPlanDatabase) against the cached food catalog.
+
+    Returns:
+        dict: Plan metadata plus meal_plan, weekly_summary, target_macros and
+        missing_food_ids (foods deleted from the catalog since the plan was saved)
+    """
+    catalog = FoodDatabase.get_catalog()
+    expanded = MealPlanCodec.expand(
+        plan['Items'],
+        catalog.get,
+        plan['StartDate'],
+        plan['CalorieTarget'],
+        plan['Gender'],
+        plan['CustomMacros'],
+        days=plan['Days']
+    )
+    if expanded['missing_food_ids']:
+        logger.warning(f"Meal plan {plan['PlanID']} references deleted foods {expanded['missing_food_ids']}")
+
+    result = plan_metadata(plan)
+    result.update(expanded)
+    return result
+
+
+def plan_metadata(plan: dict) -> dict:
+    """API representation of a saved plan's header row."""
+    return {
+        'plan_id': plan['PlanID'],
+        'user_id': plan['UserID'],
+        'start_date': plan['StartDate'],
+        'days': plan['Days'],
+        'calorie_target': plan['CalorieTarget'],
+        'gender': plan['Gender'],
+        'custom_macros': plan['CustomMacros'],
+        'created_at': plan['CreatedAt'],
+        'updated_at': plan['UpdatedAt']
+    }
+
+
+def apply_plan_day(plan: dict, day_number: int, log_datetime=None) -> dict:
+    """
+    Log every item of one day of a saved plan to userfoodlog.
+
+    All items go in with one multi-row INSERT, in the same transaction as
+    the dailynutritionsummary update (UserFoodLogDatabase.create_logs). The
+    created rows are built from the insert and the food catalog instead of
+    being selected back.
+
+    Args:
+        plan (dict): Saved plan from MealPlanDatabase.get_plan
+        day_number (int): Plan day to apply
+        log_datetime (datetime): Optional log time for every item; by default
+            each meal is logged at its PLAN_MEAL_TIMES time on the day's date
+
+    Returns:
+        dict: logs (created rows, as UserFoodLogDatabase.get_logs_by_ids),
+        log_date and missing_food_ids (items skipped because the food is gone)
+
+    Raises:
+        ValueError: If the day is not in the plan
+    """
+    if not 1 <= day_number <= plan['Days']:
+        raise ValueError(f"Day {day_number} is not in the meal plan")
+
+    day_date = plan['StartDate'] + timedelta(days=day_number - 1)
+    catalog = FoodDatabase.get_catalog()
+
+    logs = []
+    missing_food_ids = []
+    for day, meal_type, _, food_id, quantity in plan['Items']:
+        if day != day_number:
+            continue
+        food = catalog.get(food_id)
+        if food is None:
+            missing_food_ids.append(food_id)
+            continue
+        logs.append({
+            'UserID': plan['UserID'],
+            'FoodID': food_id,
+            'Quantity': quantity,
+            'Unit': food['Unit'],
+            'MealType': meal_type.capitalize(),
+            'LogDateTime': log_datetime or datetime.combine(day_date, PLAN_MEAL_TIMES[meal_type]),
+            'FoodName': food['FoodName'],
+            'BrandName': food['BrandName']
+        })
+
+    log_ids = UserFoodLogDatabase.create_logs(logs)
+
+    created = [
+        {
+            'LogID': log_id,
+            'UserID': log['UserID'],
+            'FoodID': log['FoodID'],
+            'Quantity': log['Quantity'],
+            'Unit': log['Unit'],
+            'MealType': log['MealType'],
+            'LogDateTime': log['LogDateTime'],
+            'FoodName': log['FoodName'],
+            'BrandName': log['BrandName']
+        }
+        for log_id, log in zip(log_ids, logs)
+    ]
+
+    return {
+        'logs': created,
+        'log_date': log_datetime.date() if log_datetime else day_date,
+        'missing_food_ids': sorted(set(missing_food_ids))
+    }
@@ -181,6 +181,31 @@ class DateRangeSerializer(serializers.Serializer):
         return data
 
 
+class SummaryRangeSerializer(serializers.Serializer):
+    """Serializer for multi-day summary queries"""
+    MAX_RANGE_DAYS = 90
+
+    user_id = serializers.IntegerField(required=True)
+    start_date = serializers.DateField(required=True)
+    end_date = serializers.DateField(required=True)
+    by_meal_type = serializers.BooleanField(default=False)
+
+    def validate(self, data):
+        """Validate date range order and length"""
+        start_date = data['start_date']
+        end_date = data['end_date']
+
+        if start_date > end_date:
+            raise serializers.ValidationError(
+                "start_date must be before or equal to end_date"
+            )
+        if (end_date - start_date).days + 1 > self.MAX_RANGE_DAYS:
+            raise serializers.ValidationError(
+                f"Date range cannot exceed {self.MAX_RANGE_DAYS} days"
+            )
+        return data
+
+
 class MealTypeFilterSerializer(serializers.Serializer):
     """Serializer for filtering by meal type"""
     user_id = serializers.IntegerField(required=True)
@@ -202,6 +227,44 @@ class MealPlanRequestSerializer(serializers.Serializer):
         required=False,
         allow_null=True
     )
+    strategy = serializers.ChoiceField(
+        choices=['greedy', 'lp'],
+        default='greedy',
+        required=False
+    )
+    refinement = serializers.ChoiceField(
+        choices=['none', 'hill_climb', 'annealing'],
+        default='none',
+        required=False
+    )
+    refinement_iterations = serializers.IntegerField(
+        required=False,
+        min_value=1,
+        max_value=20000
+    )
+    deadline_ms = serializers.IntegerField(
+        required=False,
+        min_value=50
+    )
+    stream = serializers.ChoiceField(
+        choices=['none', 'ndjson', 'sse'],
+        default='none',
+        required=False
+    )
+    seed = serializers.IntegerField(required=False, min_value=0)
+    starts = serializers.IntegerField(default=1, required=False, min_value=1, max_value=16)
+    fresh = serializers.BooleanField(default=False, required=False)
+    scoring = serializers.ChoiceField(
+        choices=['calorie', 'macro'],
+        default='calorie',
+        required=False
+    )
+    score_weights = serializers.DictField(
+        child=serializers.FloatField(min_value=0),
+        required=False,
+        allow_null=True
+    )
+    save = serializers.BooleanField(default=False, required=False)
 
     def validate_calorie_target(self, value):
         if value < 1000 or value > 5000:
@@ -213,6 +276,20 @@ class MealPlanRequestSerializer(serializers.Serializer):
             raise serializers.ValidationError("Gender must be 'male' or 'female'.")
         return value.lower()
 
+    def validate(self, data):
+        """Validate score weight names against the scoring mode"""
+        score_weights = data.get('score_weights') or {}
+        unknown = set(score_weights) - {'calorie', 'variety', 'macro'}
+        if unknown:
+            raise serializers.ValidationError({
+                'score_weights': f"Unknown weights: {', '.join(sorted(unknown))}. Use calorie, variety or macro."
+            })
+        if score_weights.get('macro') and data.get('scoring', 'calorie') != 'macro':
+            raise serializers.ValidationError({
+                'score_weights': "A macro weight requires scoring 'macro'."
+            })
+        return data
+
 
 class MealItemSerializer(serializers.Serializer):
     """Serializer for individual meal items."""
@@ -264,14 +341,27 @@ class ValidationResultSerializer(serializers.Serializer):
     variance = VarianceSerializer()
 
 
+class DayPlanListSerializer(serializers.ListSerializer):
+    """Serializer for a plan's days; each day may appear only once."""
+
+    def validate(self, attrs):
+        days = [day_plan['day'] for day_plan in attrs]
+        if len(set(days)) != len(days):
+            raise serializers.ValidationError("Each day may appear only once in a meal plan.")
+        return attrs
+
+
 class DayPlanSerializer(serializers.Serializer):
     """Serializer for a single day's meal plan."""
-    day = serializers.IntegerField()
+    day = serializers.IntegerField(min_value=1, max_value=7)
     date = serializers.CharField()
     meals = MealTypeSerializer()
     daily_totals = DailyTotalsSerializer()
     validation = ValidationResultSerializer()
 
+    class Meta:
+        list_serializer_class = DayPlanListSerializer
+
 
 class TargetMacrosSerializer(serializers.Serializer):
     """Serializer for target macros."""
@@ -294,6 +384,7 @@ class WeeklySummarySerializer(serializers.Serializer):
     total_warnings = serializers.IntegerField()
     weekly_totals = DailyTotalsSerializer()
     weekly_averages = DailyTotalsSerializer()
+    macro_variance = serializers.FloatField(required=False)
 
 
 class MealPlanResponseSerializer(serializers.Serializer):
@@ -305,5 +396,110 @@ class MealPlanResponseSerializer(serializers.Serializer):
     variety_stats = serializers.DictField(
         child=serializers.IntegerField()
     )
+    refinement = serializers.DictField(required=False)
+    stopped_early = serializers.BooleanField(required=False)
+    elapsed_ms = serializers.FloatField(required=False)
+    cached = serializers.BooleanField(required=False)
+    seed = serializers.IntegerField(required=False)
+    multi_start = serializers.DictField(required=False)
+    scoring = serializers.DictField(required=False)
+    replanned = serializers.DictField(required=False)
+    plan_id = serializers.IntegerField(required=False)
     
-    log_date = serializers.DateField(required=False)
\ No newline at end of file
+    log_date = serializers.DateField(required=False)
+
+
+class MealPlanSummarySerializer(serializers.Serializer):
+    """Serializer for the final event of a streamed meal plan."""
+    weekly_summary = WeeklySummarySerializer()
+    target_macros = TargetMacrosSerializer()
+    variety_stats = serializers.DictField(
+        child=serializers.IntegerField()
+    )
+    refinement = serializers.DictField(required=False)
+    stopped_early = serializers.BooleanField(required=False)
+    elapsed_ms = serializers.FloatField(required=False)
+    seed = serializers.IntegerField(required=False)
+    scoring = serializers.DictField(required=False)
+
+
+class MealPlanReplanSerializer(MealPlanRequestSerializer):
+    """
+    Serializer for replanning one day or meal of a plan.
+
+    Takes the same generation settings as a meal plan request, plus the plan
+    itself (meal_plan), a finished meal plan job to take it from (job_id) or
+    a saved plan (plan_id). A saved plan brings its own calorie_target,
+    gender and custom_macros, so those are only accepted without plan_id.
+    """
+    calorie_target = serializers.IntegerField(required=False, min_value=1000, max_value=5000)
+    gender = serializers.ChoiceField(choices=['male', 'female'], required=False)
+    day = serializers.IntegerField(required=True, min_value=1, max_value=7)
+    meal_type = serializers.ChoiceField(
+        choices=['breakfast', 'lunch', 'dinner', 'snack'],
+        required=False,
+        allow_null=True
+    )
+    meal_plan = DayPlanSerializer(many=True, required=False)
+    job_id = serializers.IntegerField(required=False)
+    plan_id = serializers.IntegerField(required=False)
+
+    def validate(self, data):
+        """Validate that exactly one plan source is given, with the plan settings it needs"""
+        data = super().validate(data)
+        if sum(1 for key in ('meal_plan', 'job_id', 'plan_id') if key in data) != 1:
+            raise serializers.ValidationError("Provide one of meal_plan, job_id or plan_id.")
+        settings_given = [key for key in ('calorie_target', 'gender', 'custom_macros') if key in data]
+        if 'plan_id' in data and settings_given:
+            raise serializers.ValidationError(
+                f"{', '.join(settings_given)} cannot be changed on replan; plan_id uses the saved plan's settings."
+            )
+        if 'plan_id' not in data and ('calorie_target' not in data or 'gender' not in data):
+            raise serializers.ValidationError(
+                "calorie_target and gender are required with meal_plan or job_id."
+            )
+        return data
+
+
+class SavedMealPlanSerializer(serializers.Serializer):
+    """
+    Serializer for saving a meal plan.
+
+    The plan is submitted with the settings it was generated with, or taken
+    (with its settings) from a succeeded meal plan job.
+    """
+    user_id = serializers.IntegerField(required=True)
+    start_date = serializers.DateField(required=False)
+    calorie_target = serializers.IntegerField(required=False, min_value=1000, max_value=5000)
+    gender = serializers.ChoiceField(choices=['male', 'female'], required=False)
+    custom_macros = serializers.DictField(
+        child=serializers.FloatField(),
+        required=False,
+        allow_null=True
+    )
+    meal_plan = DayPlanSerializer(many=True, required=False)
+    job_id = serializers.IntegerField(required=False)
+
+    def validate(self, data):
+        """Validate the plan source and that submitted plans carry their settings"""
+        if ('meal_plan' in data) == ('job_id' in data):
+            raise serializers.ValidationError("Provide either meal_plan or job_id.")
+        if 'meal_plan' in data and ('calorie_target' not in data or 'gender' not in data):
+            raise serializers.ValidationError(
+                "calorie_target and gender are required with meal_plan."
+            )
+        return data
+
+
+class SavedMealPlanQuerySerializer(serializers.Serializer):
+    """Serializer for listing saved meal plans"""
+    user_id = serializers.IntegerField(required=True)
+    start_date = serializers.DateField(required=False)
+    limit = serializers.IntegerField(default=20, min_value=1, max_value=100)
+    offset = serializers.IntegerField(default=0, min_value=0)
+
+
+class ApplyPlanDaySerializer(serializers.Serializer):
+    """Serializer for logging a saved plan day to the food log"""
+    user_id = serializers.IntegerField(required=True)
+    log_datetime = serializers.DateTimeField(required=False)
@@ -0,0 +1,159 @@
+# nutrition/services/candidate_index.py
+
+from bisect import bisect_left
+
+try:
+    import numpy as np
+except ImportError:  # Only best_position (vectorized scoring) needs NumPy
+    np = None
+
+
+class CandidateIndex:
+    """
+    Catalog index for picking the best-scoring food without scoring them all.
+
+    Foods are sorted by calories per base quantity, which is what the calorie
+    fit in MealPlanGenerator._score_food compares against the remaining
+    calories. A lookup bisects to the remaining calories and walks outwards,
+    stopping once no food further away can beat the best score found:
+
+        score <= calorie_weight * calorie_fit + max_bonus
+
+    where calorie_fit only falls as the distance grows. Each food's smallest
+    portion (per MealPlanCatalog.portion_bounds) is precomputed too, so
+    foods whose minimum portion already overshoots the remaining calories
+    are skipped without scoring.
+
+    best_position does the same pruning for vectorized scoring, scoring a
+    window of foods around the remaining calories in one NumPy pass and
+    widening it until the bound rules out everything outside.
+    """
+
+    # Slack for the rounding of portions and item calories
+    PORTION_ROUNDING = 0.01
+    # Float error allowed between the bound and a real score
+    SCORE_TOLERANCE = 1e-9
+    # Foods on each side of the remaining calories in best_position's first window
+    WINDOW = 128
+
+    def __init__(self, food_ids, food_stats, portion_bounds):
+        """
+        Build the index.
+
+        Args:
+            food_ids (list): Catalog food IDs; ties between equal scores go to the earlier one
+            food_stats (dict): {food_id: stats} from MealPlanGenerator._compute_food_stats
+            portion_bounds (callable): food_id -> (min_quantity, max_quantity)
+        """
+        order = sorted(range(len(food_ids)), key=lambda i: food_stats[food_ids[i]]['calories'])
+
+        self.food_ids = [food_ids[i] for i in order]
+        self.ranks = order
+        self.calories = [food_stats[food_id]['calories'] for food_id in self.food_ids]
+        self.min_portion_calories = [
+            food_stats[food_id]['calorie_density'] * portion_bounds(food_id)[0]
+            for food_id in self.food_ids
+        ]
+        if np is not None:
+            self.rank_array = np.array(self.ranks, dtype=np.intp)
+            self.calorie_array = np.array(self.calories, dtype=np.float64)
+
+    def best(self, remaining_calories, is_candidate, score, calorie_weight, max_bonus):
+        """
+        Find the highest-scoring candidate for the remaining calories.
+
+        Args:
+            remaining_calories (float): Calories left in the meal
+            is_candidate (callable): food_id -> bool (variety rules, meal filters)
+            score (callable): food_id -> score, as MealPlanGenerator._score_food
+            calorie_weight (float): Weight of the calorie fit in the score
+            max_bonus (float): Upper bound on the rest of the score (variety, jitter)
+
+        Returns:
+            int: Best food ID, or None if no food qualifies
+        """
+        remaining = float(remaining_calories)
+        max_min_portion = remaining + self.PORTION_ROUNDING
+        calories = self.calories
+
+        right = bisect_left(calories, remaining)
+        left = right - 1
+        best_id = None
+        best_score = None
+        best_rank = None
+
+        while left >= 0 or right < len(calories):
+            # Step to whichever side is closer to the remaining calories
+            if right >= len(calories) or (left >= 0 and remaining - calories[left] <= calories[right] - remaining):
+                i = left
+                left -= 1
+            else:
+                i = right
+                right += 1
+
+            if best_score is not None:
+                # Foods are visited by increasing distance, so no later one scores higher
+                calorie_fit = max(0.0, 1.0 - abs(calories[i] - remaining) / (remaining + 1))
+                if calorie_weight * calorie_fit + max_bonus < best_score - self.SCORE_TOLERANCE:
+                    break
+
+            if self.min_portion_calories[i] > max_min_portion:
+                continue
+
+            food_id = self.food_ids[i]
+            if not is_candidate(food_id):
+                continue
+
+            food_score = score(food_id)
+            rank = self.ranks[i]
+            if best_score is None or food_score > best_score or (food_score == best_score and rank < best_rank):
+                best_id = food_id
+                best_score = food_score
+                best_rank = rank
+
+        return best_id
+
+    def best_position(self, remaining_calories, score_positions, calorie_weight, max_bonus):
+        """
+        Find the highest-scoring candidate with vectorized scoring.
+
+        Args:
+            remaining_calories (float): Calories left in the meal
+            score_positions (callable): Array of catalog positions -> array of
+                scores, -inf for foods that are not candidates
+            calorie_weight (float): Weight of the calorie fit in the score
+            max_bonus (float): Upper bound on the rest of the score (variety, macro fit, jitter)
+
+        Returns:
+            int: Catalog position of the best food (the first one on ties, like
+            numpy.argmax over the whole catalog), or None if no food qualifies
+        """
+        remaining = float(remaining_calories)
+        calories = self.calorie_array
+        count = len(calories)
+        center = bisect_left(self.calories, remaining)
+
+        half = self.WINDOW
+        while True:
+            low = max(0, center - half)
+            high = min(count, center + half)
+            positions = self.rank_array[low:high]
+            scores = score_positions(positions)
+            best_score = scores.max() if high > low else -np.inf
+            if low == 0 and high == count:
+                break
+
+            if best_score > -np.inf:
+                # Nearest calories outside the window bound every score outside it
+                distance = min(
+                    remaining - calories[low - 1] if low > 0 else np.inf,
+                    calories[high] - remaining if high < count else np.inf
+                )
+                calorie_fit = max(0.0, 1.0 - distance / (remaining + 1))
+                if calorie_weight * calorie_fit + max_bonus < best_score - self.SCORE_TOLERANCE:
+                    break
+            half *= 4
+
+        if best_score == -np.inf:
+            return None
+        return int(positions[scores == best_score].min())
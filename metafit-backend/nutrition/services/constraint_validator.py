@@ -247,7 +247,8 @@ class ConstraintValidator:
                     'total_errors': int,
                     'total_warnings': int,
                     'weekly_totals': {...},
-                    'weekly_averages': {...}
+                    'weekly_averages': {...},
+                    'macro_variance': float
                 }
         """
         
@@ -286,9 +287,31 @@ class ConstraintValidator:
             'total_errors': total_errors,
             'total_warnings': total_warnings,
             'weekly_totals': weekly_totals,
-            'weekly_averages': weekly_averages
+            'weekly_averages': weekly_averages,
+            'macro_variance': ConstraintValidator.weekly_macro_variance(daily_results)
         }
 
+    @staticmethod
+    def weekly_macro_variance(daily_results):
+        """
+        Mean squared percentage variance of calories, protein, carbs and fat
+        across all days (0 = every day hits every target exactly).
+
+        Args:
+            daily_results (list): Daily validation results
+
+        Returns:
+            float: Mean of squared variance percentages
+        """
+        squares = [
+            value ** 2
+            for result in daily_results
+            for value in result['variance'].values()
+        ]
+        if not squares:
+            return 0.0
+        return round(sum(squares) / len(squares), 4)
+
 
 # Example usage (for testing):
 if __name__ == "__main__":
@@ -0,0 +1,296 @@
+# nutrition/services/lp_solver.py
+
+try:
+    import numpy as np
+    from scipy.optimize import milp, LinearConstraint, Bounds
+except ImportError:  # SciPy is optional; only the 'lp' strategy needs it
+    np = None
+    milp = None
+
+
+class LPMealSolver:
+    """
+    Builds each day of a meal plan as a mixed-integer linear program.
+
+    Variables, for every meal m and candidate food j:
+        x[m, j]: grams of food j in meal m (continuous)
+        y[m, j]: 1 if food j is used in meal m (binary)
+
+    Constraints:
+        - Portion bounds from MealPlanGenerator._calculate_quantity when used
+          (5-100 g for foods >= 4 kcal/g, 20-500 g otherwise), 0 g when not
+        - 1 to MAX_ITEMS_PER_MEAL foods per meal, each food at most once per day
+        - No foods above 6 kcal/g in the snack
+        - Candidates already respect VarietyManager rules for the day
+
+    Objective (each deviation normalised by its target):
+        daily calories, protein, carbs and fat vs. MacroCalculator targets,
+        fiber shortfall, sugar excess and each meal's calorie share.
+    """
+
+    DEFAULT_TIME_LIMIT = 0.5  # seconds per day
+    MIP_REL_GAP = 0.02  # stop once within 2% of the best possible objective
+    CANDIDATE_POOL_SIZE = 24
+    MAX_ITEMS_PER_MEAL = 2
+
+    DAILY_TARGETS = [
+        ('calories', 'calorie_target'),
+        ('protein', 'protein'),
+        ('carbs', 'carbs'),
+        ('fat', 'fat')
+    ]
+
+    def __init__(self, generator, time_limit=None, pool_size=None):
+        """
+        Initialize the solver for one generator.
+
+        Args:
+            generator (MealPlanGenerator): Provides catalog arrays, targets and variety state
+            time_limit (float): Solver time limit per day in seconds
+            pool_size (int): Number of candidate foods considered per day
+        """
+        if milp is None:
+            raise ValueError("The 'lp' strategy requires SciPy")
+
+        self.generator = generator
+        self.weights = generator.OBJECTIVE_WEIGHTS
+        self.time_limit = time_limit or self.DEFAULT_TIME_LIMIT
+        self.pool_size = pool_size or self.CANDIDATE_POOL_SIZE
+
+    def solve_day(self, day_number, time_limit=None):
+        """
+        Solve one day and register the chosen foods with the generator.
+
+        Args:
+            day_number (int): Day 1-7
+            time_limit (float): Optional cap on this solve's time limit in seconds
+
+        Returns:
+            dict: {meal_type: [meal items]}, or None if no solution was found
+        """
+        generator = self.generator
+        pool = self._select_candidates(day_number)
+        if len(pool) < len(generator.MEAL_TYPES):
+            return None
+
+        problem = self._build_problem(pool)
+        result = milp(
+            problem['c'],
+            constraints=LinearConstraint(problem['A'], problem['lb'], problem['ub']),
+            integrality=problem['integrality'],
+            bounds=Bounds(problem['var_lb'], problem['var_ub']),
+            options={
+                'time_limit': min(self.time_limit, time_limit) if time_limit else self.time_limit,
+                'mip_rel_gap': self.MIP_REL_GAP
+            }
+        )
+        if result.x is None:
+            return None
+
+        x = result.x
+        pool_count = len(pool)
+        meals = {}
+        for m, meal_type in enumerate(generator.MEAL_TYPES):
+            meal_items = []
+            for j, position in enumerate(pool):
+                k = m * pool_count + j
+                quantity = round(float(x[k]), 2)
+                if x[problem['y_offset'] + k] < 0.5 or quantity <= 0:
+                    continue
+
+                food_id = generator.food_ids[position]
+                meal_items.append(generator._create_meal_item(generator.foods_by_id[food_id], quantity))
+                generator._register_food(food_id, day_number)
+            meals[meal_type] = meal_items
+
+        return meals
+
+    def _select_candidates(self, day_number):
+        """
+        Pick the candidate pool for a day from foods the variety rules allow.
+
+        Ranks by how closely a food's protein/carbs/fat energy split matches the
+        targets (plus variety and any seeded jitter), then adds the most protein-dense and the best
+        snack-eligible foods so the solver has something to balance with.
+
+        Returns:
+            list: Catalog positions of candidate foods
+        """
+        generator = self.generator
+        variety_manager = generator.variety_manager
+        arrays = generator.food_arrays
+        targets = generator.target_macros
+
+        available = (
+            variety_manager.available_mask(day_number)
+            & (arrays['calories'] > 0)
+            & (arrays['quantity'] > 0)
+        )
+        positions = np.flatnonzero(available)
+        if positions.size == 0:
+            return []
+
+        energy_split = np.stack([
+            arrays['protein'][positions] * 4,
+            arrays['carbs'][positions] * 4,
+            arrays['fat'][positions] * 9
+        ], axis=1)
+        target_split = np.array([targets['protein'] * 4, targets['carbs'] * 4, targets['fat'] * 9])
+        norms = np.linalg.norm(energy_split, axis=1) * np.linalg.norm(target_split)
+        alignment = np.divide(
+            energy_split @ target_split, norms,
+            out=np.zeros(len(positions)), where=norms > 0
+        )
+        variety = np.clip(1.0 - variety_manager.usage_counts[positions] / variety_manager.max_repetitions, 0, 1)
+        ranking = (alignment * 0.6) + (variety * 0.4)
+        if 'jitter' in arrays:
+            ranking = ranking + arrays['jitter'][positions]
+
+        extra = max(1, self.pool_size // 4)
+        protein_density = arrays['protein'][positions] / arrays['calories'][positions]
+        snack_ok = arrays['calorie_density'][positions] < 6.0
+
+        ordered = [
+            positions[np.argsort(-ranking, kind='stable')[:self.pool_size]],
+            positions[np.argsort(-protein_density, kind='stable')[:extra]],
+            positions[snack_ok][np.argsort(-ranking[snack_ok], kind='stable')[:extra]]
+        ]
+
+        pool = []
+        seen = set()
+        for group in ordered:
+            for position in group.tolist():
+                if position not in seen:
+                    seen.add(position)
+                    pool.append(position)
+        return pool
+
+    def _build_problem(self, pool):
+        """
+        Assemble the MILP matrices for a candidate pool.
+
+        Variable layout: x (M*J), y (M*J), meal share deviations (2*M),
+        daily target deviations (2*4), fiber shortfall, sugar excess.
+
+        Returns:
+            dict: c, A, lb, ub, var_lb, var_ub, integrality and y_offset
+        """
+        generator = self.generator
+        arrays = generator.food_arrays
+        targets = generator.target_macros
+        meal_count = len(generator.MEAL_TYPES)
+        pool_count = len(pool)
+        pool = np.asarray(pool)
+
+        quantity = arrays['quantity'][pool]
+        per_gram = {
+            field: arrays[field][pool] / quantity
+            for field in ['calories', 'protein', 'carbs', 'fat', 'fiber', 'sugar']
+        }
+        density = arrays['calorie_density'][pool]
+        portion_min = np.where(density >= 4.0, 5.0, 20.0)
+        portion_max = np.where(density >= 4.0, 100.0, 500.0)
+
+        x_count = meal_count * pool_count
+        y_offset = x_count
+        share_offset = 2 * x_count
+        daily_offset = share_offset + 2 * meal_count
+        fiber_index = daily_offset + 2 * len(self.DAILY_TARGETS)
+        sugar_index = fiber_index + 1
+        var_count = sugar_index + 1
+
+        var_lb = np.zeros(var_count)
+        var_ub = np.full(var_count, np.inf)
+        integrality = np.zeros(var_count)
+        integrality[y_offset:y_offset + x_count] = 1
+        var_ub[y_offset:y_offset + x_count] = 1
+
+        snack_index = generator.MEAL_TYPES.index('snack')
+        for m in range(meal_count):
+            block = slice(m * pool_count, (m + 1) * pool_count)
+            var_ub[block] = portion_max
+            if m == snack_index:
+                too_dense = density >= 6.0
+                var_ub[block][too_dense] = 0
+                var_ub[y_offset + m * pool_count:y_offset + (m + 1) * pool_count][too_dense] = 0
+
+        rows = []
+        lower = []
+        upper = []
+
+        def add_row(coefficients, low, high):
+            row = np.zeros(var_count)
+            for index, value in coefficients:
+                row[index] = value
+            rows.append(row)
+            lower.append(low)
+            upper.append(high)
+
+        # Portion bounds: lo * y <= x <= hi * y
+        for m in range(meal_count):
+            for j in range(pool_count):
+                k = m * pool_count + j
+                add_row([(k, 1.0), (y_offset + k, -portion_max[j])], -np.inf, 0)
+                add_row([(k, 1.0), (y_offset + k, -portion_min[j])], 0, np.inf)
+
+        # 1..MAX_ITEMS_PER_MEAL foods per meal
+        for m in range(meal_count):
+            add_row(
+                [(y_offset + m * pool_count + j, 1.0) for j in range(pool_count)],
+                1, self.MAX_ITEMS_PER_MEAL
+            )
+
+        # Each food at most once per day
+        for j in range(pool_count):
+            add_row([(y_offset + m * pool_count + j, 1.0) for m in range(meal_count)], -np.inf, 1)
+
+        # Meal calorie share: calories - over + under = meal target
+        for m, meal_type in enumerate(generator.MEAL_TYPES):
+            meal_target = generator.calorie_target * generator.CALORIES_PER_MEAL[meal_type]
+            coefficients = [(m * pool_count + j, per_gram['calories'][j]) for j in range(pool_count)]
+            coefficients += [(share_offset + 2 * m, -1.0), (share_offset + 2 * m + 1, 1.0)]
+            add_row(coefficients, meal_target, meal_target)
+
+        # Daily targets: total - over + under = target
+        for t, (field, target_key) in enumerate(self.DAILY_TARGETS):
+            coefficients = [
+                (m * pool_count + j, per_gram[field][j])
+                for m in range(meal_count) for j in range(pool_count)
+            ]
+            coefficients += [(daily_offset + 2 * t, -1.0), (daily_offset + 2 * t + 1, 1.0)]
+            add_row(coefficients, targets[target_key], targets[target_key])
+
+        # Fiber: total + shortfall >= minimum
+        coefficients = [
+            (m * pool_count + j, per_gram['fiber'][j])
+            for m in range(meal_count) for j in range(pool_count)
+        ]
+        add_row(coefficients + [(fiber_index, 1.0)], targets['fiber_min'], np.inf)
+
+        # Sugar: total - excess <= maximum
+        coefficients = [
+            (m * pool_count + j, per_gram['sugar'][j])
+            for m in range(meal_count) for j in range(pool_count)
+        ]
+        add_row(coefficients + [(sugar_index, -1.0)], -np.inf, targets['sugar_max'])
+
+        # Objective: weighted deviations relative to their targets
+        c = np.zeros(var_count)
+        for m, meal_type in enumerate(generator.MEAL_TYPES):
+            meal_target = generator.calorie_target * generator.CALORIES_PER_MEAL[meal_type]
+            c[share_offset + 2 * m:share_offset + 2 * m + 2] = self.weights['meal_share'] / max(meal_target, 1)
+        for t, (field, target_key) in enumerate(self.DAILY_TARGETS):
+            c[daily_offset + 2 * t:daily_offset + 2 * t + 2] = self.weights[field] / max(targets[target_key], 1)
+        c[fiber_index] = self.weights['fiber'] / max(targets['fiber_min'], 1)
+        c[sugar_index] = self.weights['sugar'] / max(targets['sugar_max'], 1)
+
+        return {
+            'c': c,
+            'A': np.array(rows),
+            'lb': np.array(lower),
+            'ub': np.array(upper),
+            'var_lb': var_lb,
+            'var_ub': var_ub,
+            'integrality': integrality,
+            'y_offset': y_offset
+        }
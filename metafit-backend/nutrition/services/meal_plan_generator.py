@@ -1,10 +1,22 @@
 # nutrition/services/meal_plan_generator.py
 
+import copy
+import math
 import random
+import threading
+import time
 from datetime import datetime, timedelta
 from .macro_calculator import MacroCalculator
-from .variety_manager import VarietyManager
+from .variety_manager import VarietyManager, CompactVarietyManager
 from .constraint_validator import ConstraintValidator
+from .lp_solver import LPMealSolver
+from .plan_refiner import PlanRefiner
+from .candidate_index import CandidateIndex
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; scoring falls back to pure Python
+    np = None
 
 
 class MealPlanGenerator:
@@ -20,17 +32,101 @@ class MealPlanGenerator:
         'snack': 0.10       # 10% of daily calories
     }
 
-    def __init__(self, foods_list, calorie_target, gender, custom_macros=None):
+    # Nutrient columns held as contiguous float arrays for vectorized scoring
+    ARRAY_FIELDS = ['calories', 'quantity', 'protein', 'carbs', 'fat', 'fiber', 'sugar']
+
+    STRATEGIES = ['greedy', 'lp']
+
+    # Day objective shared by the LP strategy and PlanRefiner: each deviation
+    # from its target is normalised by the target and weighted
+    OBJECTIVE_WEIGHTS = {
+        'calories': 4.0,
+        'protein': 2.0,
+        'carbs': 1.0,
+        'fat': 1.0,
+        'fiber': 0.5,
+        'sugar': 0.5,
+        'meal_share': 0.5
+    }
+
+    # With a seed, each food gets a fixed random score bonus in [0, SCORE_JITTER)
+    # so differently seeded runs explore different plans
+    SCORE_JITTER = 0.05
+
+    # 'calorie' scores candidates on calorie fit and variety; 'macro' also
+    # scores how well a food's portion covers the day's remaining macro deficit
+    SCORING_MODES = ['calorie', 'macro']
+    SCORE_WEIGHTS = {
+        'calorie': {'calorie': 0.6, 'variety': 0.4, 'macro': 0.0},
+        'macro': {'calorie': 0.4, 'variety': 0.2, 'macro': 0.4},
+    }
+    MACRO_FIELDS = ['protein', 'carbs', 'fat']
+    # Per-food values precomputed for 'macro' scoring (see MealPlanCatalog.macro_vector)
+    MACRO_VECTOR_FIELDS = [
+        'grams_per_calorie', 'min_quantity', 'max_quantity',
+        'protein_per_gram', 'carbs_per_gram', 'fat_per_gram'
+    ]
+
+    def __init__(self, foods_list, calorie_target, gender, custom_macros=None, vectorized=None,
+                 strategy='greedy', lp_time_limit=None, refinement=None,
+                 refinement_iterations=None, refinement_time_ms=None, seed=None,
+                 scoring='calorie', score_weights=None):
         """
         Initialize meal plan generator.
 
         Args:
-            foods_list (list): List of food dictionaries from database
+            foods_list (list): List of food dictionaries from database, or a
+                MealPlanCatalog built from one (shared across generators)
             calorie_target (int): Daily calorie target
             gender (str): 'male' or 'female'
             custom_macros (dict): Optional custom macro targets
+            vectorized (bool): Score candidates with NumPy (default: when NumPy is installed)
+            strategy (str): 'greedy' (default) or 'lp' (per-day MILP, requires SciPy
+                and vectorized scoring)
+            lp_time_limit (float): Optional per-day solver time limit in seconds for 'lp'
+            refinement (str): Optional local-search pass: 'hill_climb' or 'annealing'
+            refinement_iterations (int): Maximum refinement moves to try
+            refinement_time_ms (float): Optional wall-clock budget for refinement
+            seed (int): Optional seed. Perturbs food scores and drives refinement,
+                so the same inputs, catalog and seed always give the same plan
+            scoring (str): 'calorie' (default) or 'macro' (also score against the
+                day's running protein/carbs/fat deficit)
+            score_weights (dict): Optional overrides of SCORE_WEIGHTS for the mode,
+                e.g. {'calorie': 0.3, 'macro': 0.5}; 'macro' needs scoring='macro'
         """
-        self.foods_list = foods_list
+        # Foods indexed by id with derived values per food; built once per
+        # catalog version when the caller passes a shared MealPlanCatalog
+        if not isinstance(foods_list, MealPlanCatalog):
+            foods_list = MealPlanCatalog(foods_list)
+        self.catalog = foods_list
+        self.foods_list = self.catalog.foods_list
+        self.foods_by_id = self.catalog.foods_by_id
+        self.food_stats = self.catalog.food_stats
+        self.food_ids = self.catalog.food_ids
+        self.candidate_index = self.catalog.candidate_index
+
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.food_jitter = None
+        if seed is not None:
+            self.food_jitter = {
+                food_id: self.rng.random() * self.SCORE_JITTER for food_id in self.food_ids
+            }
+        
+        if strategy not in self.STRATEGIES:
+            raise ValueError(f"Strategy must be one of {self.STRATEGIES}")
+        self.strategy = strategy
+
+        self._set_scoring(scoring, score_weights)
+
+        if vectorized is None:
+            vectorized = np is not None or strategy == 'lp'
+        if strategy == 'lp' and not vectorized:
+            raise ValueError("The 'lp' strategy requires vectorized=True")
+        if vectorized and np is None:
+            raise ValueError("Vectorized scoring requires NumPy")
+        self.vectorized = vectorized
+        
         self.calorie_target = calorie_target
         self.gender = gender
         self.custom_macros = custom_macros
@@ -39,27 +135,71 @@ class MealPlanGenerator:
         self.target_macros = MacroCalculator.calculate_macros(
             calorie_target, gender, custom_macros
         )
+
+        if self.vectorized:
+            self._build_food_arrays()
+        elif self.scoring == 'macro':
+            self.macro_vectors = self.catalog.macro_vectors()
+
+        # Running [calories, protein, carbs, fat] of the day being built ('macro' scoring)
+        self.day_macros = [0.0, 0.0, 0.0, 0.0]
         
-        # Initialize variety manager
-        self.variety_manager = VarietyManager(
-            max_repetitions=3,
-            consecutive_day_gap=1
-        )
+        # Initialize variety manager (array-backed alongside the NumPy scoring)
+        if self.vectorized:
+            self.variety_manager = CompactVarietyManager(
+                self.food_ids,
+                max_repetitions=3,
+                consecutive_day_gap=1,
+                positions=self.catalog.positions
+            )
+        else:
+            self.variety_manager = VarietyManager(
+                max_repetitions=3,
+                consecutive_day_gap=1
+            )
         
+        self.lp_solver = None
+        if strategy == 'lp':
+            self.lp_solver = LPMealSolver(self, time_limit=lp_time_limit)
+
+        self.refiner = None
+        if refinement:
+            self.refiner = PlanRefiner(
+                self,
+                method=refinement,
+                max_iterations=refinement_iterations,
+                time_budget_ms=refinement_time_ms,
+                rng=self.rng
+            )
+
         # Store results
         self.meal_plan = []
         self.daily_results = []
 
-    def generate(self, start_date=None):
+        # Anytime generation: set by generate(deadline_ms=...)
+        self.deadline = None
+        self.stopped_early = False
+
+    def generate(self, start_date=None, deadline_ms=None, progress_callback=None):
         """
         Generate a complete 7-day meal plan.
 
+        With a deadline, every day is still built, but once the budget runs out
+        the remaining days get a single greedy pass (no retries, no LP) and
+        refinement stops, so the best plan found so far is returned.
+        stopped_early is set whenever the run goes past the deadline.
+
         Args:
             start_date (datetime): Start date for the plan (default: today)
+            deadline_ms (float): Optional time budget in milliseconds
+            progress_callback (callable): Optional, called as (days_completed, total_days)
+                after each day is built
 
         Returns:
             dict: Complete meal plan with validation results
         """
+        started = self._start_generation(deadline_ms)
+
         if start_date is None:
             start_date = datetime.now()
 
@@ -70,25 +210,201 @@ class MealPlanGenerator:
             
             day_plan = self._generate_day(day, current_date)
             self.meal_plan.append(day_plan)
+            self._deadline_passed()
+
+            if progress_callback is not None:
+                progress_callback(day, 7)
+
+        # Optional local-search pass; days are re-validated once afterwards
+        refinement_stats = None
+        if self.refiner is not None:
+            refinement_stats = self.refiner.refine(deadline=self.deadline)
+            if self.deadline is not None and refinement_stats['stopped_early']:
+                self.stopped_early = True
+            for day_plan in self.meal_plan:
+                self._validate_day(day_plan)
+            self._deadline_passed()
+
+        self.daily_results = [day_plan['validation'] for day_plan in self.meal_plan]
+
+        result = {
+            'success': True,
+            'meal_plan': self.meal_plan
+        }
+        result.update(self._summarize(started, refinement_stats))
+
+        return result
+
+    def iter_generate(self, start_date=None, deadline_ms=None):
+        """
+        Generate the 7-day plan, yielding each day as soon as it is built.
+
+        Days are not kept on the generator, only their validation results.
+        Refinement runs on each day before it is yielded, with the iteration
+        limit split evenly across the days.
+
+        Args:
+            start_date (datetime): Start date for the plan (default: today)
+            deadline_ms (float): Optional time budget in milliseconds
+
+        Yields:
+            tuple: ('day', day_plan) for each day, then ('summary', dict) with the
+            weekly summary, target macros, variety stats and timing
+        """
+        started = self._start_generation(deadline_ms)
+
+        if start_date is None:
+            start_date = datetime.now()
+
+        refinement_runs = []
+        for day in range(1, 8):
+            current_date = start_date + timedelta(days=day-1)
+            self.variety_manager.start_day(day)
+
+            day_plan = self._generate_day(day, current_date)
+
+            if self.refiner is not None:
+                stats = self.refiner.refine(
+                    deadline=self.deadline,
+                    day_plans=[day_plan],
+                    max_iterations=max(1, self.refiner.max_iterations // 7)
+                )
+                if self.deadline is not None and stats['stopped_early']:
+                    self.stopped_early = True
+                refinement_runs.append(stats)
+                self._validate_day(day_plan)
+
+            self._deadline_passed()
             self.daily_results.append(day_plan['validation'])
+            yield 'day', day_plan
+
+        refinement_stats = PlanRefiner.combine_stats(refinement_runs) if refinement_runs else None
+        yield 'summary', self._summarize(started, refinement_stats)
+
+    def replan(self, meal_plan, day_number, meal_type=None):
+        """
+        Regenerate one day, or one meal of a day, of an existing plan.
+
+        Variety tracking is rebuilt from the rest of the plan, so the new foods
+        respect the usage limits and day gaps of every other day (earlier and
+        later). The replaced foods are not picked again. Only the affected
+        day is re-validated; the other days keep their validation results.
+
+        Args:
+            meal_plan (list): Day plans as returned by generate()
+            day_number (int): Day to replan
+            meal_type (str): Optional meal to replan; the whole day when omitted
+
+        Returns:
+            dict: Same shape as generate(), with the updated plan
+
+        Raises:
+            ValueError: If the day or meal type is not in the plan
+        """
+        if meal_type is not None and meal_type not in self.MEAL_TYPES:
+            raise ValueError(f"Meal type must be one of {self.MEAL_TYPES}")
+
+        meal_plan = copy.deepcopy(meal_plan)
+        target = next((day_plan for day_plan in meal_plan if day_plan['day'] == day_number), None)
+        if target is None:
+            raise ValueError(f"Day {day_number} is not in the meal plan")
 
-        # Generate weekly summary
+        started = self._start_generation(None)
+        replaced_types = [meal_type] if meal_type is not None else self.MEAL_TYPES
+
+        # Rebuild variety tracking from everything that stays
+        self.variety_manager.reset()
+        for day_plan in meal_plan:
+            for slot_type in self.MEAL_TYPES:
+                if day_plan is target and slot_type in replaced_types:
+                    continue
+                for item in day_plan['meals'].get(slot_type, []):
+                    if item['food_id'] in self.foods_by_id:
+                        self._register_food(item['food_id'], day_plan['day'])
+
+        # Foods deleted from the catalog since the plan was made can't be picked anyway
+        replaced = {
+            item['food_id']
+            for slot_type in replaced_types
+            for item in target['meals'].get(slot_type, [])
+            if item['food_id'] in self.foods_by_id
+        }
+
+        self.variety_manager.start_day(day_number)
+        if meal_type is None:
+            target['meals'] = self._build_day_greedy(day_number, excluded=replaced)
+        else:
+            # The macro deficit starts from the meals that stay
+            self.day_macros = [0.0, 0.0, 0.0, 0.0]
+            for slot_type in self.MEAL_TYPES:
+                if slot_type != meal_type:
+                    for item in target['meals'].get(slot_type, []):
+                        self._track_day_macros(item)
+
+            target['meals'][meal_type] = self._generate_meal(
+                meal_type,
+                self.calorie_target * self.CALORIES_PER_MEAL[meal_type],
+                day_number,
+                excluded=replaced
+            )
+
+        self._validate_day(target)
+        for day_plan in meal_plan:
+            if 'validation' not in day_plan:
+                self._validate_day(day_plan)
+        self.meal_plan = meal_plan
+        self.daily_results = [day_plan['validation'] for day_plan in meal_plan]
+
+        result = {
+            'success': True,
+            'meal_plan': meal_plan,
+            'replanned': {'day': day_number, 'meal_type': meal_type}
+        }
+        result.update(self._summarize(started))
+
+        return result
+
+    def _start_generation(self, deadline_ms):
+        """Reset per-run state and set the deadline; returns the start time."""
+        started = time.monotonic()
+        self.deadline = started + deadline_ms / 1000 if deadline_ms else None
+        self.stopped_early = False
+        self.daily_results = []
+        return started
+
+    def _summarize(self, started, refinement_stats=None):
+        """Weekly summary and run metadata for the days in daily_results."""
         weekly_summary = ConstraintValidator.validate_weekly_plan(
             self.daily_results,
             self.target_macros
         )
 
-        return {
-            'success': True,
-            'meal_plan': self.meal_plan,
+        summary = {
             'weekly_summary': weekly_summary,
             'target_macros': self.target_macros,
-            'variety_stats': self.variety_manager.get_food_usage_summary()
+            'variety_stats': self.variety_manager.get_food_usage_summary(),
+            'stopped_early': self.stopped_early,
+            'elapsed_ms': round((time.monotonic() - started) * 1000, 1)
         }
+        if refinement_stats is not None:
+            summary['refinement'] = refinement_stats
+        if self.seed is not None:
+            summary['seed'] = self.seed
+        if self.scoring != 'calorie':
+            summary['scoring'] = {
+                'mode': self.scoring,
+                'weights': {
+                    'calorie': self.calorie_weight,
+                    'variety': self.variety_weight,
+                    'macro': self.macro_weight
+                }
+            }
+
+        return summary
 
     def _generate_day(self, day_number, date):
         """
-        Generate meals for a single day with post-generation adjustment.
+        Generate meals for a single day with the configured strategy.
 
         Args:
             day_number (int): Day 1-7
@@ -103,12 +419,81 @@ class MealPlanGenerator:
             'meals': {}
         }
 
-        all_meals_items = []
-        meal_attempts = 0
+        meals = None
+        if self.strategy == 'lp':
+            remaining = self._time_remaining()
+            if remaining is None:
+                meals = self.lp_solver.solve_day(day_number)
+            elif remaining > 0:
+                meals = self.lp_solver.solve_day(day_number, time_limit=remaining)
+            else:
+                self.stopped_early = True
+        if meals is None:
+            # Greedy strategy, or the LP found no solution in its time limit
+            meals = self._build_day_greedy(day_number)
+
+        day_meals['meals'] = meals
+        self._validate_day(day_meals)
+
+        return day_meals
+
+    def _validate_day(self, day_meals):
+        """Validate a day's meals and store its totals and validation result."""
+        all_meals_items = [
+            item for meal_type in self.MEAL_TYPES for item in day_meals['meals'][meal_type]
+        ]
+
+        validation = ConstraintValidator.validate_daily_meal(
+            all_meals_items,
+            self.target_macros
+        )
+
+        day_meals['daily_totals'] = validation['totals']
+        day_meals['validation'] = validation
+
+    def _time_remaining(self):
+        """Seconds left before the generate() deadline, or None without one."""
+        if self.deadline is None:
+            return None
+        return self.deadline - time.monotonic()
+
+    def _deadline_passed(self):
+        """Whether the generate() deadline has passed; sets stopped_early if so."""
+        remaining = self._time_remaining()
+        if remaining is not None and remaining <= 0:
+            self.stopped_early = True
+            return True
+        return False
+
+    def _build_day_greedy(self, day_number, excluded=None):
+        """
+        Build a day's meals greedily with post-generation adjustment.
+
+        Retries roll the variety manager back to the start of the day (only
+        this day's registrations are undone) and exclude the foods earlier
+        attempts picked, so each attempt tries different foods. The attempt
+        closest to the calorie target is kept.
+
+        Args:
+            day_number (int): Day 1-7
+            excluded (set): Optional food IDs not to pick in any attempt
+
+        Returns:
+            dict: {meal_type: [meal items]}
+        """
         max_attempts = 3
+        tolerance = 50
+        checkpoint = self.variety_manager.checkpoint()
+        excluded = set(excluded or ())
+        best = None  # (calorie error, attempt, meals, food ids in registration order)
 
         # Keep trying until we get within ±50 kcal tolerance
-        while meal_attempts < max_attempts:
+        for attempt in range(max_attempts):
+            if attempt > 0:
+                self.variety_manager.rollback(checkpoint)
+            self.day_macros = [0.0, 0.0, 0.0, 0.0]
+
+            meals = {}
             all_meals_items = []
 
             # Generate each meal type
@@ -118,58 +503,178 @@ class MealPlanGenerator:
                 meal_items = self._generate_meal(
                     meal_type,
                     meal_calories_target,
-                    day_number
+                    day_number,
+                    excluded=excluded
                 )
                 
-                day_meals['meals'][meal_type] = meal_items
+                meals[meal_type] = meal_items
                 all_meals_items.extend(meal_items)
 
             # Calculate total
             total_calories = sum(item['calories'] for item in all_meals_items)
             
+            # If too high, reduce last item's quantity
+            if total_calories > self.calorie_target + tolerance and all_meals_items:
+                excess = total_calories - self.calorie_target
+                last_item = all_meals_items[-1]
+                
+                # Reduce last item quantity by percentage
+                reduction_factor = 1 - (excess / last_item['calories']) * 0.5
+                reduction_factor = max(0.5, min(1.0, reduction_factor))
+                
+                last_item['quantity'] *= reduction_factor
+                for key in ['calories', 'protein', 'carbs', 'fat', 'fiber', 'sugar']:
+                    last_item[key] *= reduction_factor
+                    last_item[key] = round(last_item[key], 2)
+
+                total_calories = sum(item['calories'] for item in all_meals_items)
+
+            error = abs(total_calories - self.calorie_target)
+            food_ids = [item['food_id'] for item in all_meals_items]
+            if best is None or error < best[0]:
+                best = (error, attempt, meals, food_ids)
+
             # Check if within tolerance (±50 kcal)
-            tolerance = 50
-            if abs(total_calories - self.calorie_target) <= tolerance:
+            if error <= tolerance:
                 # GOOD! Within range
                 break
-            
-            # Not within range - try to adjust
-            if meal_attempts < max_attempts - 1:
-                # If too high, reduce last item's quantity
-                if total_calories > self.calorie_target and all_meals_items:
-                    excess = total_calories - self.calorie_target
-                    last_item = all_meals_items[-1]
-                    
-                    # Reduce last item quantity by percentage
-                    reduction_factor = 1 - (excess / last_item['calories']) * 0.5
-                    reduction_factor = max(0.5, min(1.0, reduction_factor))
-                    
-                    last_item['quantity'] *= reduction_factor
-                    for key in ['calories', 'protein', 'carbs', 'fat', 'fiber', 'sugar']:
-                        last_item[key] *= reduction_factor
-                        last_item[key] = round(last_item[key], 2)
-                
-                # If too low, try regenerating with different foods
-                elif total_calories < self.calorie_target:
-                    # Clear and regenerate
-                    self.variety_manager.reset()
-                    for day in range(1, day_number + 1):
-                        self.variety_manager.start_day(day)
-            
-            meal_attempts += 1
 
-        # Validate the day
-        validation = ConstraintValidator.validate_daily_meal(
-            all_meals_items,
-            self.target_macros
+            # Out of time - keep the best attempt rather than retrying
+            if self._deadline_passed():
+                break
+
+            # Not within range - retry with different foods
+            excluded.update(food_ids)
+
+        _, best_attempt, meals, food_ids = best
+        if best_attempt != attempt:
+            # A later attempt is registered; swap in the best one's foods
+            self.variety_manager.rollback(checkpoint)
+            for food_id in food_ids:
+                self._register_food(food_id, day_number)
+
+        return meals
+
+    def _build_food_arrays(self):
+        """The catalog's float arrays plus this generator's jitter and 'macro' columns."""
+        self.food_arrays = dict(self.catalog.food_arrays)
+        if self.food_jitter is not None:
+            self.food_arrays['jitter'] = np.array(
+                [self.food_jitter[food_id] for food_id in self.food_ids],
+                dtype=np.float64
+            )
+        if self.scoring == 'macro':
+            self.food_arrays.update(self.catalog.macro_arrays())
+
+    def _set_scoring(self, scoring, score_weights):
+        """Validate the scoring mode and weights and store the weights as floats."""
+        if scoring not in self.SCORING_MODES:
+            raise ValueError(f"Scoring must be one of {self.SCORING_MODES}")
+
+        weights = dict(self.SCORE_WEIGHTS[scoring])
+        for key, value in (score_weights or {}).items():
+            if key not in weights:
+                raise ValueError(f"Score weights must be among {list(weights)}")
+            if value < 0:
+                raise ValueError("Score weights must not be negative")
+            weights[key] = float(value)
+        if scoring != 'macro' and weights['macro']:
+            raise ValueError("A macro score weight requires scoring='macro'")
+
+        self.scoring = scoring
+        self.calorie_weight = weights['calorie']
+        self.variety_weight = weights['variety']
+        self.macro_weight = weights['macro']
+
+    def _macro_goal(self, target_for_item):
+        """
+        Macros the next item should supply, from the day's running deficit.
+
+        The item is expected to cover its calorie share of what is left of the
+        day's protein, carbs and fat; misses are measured relative to what a
+        proportionate item would hold, so each macro counts equally.
+
+        Returns:
+            tuple: (target calories, protein, carbs, fat goals, protein, carbs, fat scales)
+        """
+        day_calories, day_protein, day_carbs, day_fat = self.day_macros
+        remaining_day = self.calorie_target - day_calories
+        share = target_for_item / remaining_day if remaining_day > target_for_item else 1.0
+        fraction = target_for_item / self.calorie_target
+
+        target_protein = self.target_macros['protein']
+        target_carbs = self.target_macros['carbs']
+        target_fat = self.target_macros['fat']
+        return (
+            target_for_item,
+            max(0.0, target_protein - day_protein) * share,
+            max(0.0, target_carbs - day_carbs) * share,
+            max(0.0, target_fat - day_fat) * share,
+            max(1.0, target_protein * fraction),
+            max(1.0, target_carbs * fraction),
+            max(1.0, target_fat * fraction)
         )
 
-        day_meals['daily_totals'] = validation['totals']
-        day_meals['validation'] = validation
+    def _macro_fit(self, food_id, macro_goal):
+        """
+        How close a food's portion comes to the macro goal (0-1, higher is better).
 
-        return day_meals
+        Args:
+            food_id (int): Food ID
+            macro_goal (tuple): From _macro_goal
 
-    def _generate_meal(self, meal_type, calories_target, day_number, max_items=2):
+        Returns:
+            float: 1 minus the RMS of the relative protein, carbs and fat misses
+        """
+        grams_per_calorie, min_quantity, max_quantity, protein, carbs, fat = self.macro_vectors[food_id]
+        target, protein_goal, carbs_goal, fat_goal, protein_scale, carbs_scale, fat_scale = macro_goal
+
+        grams = 0.0
+        if grams_per_calorie > 0:
+            grams = max(min_quantity, min(max_quantity, target * grams_per_calorie))
+
+        protein_miss = (protein * grams - protein_goal) / protein_scale
+        carbs_miss = (carbs * grams - carbs_goal) / carbs_scale
+        fat_miss = (fat * grams - fat_goal) / fat_scale
+        rms = math.sqrt((protein_miss * protein_miss + carbs_miss * carbs_miss + fat_miss * fat_miss) / 3)
+        return max(0.0, 1.0 - rms)
+
+    def _macro_fit_array(self, macro_goal, positions):
+        """_macro_fit for the foods at the given food_ids positions at once."""
+        arrays = self.food_arrays
+        target, protein_goal, carbs_goal, fat_goal, protein_scale, carbs_scale, fat_scale = macro_goal
+
+        grams_per_calorie = arrays['grams_per_calorie'][positions]
+        grams = np.clip(
+            target * grams_per_calorie,
+            arrays['min_quantity'][positions],
+            arrays['max_quantity'][positions]
+        )
+        grams = np.where(grams_per_calorie > 0, grams, 0.0)
+
+        protein_miss = (arrays['protein_per_gram'][positions] * grams - protein_goal) / protein_scale
+        carbs_miss = (arrays['carbs_per_gram'][positions] * grams - carbs_goal) / carbs_scale
+        fat_miss = (arrays['fat_per_gram'][positions] * grams - fat_goal) / fat_scale
+        rms = np.sqrt((protein_miss * protein_miss + carbs_miss * carbs_miss + fat_miss * fat_miss) / 3)
+        return np.maximum(0.0, 1.0 - rms)
+
+    def _track_day_macros(self, meal_item):
+        """Add a picked item to the running day totals used by 'macro' scoring."""
+        day_macros = self.day_macros
+        day_macros[0] += meal_item['calories']
+        day_macros[1] += meal_item['protein']
+        day_macros[2] += meal_item['carbs']
+        day_macros[3] += meal_item['fat']
+
+    def _register_food(self, food_id, day_number):
+        """Record a food as used on a day."""
+        self.variety_manager.register_food(food_id, day_number)
+
+    def _unregister_food(self, food_id, day_number):
+        """Remove one recorded use of a food on a day."""
+        self.variety_manager.unregister_food(food_id, day_number)
+
+    def _generate_meal(self, meal_type, calories_target, day_number, max_items=2, excluded=None):
         """
         Generate a single meal using 2 foods to match calorie target.
 
@@ -178,54 +683,38 @@ class MealPlanGenerator:
             calories_target (float): Target calories for this meal
             day_number (int): Current day (1-7)
             max_items (int): Maximum food items per meal
+            excluded (set): Optional food IDs not to pick (e.g. from failed attempts)
 
         Returns:
             list: List of food items for the meal
         """
+        if self.vectorized:
+            return self._generate_meal_vectorized(meal_type, calories_target, day_number, max_items, excluded)
+
         meal_items = []
         remaining_calories = calories_target
         items_added = 0
 
-        # Get available foods (respecting variety constraints)
-        available_food_ids = self.variety_manager.get_available_foods(
-            [f['FoodID'] for f in self.foods_list],
-            day_number
-        )
-
-        # Filter foods that aren't already used in this day
-        used_today = self.variety_manager.get_day_foods(day_number)
-        available_food_ids = [fid for fid in available_food_ids if fid not in used_today]
+        # Foods already used today or passed over in this meal
+        skipped = set(self.variety_manager.get_day_foods(day_number))
+        if excluded:
+            skipped.update(excluded)
 
-        # Filter out ultra-dense foods for snacks (> 6 cal/gram)
-        if meal_type == 'snack':
-            available_food_ids = [
-                fid for fid in available_food_ids
-                if self._get_calorie_density(fid) < 6.0
-            ]
+        def is_candidate(food_id):
+            if food_id in skipped:
+                return False
+            # Filter out ultra-dense foods for snacks (> 6 cal/gram)
+            if meal_type == 'snack' and self._get_calorie_density(food_id) >= 6.0:
+                return False
+            # Respect variety constraints (against later days too, for replans)
+            return self.variety_manager.can_place_food(food_id, day_number)
 
-        if not available_food_ids:
-            return meal_items
+        max_bonus = self.variety_weight + self.macro_weight
+        if self.food_jitter is not None:
+            max_bonus += self.SCORE_JITTER
 
         # Add up to 2 foods to meal
-        while items_added < max_items and remaining_calories > 80 and available_food_ids:
-            # Score all available foods
-            food_scores = []
-            
-            for food_id in available_food_ids:
-                food = next((f for f in self.foods_list if f['FoodID'] == food_id), None)
-                if not food:
-                    continue
-
-                score = self._score_food(food, remaining_calories, day_number)
-                food_scores.append((food_id, food, score))
-
-            if not food_scores:
-                break
-
-            # Sort by score and pick the best food
-            food_scores.sort(key=lambda x: x[2], reverse=True)
-            best_food_id, best_food, _ = food_scores[0]
-
+        while items_added < max_items and remaining_calories > 80:
             # STRICT: Don't exceed remaining calories
             # If this is last item, use all remaining. Otherwise use 50%
             if items_added == max_items - 1:
@@ -233,6 +722,24 @@ class MealPlanGenerator:
             else:
                 target_for_item = remaining_calories * 0.5
 
+            macro_goal = self._macro_goal(target_for_item) if self.scoring == 'macro' else None
+
+            # Only foods scoring near the best can win, so search outwards
+            # from the remaining calories instead of scoring the whole catalog
+            best_food_id = self.candidate_index.best(
+                remaining_calories,
+                is_candidate,
+                lambda food_id: self._score_food(
+                    self.foods_by_id[food_id], remaining_calories, day_number, macro_goal
+                ),
+                calorie_weight=self.calorie_weight,
+                max_bonus=max_bonus
+            )
+            if best_food_id is None:
+                break
+            best_food = self.foods_by_id[best_food_id]
+            skipped.add(best_food_id)
+
             quantity = self._calculate_quantity(best_food, target_for_item)
 
             if quantity > 0:
@@ -240,36 +747,138 @@ class MealPlanGenerator:
                 
                 # CRITICAL: If this item exceeds remaining, skip it
                 if meal_item['calories'] > remaining_calories:
-                    available_food_ids.remove(best_food_id)
                     continue
                 
                 meal_items.append(meal_item)
                 remaining_calories -= meal_item['calories']
                 items_added += 1
+                if macro_goal is not None:
+                    self._track_day_macros(meal_item)
                 
                 # Register food usage
-                self.variety_manager.register_food(best_food_id, day_number)
-                available_food_ids.remove(best_food_id)
+                self._register_food(best_food_id, day_number)
+
+        return meal_items
+
+    def _generate_meal_vectorized(self, meal_type, calories_target, day_number, max_items=2, excluded=None):
+        """
+        Same greedy selection as _generate_meal with NumPy scoring. Variety
+        rules, snack density filter, calorie fit, variety score and argmax
+        are evaluated as arrays over the candidate index's window around the
+        remaining calories, so a pick does not touch the whole catalog.
+        """
+        meal_items = []
+        remaining_calories = calories_target
+        items_added = 0
+
+        variety_manager = self.variety_manager
+        arrays = self.food_arrays
+
+        # Foods not to pick in this meal: the caller's exclusions, then every food tried
+        blocked = np.zeros(len(self.food_ids), dtype=bool)
+        if excluded:
+            positions = variety_manager.positions
+            blocked[[positions[food_id] for food_id in excluded if food_id in positions]] = True
+
+        max_bonus = self.variety_weight + self.macro_weight
+        if self.food_jitter is not None:
+            max_bonus += self.SCORE_JITTER
+
+        def score_positions(positions):
+            # Variety rules against earlier and (for replans) later days; also
+            # excludes foods already used today
+            candidates = variety_manager.placeable_mask(day_number, positions) & ~blocked[positions]
+            # Filter out ultra-dense foods for snacks (> 6 cal/gram)
+            if meal_type == 'snack':
+                candidates &= arrays['calorie_density'][positions] < 6.0
+
+            usage_counts = variety_manager.usage_counts[positions]
+            variety_scores = np.clip(1.0 - usage_counts / variety_manager.max_repetitions, 0, 1)
+            calorie_fit = np.clip(1.0 - np.abs(arrays['calories'][positions] - remaining) / (remaining + 1), 0, 1)
+            scores = (calorie_fit * self.calorie_weight) + (variety_scores * self.variety_weight)
+            if macro_goal is not None:
+                scores += self._macro_fit_array(macro_goal, positions) * self.macro_weight
+            if self.food_jitter is not None:
+                scores += arrays['jitter'][positions]
+            return np.where(candidates, scores, -np.inf)
+
+        while items_added < max_items and remaining_calories > 80:
+            # If this is last item, use all remaining. Otherwise use 50%
+            if items_added == max_items - 1:
+                target_for_item = remaining_calories
             else:
-                available_food_ids.remove(best_food_id)
+                target_for_item = remaining_calories * 0.5
+
+            remaining = float(remaining_calories)
+            macro_goal = self._macro_goal(target_for_item) if self.scoring == 'macro' else None
+
+            # Ties go to the first position, matching the stable sort in _generate_meal
+            best_position = self.candidate_index.best_position(
+                remaining,
+                score_positions,
+                calorie_weight=self.calorie_weight,
+                max_bonus=max_bonus
+            )
+            if best_position is None:
+                break
+            best_food_id = self.food_ids[best_position]
+            best_food = self.foods_by_id[best_food_id]
+            blocked[best_position] = True
+
+            quantity = self._calculate_quantity(best_food, target_for_item)
+            if quantity <= 0:
+                continue
+
+            meal_item = self._create_meal_item(best_food, quantity)
+            if meal_item['calories'] > remaining_calories:
+                continue
+
+            meal_items.append(meal_item)
+            remaining_calories -= meal_item['calories']
+            items_added += 1
+            if macro_goal is not None:
+                self._track_day_macros(meal_item)
+            self._register_food(best_food_id, day_number)
 
         return meal_items
 
+    @staticmethod
+    def _compute_food_stats(food):
+        """
+        Convert a food's Decimal columns to floats once and derive per-gram values.
+
+        Args:
+            food (dict): Food item from database
+
+        Returns:
+            dict: Float nutrition per base quantity, calorie density and per-gram macros
+        """
+        stats = {
+            'quantity': float(food['Quantity']),
+            'calories': float(food['Calories']),
+            'protein': float(food['Protein']),
+            'carbs': float(food['Carbs']),
+            'fat': float(food['Fat']),
+            'fiber': float(food['Fiber']),
+            'sugar': float(food['Sugar'])
+        }
+        
+        quantity = stats['quantity']
+        stats['calorie_density'] = stats['calories'] / quantity if quantity > 0 else 0
+        stats['per_gram'] = {
+            key: (stats[key] / quantity if quantity > 0 else 0)
+            for key in ['calories', 'protein', 'carbs', 'fat', 'fiber', 'sugar']
+        }
+        return stats
+
     def _get_calorie_density(self, food_id):
         """Get calorie density (cal/gram) for a food."""
-        food = next((f for f in self.foods_list if f['FoodID'] == food_id), None)
-        if not food:
-            return 0
-        
-        food_calories = float(food['Calories'])
-        food_quantity = float(food['Quantity'])
-        
-        if food_quantity <= 0:
+        stats = self.food_stats.get(food_id)
+        if not stats:
             return 0
-        
-        return food_calories / food_quantity
+        return stats['calorie_density']
 
-    def _score_food(self, food, remaining_calories, day_number):
+    def _score_food(self, food, remaining_calories, day_number, macro_goal=None):
         """
         Score a food based on how well it fits current needs.
 
@@ -277,12 +886,13 @@ class MealPlanGenerator:
             food (dict): Food item from database
             remaining_calories (float): Remaining calories for meal
             day_number (int): Current day
+            macro_goal (tuple): Optional _macro_goal for the item ('macro' scoring)
 
         Returns:
             float: Score (higher is better)
         """
         # Score 1: Calorie fit (0-1, closer to target is better)
-        food_calories = float(food['Calories'])  # Convert Decimal to float
+        food_calories = self.food_stats[food['FoodID']]['calories']
         remaining = float(remaining_calories)
         calorie_fit = 1.0 - abs(food_calories - remaining) / (remaining + 1)
         calorie_fit = max(0, min(1, calorie_fit))
@@ -294,8 +904,14 @@ class MealPlanGenerator:
             len(self.foods_list)
         )
 
-        # Combined score (60% calorie fit, 40% variety)
-        final_score = (calorie_fit * 0.6) + (variety_score * 0.4)
+        # Combined score (default 60% calorie fit, 40% variety)
+        final_score = (calorie_fit * self.calorie_weight) + (variety_score * self.variety_weight)
+
+        # Score 3: Macro fit against the day's running deficit
+        if macro_goal is not None:
+            final_score += self._macro_fit(food['FoodID'], macro_goal) * self.macro_weight
+        if self.food_jitter is not None:
+            final_score += self.food_jitter[food['FoodID']]
 
         return final_score
 
@@ -311,31 +927,26 @@ class MealPlanGenerator:
         Returns:
             float: Quantity in grams (or unit)
         """
-        food_calories = float(food['Calories'])  # Convert Decimal to float
-        food_quantity = float(food['Quantity'])
+        stats = self.food_stats[food['FoodID']]
+        food_calories = stats['calories']
+        food_quantity = stats['quantity']
         
-        if food_calories <= 0:
+        if food_calories <= 0 or food_quantity <= 0:
             return 0
 
         # Calculate: if food has 579 cal per 100g, and we need 625 cal
         # quantity = (625 / 579) * 100 = 107.95g
         quantity = (target_calories / food_calories) * food_quantity
         
-        # Smart limits:
-        # - For normal foods (< 4 cal/gram): min 20g, max 500g
-        # - For dense foods (>= 4 cal/gram): min 5g, max 100g
-        
-        calories_per_gram = food_calories / food_quantity
-        
-        if calories_per_gram >= 4.0:
-            # Dense food (like oils, nuts, sweets): limit portions
-            quantity = max(5, min(100, quantity))
-        else:
-            # Normal food: standard limits
-            quantity = max(20, min(500, quantity))
+        min_quantity, max_quantity = self._portion_bounds(food['FoodID'])
+        quantity = max(min_quantity, min(max_quantity, quantity))
         
         return round(quantity, 2)
 
+    def _portion_bounds(self, food_id):
+        """Portion limits for a food (see MealPlanCatalog.portion_bounds)."""
+        return self.catalog.portion_bounds(food_id)
+
     def _create_meal_item(self, food, quantity):
         """
         Create a meal item with scaled nutrition values.
@@ -347,8 +958,24 @@ class MealPlanGenerator:
         Returns:
             dict: Meal item with scaled nutrition
         """
-        food_quantity = float(food['Quantity'])
-        scale_factor = quantity / food_quantity
+        return self.build_meal_item(food, quantity, self.food_stats[food['FoodID']])
+
+    @staticmethod
+    def build_meal_item(food, quantity, stats=None):
+        """
+        Create a meal item with scaled nutrition values.
+
+        Args:
+            food (dict): Food item from database
+            quantity (float): Quantity to use
+            stats (dict): Optional precomputed _compute_food_stats(food)
+
+        Returns:
+            dict: Meal item with scaled nutrition
+        """
+        if stats is None:
+            stats = MealPlanGenerator._compute_food_stats(food)
+        scale_factor = quantity / stats['quantity']
 
         return {
             'food_id': food['FoodID'],
@@ -356,15 +983,118 @@ class MealPlanGenerator:
             'brand': food['BrandName'],
             'quantity': round(quantity, 2),
             'unit': food['Unit'],
-            'calories': round(float(food['Calories']) * scale_factor, 2),
-            'protein': round(float(food['Protein']) * scale_factor, 2),
-            'carbs': round(float(food['Carbs']) * scale_factor, 2),
-            'fat': round(float(food['Fat']) * scale_factor, 2),
-            'fiber': round(float(food['Fiber']) * scale_factor, 2),
-            'sugar': round(float(food['Sugar']) * scale_factor, 2)
+            'calories': round(stats['calories'] * scale_factor, 2),
+            'protein': round(stats['protein'] * scale_factor, 2),
+            'carbs': round(stats['carbs'] * scale_factor, 2),
+            'fat': round(stats['fat'] * scale_factor, 2),
+            'fiber': round(stats['fiber'] * scale_factor, 2),
+            'sugar': round(stats['sugar'] * scale_factor, 2)
         }
 
 
+class MealPlanCatalog:
+    """
+    Per-food data MealPlanGenerator derives from a food list: the id index,
+    float stats, NumPy columns and the candidate index.
+
+    Building it is O(catalog) and does not depend on the request, so callers
+    with a cached catalog build it once per catalog version
+    (generation_pool.get_generator_catalog) and pass it to every generator
+    instead of the food list. It is shared across requests and threads and
+    never modified, except that the 'macro' scoring tables are added on
+    first use.
+    """
+
+    def __init__(self, foods_list):
+        """
+        Build the per-food data.
+
+        Args:
+            foods_list (list): List of food dictionaries from database
+        """
+        self.foods_list = foods_list
+        self.foods_by_id = {}
+        self.food_stats = {}
+        for food in foods_list:
+            self.foods_by_id[food['FoodID']] = food
+            self.food_stats[food['FoodID']] = MealPlanGenerator._compute_food_stats(food)
+        self.food_ids = list(self.foods_by_id)
+        self.positions = {food_id: i for i, food_id in enumerate(self.food_ids)}
+
+        self.candidate_index = CandidateIndex(self.food_ids, self.food_stats, self.portion_bounds)
+
+        # Float columns in food_ids order for vectorized scoring
+        self.food_arrays = None
+        if np is not None:
+            self.food_arrays = {
+                field: np.array(
+                    [self.food_stats[food_id][field] for food_id in self.food_ids],
+                    dtype=np.float64
+                )
+                for field in MealPlanGenerator.ARRAY_FIELDS + ['calorie_density']
+            }
+
+        self._macro_vectors = None
+        self._macro_arrays = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.food_ids)
+
+    def portion_bounds(self, food_id):
+        """
+        Portion limits for a food.
+
+        Smart limits:
+        - For normal foods (< 4 cal/gram): min 20g, max 500g
+        - For dense foods (>= 4 cal/gram, like oils, nuts, sweets): min 5g, max 100g
+
+        Returns:
+            tuple: (min_quantity, max_quantity)
+        """
+        if self.food_stats[food_id]['calorie_density'] >= 4.0:
+            return 5, 100
+        return 20, 500
+
+    def macro_vector(self, food_id):
+        """
+        Values 'macro' scoring needs for a food, in MACRO_VECTOR_FIELDS order.
+
+        Grams per calorie give the portion _calculate_quantity would pick for a
+        calorie target before clamping; the per-gram macros give its protein,
+        carbs and fat.
+        """
+        stats = self.food_stats[food_id]
+        min_quantity, max_quantity = self.portion_bounds(food_id)
+        grams_per_calorie = 0.0
+        if stats['calories'] > 0 and stats['quantity'] > 0:
+            grams_per_calorie = stats['quantity'] / stats['calories']
+        per_gram = stats['per_gram']
+        return (
+            grams_per_calorie, float(min_quantity), float(max_quantity),
+            per_gram['protein'], per_gram['carbs'], per_gram['fat']
+        )
+
+    def macro_vectors(self):
+        """{food_id: macro_vector} for every food (pure-Python 'macro' scoring)."""
+        with self._lock:
+            if self._macro_vectors is None:
+                self._macro_vectors = {food_id: self.macro_vector(food_id) for food_id in self.food_ids}
+            return self._macro_vectors
+
+    def macro_arrays(self):
+        """{field: column} of macro_vector in food_ids order (vectorized 'macro' scoring)."""
+        with self._lock:
+            if self._macro_arrays is None:
+                fields = MealPlanGenerator.MACRO_VECTOR_FIELDS
+                columns = np.array(
+                    [self.macro_vector(food_id) for food_id in self.food_ids],
+                    dtype=np.float64
+                ).reshape(-1, len(fields))
+                self._macro_arrays = {field: columns[:, index] for index, field in enumerate(fields)}
+            return self._macro_arrays
+
+
 # Example usage (for testing):
 if __name__ == "__main__":
     # This would be called from views.py with actual food data
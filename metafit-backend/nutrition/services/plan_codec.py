@@ -0,0 +1,97 @@
+# nutrition/services/plan_codec.py
+
+from datetime import timedelta
+from .macro_calculator import MacroCalculator
+from .constraint_validator import ConstraintValidator
+from .meal_plan_generator import MealPlanGenerator
+
+
+class MealPlanCodec:
+    """
+    Converts meal plans to and from their stored form.
+
+    A stored plan is one (day, meal type, position, food ID, quantity) row
+    per item; names and nutrition are rebuilt from the food catalog when the
+    plan is read, so they are never duplicated in storage.
+    """
+
+    @staticmethod
+    def compact(meal_plan):
+        """
+        Flatten a plan into storable item rows.
+
+        Args:
+            meal_plan (list): Day plans as returned by MealPlanGenerator.generate()
+
+        Returns:
+            list: (day, meal_type, position, food_id, quantity) tuples
+        """
+        rows = []
+        for day_plan in meal_plan:
+            for meal_type in MealPlanGenerator.MEAL_TYPES:
+                for position, item in enumerate(day_plan['meals'].get(meal_type, [])):
+                    rows.append((
+                        day_plan['day'],
+                        meal_type,
+                        position,
+                        item['food_id'],
+                        round(float(item['quantity']), 2)
+                    ))
+        return rows
+
+    @staticmethod
+    def expand(rows, get_food, start_date, calorie_target, gender, custom_macros=None, days=7):
+        """
+        Rebuild a full plan (items, daily totals, validation and weekly
+        summary) from stored item rows.
+
+        Args:
+            rows (list): (day, meal_type, position, food_id, quantity) tuples, in order
+            get_food (callable): food_id -> food dict, or None if the food is gone
+            start_date (date): Date of day 1
+            calorie_target (int): Daily calorie target
+            gender (str): 'male' or 'female'
+            custom_macros (dict): Optional custom macro targets
+            days (int): Number of days in the plan
+
+        Returns:
+            dict: meal_plan, weekly_summary, target_macros and missing_food_ids
+                (items whose food is no longer in the catalog are dropped)
+        """
+        target_macros = MacroCalculator.calculate_macros(calorie_target, gender, custom_macros)
+
+        meal_plan = [
+            {
+                'day': day,
+                'date': (start_date + timedelta(days=day - 1)).strftime('%Y-%m-%d'),
+                'meals': {meal_type: [] for meal_type in MealPlanGenerator.MEAL_TYPES}
+            }
+            for day in range(1, days + 1)
+        ]
+
+        missing_food_ids = []
+        for day, meal_type, _, food_id, quantity in rows:
+            food = get_food(food_id)
+            if food is None:
+                missing_food_ids.append(food_id)
+                continue
+            meal_plan[day - 1]['meals'][meal_type].append(
+                MealPlanGenerator.build_meal_item(food, float(quantity))
+            )
+
+        daily_results = []
+        for day_plan in meal_plan:
+            validation = ConstraintValidator.validate_daily_meal(
+                [item for meal_type in MealPlanGenerator.MEAL_TYPES for item in day_plan['meals'][meal_type]],
+                target_macros
+            )
+            day_plan['daily_totals'] = validation['totals']
+            day_plan['validation'] = validation
+            daily_results.append(validation)
+
+        return {
+            'meal_plan': meal_plan,
+            'weekly_summary': ConstraintValidator.validate_weekly_plan(daily_results, target_macros),
+            'target_macros': target_macros,
+            'missing_food_ids': sorted(set(missing_food_ids))
+        }
@@ -0,0 +1,308 @@
+# nutrition/services/plan_refiner.py
+
+import math
+import random
+import time
+
+
+class PlanRefiner:
+    """
+    Local-search pass over a generated meal plan.
+
+    Moves (all respecting VarietyManager rules):
+        - swap: replace one item with another food at the same calories
+        - nudge: scale one item's quantity within its portion bounds
+        - move: move one item to another meal of the same day
+
+    Each move only touches one day, so its effect is scored incrementally
+    from that day's running totals against the MacroCalculator targets;
+    ConstraintValidator runs once per day after refinement, not per move.
+    """
+
+    METHODS = ['hill_climb', 'annealing']
+    NUTRIENTS = ['calories', 'protein', 'carbs', 'fat', 'fiber', 'sugar']
+
+    DEFAULT_ITERATIONS = 2000
+    MAX_ITEMS_PER_MEAL = 2
+    SWAP_SAMPLE_SIZE = 8
+    NUDGE_RANGE = (0.8, 1.2)
+
+    # Annealing temperature, in units of day cost
+    START_TEMPERATURE = 0.05
+    END_TEMPERATURE = 0.0005
+
+    def __init__(self, generator, method='hill_climb', max_iterations=None, time_budget_ms=None, rng=None):
+        """
+        Initialize the refiner for one generator.
+
+        Args:
+            generator (MealPlanGenerator): Owns the plan, catalog stats and variety state
+            method (str): 'hill_climb' (accept only improvements) or 'annealing'
+            max_iterations (int): Maximum moves to try
+            time_budget_ms (float): Optional wall-clock budget in milliseconds
+            rng (random.Random): Random source (default: a fresh one)
+        """
+        if method not in self.METHODS:
+            raise ValueError(f"Refinement must be one of {self.METHODS}")
+
+        self.generator = generator
+        self.weights = generator.OBJECTIVE_WEIGHTS
+        self.method = method
+        self.max_iterations = max_iterations or self.DEFAULT_ITERATIONS
+        self.time_budget_ms = time_budget_ms
+        self.rng = rng or random.Random()
+
+        targets = generator.target_macros
+        self.daily_targets = [
+            max(targets['calorie_target'], 1),
+            max(targets['protein'], 1),
+            max(targets['carbs'], 1),
+            max(targets['fat'], 1)
+        ]
+        self.fiber_min = max(targets['fiber_min'], 1)
+        self.sugar_max = max(targets['sugar_max'], 1)
+        self.meal_targets = {
+            meal_type: max(generator.calorie_target * share, 1)
+            for meal_type, share in generator.CALORIES_PER_MEAL.items()
+        }
+
+        self.days = []
+
+    def refine(self, deadline=None, day_plans=None, max_iterations=None):
+        """
+        Improve generator.meal_plan (or just day_plans) in place.
+
+        Args:
+            deadline (float): Optional time.monotonic() value to stop at
+            day_plans (list): Optional subset of days to refine
+            max_iterations (int): Optional override of the iteration limit
+
+        Returns:
+            dict: Iterations tried, moves accepted, whether the deadline or
+            time budget cut the search short, and cost before/after
+        """
+        started = time.monotonic()
+        if self.time_budget_ms is not None:
+            budget_end = started + self.time_budget_ms / 1000
+            deadline = budget_end if deadline is None else min(deadline, budget_end)
+
+        if day_plans is None:
+            day_plans = self.generator.meal_plan
+        max_iterations = max_iterations or self.max_iterations
+
+        self.days = [self._day_state(day_plan) for day_plan in day_plans]
+        initial_cost = sum(day['cost'] for day in self.days)
+
+        iterations = 0
+        accepted = 0
+        stopped_early = False
+        if self.days:
+            proposals = [self._propose_swap, self._propose_nudge, self._propose_move]
+            for iterations in range(1, max_iterations + 1):
+                if deadline is not None and iterations % 32 == 1 and time.monotonic() >= deadline:
+                    stopped_early = True
+                    break
+
+                day = self.rng.choice(self.days)
+                proposal = self.rng.choice(proposals)(day)
+                if proposal is None:
+                    continue
+
+                delta, apply_move = proposal
+                if self._accept(delta, iterations / max_iterations):
+                    apply_move()
+                    self._refresh_day(day)
+                    accepted += 1
+
+        return {
+            'method': self.method,
+            'iterations': iterations,
+            'accepted_moves': accepted,
+            'stopped_early': stopped_early,
+            'initial_cost': round(initial_cost, 4),
+            'final_cost': round(sum(day['cost'] for day in self.days), 4),
+            'elapsed_ms': round((time.monotonic() - started) * 1000, 1)
+        }
+
+    @staticmethod
+    def combine_stats(stats_list):
+        """Add up the stats of several refine() calls (e.g. one per streamed day)."""
+        combined = dict(stats_list[0])
+        for stats in stats_list[1:]:
+            for key in ['iterations', 'accepted_moves', 'initial_cost', 'final_cost', 'elapsed_ms']:
+                combined[key] += stats[key]
+            combined['stopped_early'] = combined['stopped_early'] or stats['stopped_early']
+        for key in ['initial_cost', 'final_cost']:
+            combined[key] = round(combined[key], 4)
+        combined['elapsed_ms'] = round(combined['elapsed_ms'], 1)
+        return combined
+
+    def _accept(self, delta, progress):
+        """
+        Hill climbing takes improvements only; annealing sometimes takes worse
+        moves, less often as progress (0-1) through the iterations grows.
+        """
+        if delta < 0:
+            return True
+        if self.method != 'annealing':
+            return False
+
+        temperature = self.START_TEMPERATURE * (self.END_TEMPERATURE / self.START_TEMPERATURE) ** progress
+        return self.rng.random() < math.exp(-delta / temperature)
+
+    # ---- Day state and incremental scoring ----
+
+    def _day_state(self, day_plan):
+        """Running totals for one day, used to score moves without re-validating."""
+        day = {'plan': day_plan, 'number': day_plan['day']}
+        self._refresh_day(day)
+        return day
+
+    def _refresh_day(self, day):
+        """Recompute a day's totals from its items after an accepted move."""
+        meals = day['plan']['meals']
+        totals = [0.0] * len(self.NUTRIENTS)
+        meal_calories = {}
+        for meal_type, items in meals.items():
+            meal_calories[meal_type] = sum(item['calories'] for item in items)
+            for item in items:
+                for i, key in enumerate(self.NUTRIENTS):
+                    totals[i] += item[key]
+
+        day['totals'] = totals
+        day['meal_calories'] = meal_calories
+        day['food_ids'] = {item['food_id'] for items in meals.values() for item in items}
+        day['cost'] = self._day_cost(totals, meal_calories)
+
+    def _day_cost(self, totals, meal_calories):
+        """Weighted, target-normalised deviation of one day (lower is better)."""
+        weights = self.weights
+        cost = (
+            weights['calories'] * abs(totals[0] - self.daily_targets[0]) / self.daily_targets[0]
+            + weights['protein'] * abs(totals[1] - self.daily_targets[1]) / self.daily_targets[1]
+            + weights['carbs'] * abs(totals[2] - self.daily_targets[2]) / self.daily_targets[2]
+            + weights['fat'] * abs(totals[3] - self.daily_targets[3]) / self.daily_targets[3]
+            + weights['fiber'] * max(0.0, self.fiber_min - totals[4]) / self.fiber_min
+            + weights['sugar'] * max(0.0, totals[5] - self.sugar_max) / self.sugar_max
+        )
+        for meal_type, calories in meal_calories.items():
+            target = self.meal_targets[meal_type]
+            cost += weights['meal_share'] * abs(calories - target) / target
+        return cost
+
+    def _item_vector(self, item):
+        return [item[key] for key in self.NUTRIENTS]
+
+    def _delta(self, day, meal_type, old_vector, new_vector, to_meal=None):
+        """
+        Cost change of replacing old_vector with new_vector in meal_type
+        (new_vector lands in to_meal when moving between meals).
+        """
+        totals = [t - o + n for t, o, n in zip(day['totals'], old_vector, new_vector)]
+        meal_calories = dict(day['meal_calories'])
+        meal_calories[meal_type] -= old_vector[0]
+        meal_calories[to_meal or meal_type] += new_vector[0]
+        return self._day_cost(totals, meal_calories) - day['cost']
+
+    def _random_item(self, day):
+        """Pick a random (meal_type, index, item) from a day, or None if empty."""
+        meals = [(meal_type, items) for meal_type, items in day['plan']['meals'].items() if items]
+        if not meals:
+            return None
+        meal_type, items = self.rng.choice(meals)
+        index = self.rng.randrange(len(items))
+        return meal_type, index, items[index]
+
+    # ---- Moves ----
+
+    def _propose_swap(self, day):
+        """Replace an item with a sampled food that the variety rules allow on this day."""
+        picked = self._random_item(day)
+        if picked is None:
+            return None
+        meal_type, index, item = picked
+
+        generator = self.generator
+        variety_manager = generator.variety_manager
+        old_vector = self._item_vector(item)
+
+        best = None
+        for _ in range(self.SWAP_SAMPLE_SIZE):
+            food_id = generator.food_ids[self.rng.randrange(len(generator.food_ids))]
+            if food_id in day['food_ids']:
+                continue
+            stats = generator.food_stats[food_id]
+            if stats['calories'] <= 0 or stats['quantity'] <= 0:
+                continue
+            if meal_type == 'snack' and stats['calorie_density'] >= 6.0:
+                continue
+            if not variety_manager.can_place_food(food_id, day['number']):
+                continue
+
+            food = generator.foods_by_id[food_id]
+            new_item = generator._create_meal_item(food, generator._calculate_quantity(food, item['calories']))
+            delta = self._delta(day, meal_type, old_vector, self._item_vector(new_item))
+            if best is None or delta < best[0]:
+                best = (delta, new_item)
+
+        if best is None:
+            return None
+        delta, new_item = best
+
+        def apply_move():
+            generator._unregister_food(item['food_id'], day['number'])
+            generator._register_food(new_item['food_id'], day['number'])
+            day['plan']['meals'][meal_type][index] = new_item
+
+        return delta, apply_move
+
+    def _propose_nudge(self, day):
+        """Scale an item's quantity within its portion bounds."""
+        picked = self._random_item(day)
+        if picked is None:
+            return None
+        meal_type, index, item = picked
+
+        generator = self.generator
+        food_id = item['food_id']
+        min_quantity, max_quantity = generator._portion_bounds(food_id)
+        quantity = item['quantity'] * self.rng.uniform(*self.NUDGE_RANGE)
+        quantity = round(max(min_quantity, min(max_quantity, quantity)), 2)
+        if quantity == item['quantity']:
+            return None
+
+        new_item = generator._create_meal_item(generator.foods_by_id[food_id], quantity)
+        delta = self._delta(day, meal_type, self._item_vector(item), self._item_vector(new_item))
+
+        def apply_move():
+            day['plan']['meals'][meal_type][index] = new_item
+
+        return delta, apply_move
+
+    def _propose_move(self, day):
+        """Move an item to another meal that has room, keeping every meal non-empty."""
+        meals = day['plan']['meals']
+        sources = [meal_type for meal_type, items in meals.items() if len(items) > 1]
+        if not sources:
+            return None
+        source = self.rng.choice(sources)
+        index = self.rng.randrange(len(meals[source]))
+        item = meals[source][index]
+
+        targets = [
+            meal_type for meal_type, items in meals.items()
+            if meal_type != source and len(items) < self.MAX_ITEMS_PER_MEAL
+        ]
+        if self.generator.food_stats[item['food_id']]['calorie_density'] >= 6.0:
+            targets = [meal_type for meal_type in targets if meal_type != 'snack']
+        if not targets:
+            return None
+        target = self.rng.choice(targets)
+
+        vector = self._item_vector(item)
+        delta = self._delta(day, source, vector, vector, to_meal=target)
+
+        def apply_move():
+            meals[target].append(meals[source].pop(index))
+
+        return delta, apply_move
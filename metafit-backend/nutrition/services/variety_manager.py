@@ -1,5 +1,11 @@
 # nutrition/services/variety_manager.py
 
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; only CompactVarietyManager needs it
+    np = None
+
+
 class VarietyManager:
     """
     Manages food variety across 7-day meal plan.
@@ -25,6 +31,9 @@ class VarietyManager:
         
         self.current_day = None
 
+        # Undo log of ('register' | 'unregister', food_id, day) for rollback()
+        self._undo_log = []
+
     def start_day(self, day_number):
         """Mark the start of a new day."""
         self.current_day = day_number
@@ -66,11 +75,84 @@ class VarietyManager:
             food_id (int): ID of the food
             day_number (int): Day number (1-7)
         """
+        self._apply_register(food_id, day_number)
+        self._undo_log.append(('register', food_id, day_number))
+
+    def unregister_food(self, food_id, day_number):
+        """
+        Remove one recorded use of a food on a specific day.
+
+        Args:
+            food_id (int): ID of the food
+            day_number (int): Day number (1-7)
+        """
+        if self._apply_unregister(food_id, day_number):
+            self._undo_log.append(('unregister', food_id, day_number))
+
+    def checkpoint(self):
+        """
+        Mark the current state so rollback() can return to it.
+
+        Returns:
+            int: Checkpoint token
+        """
+        return len(self._undo_log)
+
+    def rollback(self, checkpoint):
+        """
+        Undo every register/unregister made since checkpoint, newest first.
+        Costs O(changes since the checkpoint), not a full reset.
+
+        Args:
+            checkpoint (int): Token from checkpoint()
+        """
+        while len(self._undo_log) > checkpoint:
+            action, food_id, day_number = self._undo_log.pop()
+            if action == 'register':
+                self._apply_unregister(food_id, day_number)
+            else:
+                self._apply_register(food_id, day_number)
+
+    def _apply_register(self, food_id, day_number):
+        """Record one use of a food (no undo log entry)."""
         if food_id not in self.food_usage:
             self.food_usage[food_id] = []
         
         self.food_usage[food_id].append(day_number)
-        self.day_foods[day_number].append(food_id)
+        self.day_foods.setdefault(day_number, []).append(food_id)
+
+    def _apply_unregister(self, food_id, day_number):
+        """Remove one use of a food (no undo log entry); returns True if one was removed."""
+        days = self.food_usage.get(food_id)
+        if not days or day_number not in days:
+            return False
+
+        days.remove(day_number)
+        if not days:
+            del self.food_usage[food_id]
+
+        day_list = self.day_foods.get(day_number)
+        if day_list and food_id in day_list:
+            day_list.remove(food_id)
+        return True
+
+    def can_place_food(self, food_id, day_number):
+        """
+        Check if a food can be added to a day of an already built plan.
+        Unlike can_use_food, the gap is checked against later days too.
+
+        Args:
+            food_id (int): ID of the food
+            day_number (int): Day number (1-7)
+
+        Returns:
+            bool: True if food can be used, False otherwise
+        """
+        days = self.food_usage.get(food_id, [])
+        if len(days) >= self.max_repetitions:
+            return False
+
+        return all(abs(day_number - day) > self.consecutive_day_gap for day in days)
 
     def get_available_foods(self, all_food_ids, day_number):
         """
@@ -90,6 +172,14 @@ class VarietyManager:
         
         return available
 
+    def get_usage_count(self, food_id):
+        """Number of times a food is used in the plan."""
+        return len(self.food_usage.get(food_id, []))
+
+    def get_usage_days(self, food_id):
+        """Sorted days a food is used on."""
+        return sorted(self.food_usage.get(food_id, []))
+
     def get_food_usage_summary(self):
         """
         Get summary of food usage across the plan.
@@ -116,6 +206,7 @@ class VarietyManager:
         self.food_usage = {}
         self.day_foods = {}
         self.current_day = None
+        self._undo_log = []
 
     def to_dict(self):
         """
@@ -145,12 +236,274 @@ class VarietyManager:
         Returns:
             float: Score between 0-1 (1 = most variety-friendly)
         """
-        usage_count = len(variety_manager.food_usage.get(food_id, []))
+        usage_count = variety_manager.get_usage_count(food_id)
         # Normalize: unused foods get 1.0, max-used get 0.0
         score = 1.0 - (usage_count / variety_manager.max_repetitions)
         return max(0, min(1, score))
 
 
+class CompactVarietyManager(VarietyManager):
+    """
+    VarietyManager for a fixed catalog, backed by NumPy arrays.
+
+    Foods are addressed by their dense position in food_ids:
+        - usage_counts[i]: times food i is used
+        - last_used_day[i]: latest day food i is used on (NEVER if unused)
+        - day_masks[i]: bitset of the days food i is used on (bit d = day d)
+        - repeats[(i, d)]: uses of food i on day d beyond the first (sparse;
+          a food is normally used at most once a day)
+
+    Checks are O(1) per food and available_mask() answers "which foods can
+    go on this day" for the whole catalog in one vectorized pass.
+    Foods outside food_ids count as never used.
+    """
+
+    NEVER = -(1 << 30)
+    MAX_DAYS = 62  # days must fit in the int64 bitsets
+
+    def __init__(self, food_ids, max_repetitions=3, consecutive_day_gap=1, positions=None):
+        """
+        Initialize variety manager.
+
+        Args:
+            food_ids (list): All food IDs the plan can use, in array order
+            max_repetitions (int): Maximum times a food can appear in 7 days (default: 3)
+            consecutive_day_gap (int): Minimum days between food appearances (default: 1)
+            positions (dict): Optional prebuilt {food_id: index in food_ids}; read only
+        """
+        if np is None:
+            raise ValueError("CompactVarietyManager requires NumPy")
+
+        self.max_repetitions = max_repetitions
+        self.consecutive_day_gap = consecutive_day_gap
+        self.food_ids = list(food_ids)
+        if positions is None:
+            positions = {food_id: i for i, food_id in enumerate(self.food_ids)}
+        self.positions = positions
+
+        count = len(self.food_ids)
+        self.usage_counts = np.zeros(count, dtype=np.int64)
+        self.last_used_day = np.full(count, self.NEVER, dtype=np.int64)
+        self.day_masks = np.zeros(count, dtype=np.int64)
+        self.repeats = {}
+
+        self.current_day = None
+        self._undo_log = []
+
+    def start_day(self, day_number):
+        """Mark the start of a new day."""
+        self._check_day(day_number)
+        self.current_day = day_number
+
+    def _check_day(self, day_number):
+        """Raise ValueError for days that don't fit the day_masks bitsets."""
+        if not 0 <= day_number <= self.MAX_DAYS:
+            raise ValueError(f"Day number must be between 0 and {self.MAX_DAYS}")
+
+    def can_use_food(self, food_id, day_number):
+        """
+        Check if a food can be used on a given day.
+
+        Args:
+            food_id (int): ID of the food
+            day_number (int): Day number (1-7)
+
+        Returns:
+            bool: True if food can be used, False otherwise
+        """
+        position = self.positions.get(food_id)
+        if position is None:
+            return True
+
+        return bool(
+            self.usage_counts[position] < self.max_repetitions
+            and day_number - self.last_used_day[position] > self.consecutive_day_gap
+        )
+
+    def can_place_food(self, food_id, day_number):
+        """
+        Check if a food can be added to a day of an already built plan.
+        Unlike can_use_food, the gap is checked against later days too.
+
+        Args:
+            food_id (int): ID of the food
+            day_number (int): Day number (1-7)
+
+        Returns:
+            bool: True if food can be used, False otherwise
+        """
+        position = self.positions.get(food_id)
+        if position is None:
+            return True
+        if self.usage_counts[position] >= self.max_repetitions:
+            return False
+
+        return int(self.day_masks[position]) & self._window(day_number) == 0
+
+    def _window(self, day_number):
+        """Bitset of the days within consecutive_day_gap of day_number."""
+        low = max(0, day_number - self.consecutive_day_gap)
+        high = min(self.MAX_DAYS, day_number + self.consecutive_day_gap)
+        return ((1 << (high - low + 1)) - 1) << low
+
+    def _apply_register(self, food_id, day_number):
+        """Record one use of a food (no undo log entry)."""
+        self._check_day(day_number)
+        position = self.positions[food_id]
+        self.usage_counts[position] += 1
+        if int(self.day_masks[position]) & (1 << day_number):
+            key = (position, day_number)
+            self.repeats[key] = self.repeats.get(key, 0) + 1
+        self.day_masks[position] |= 1 << day_number
+        if day_number > self.last_used_day[position]:
+            self.last_used_day[position] = day_number
+
+    def _apply_unregister(self, food_id, day_number):
+        """Remove one use of a food (no undo log entry); returns True if one was removed."""
+        position = self.positions.get(food_id)
+        if position is None:
+            return False
+
+        mask = int(self.day_masks[position])
+        if not mask & (1 << day_number):
+            return False
+
+        self.usage_counts[position] -= 1
+        key = (position, day_number)
+        repeats = self.repeats.get(key)
+        if repeats:
+            # Still used on the day; the bit and last used day stay
+            if repeats == 1:
+                del self.repeats[key]
+            else:
+                self.repeats[key] = repeats - 1
+            return True
+
+        mask &= ~(1 << day_number)
+        self.day_masks[position] = mask
+        self.last_used_day[position] = mask.bit_length() - 1 if mask else self.NEVER
+        return True
+
+    def available_mask(self, day_number):
+        """
+        Boolean array over food_ids: foods usable on day_number that are not
+        already used on it.
+        """
+        return (
+            (self.usage_counts < self.max_repetitions)
+            & (day_number - self.last_used_day > self.consecutive_day_gap)
+            & ((self.day_masks & (1 << day_number)) == 0)
+        )
+
+    def placeable_mask(self, day_number, positions=None):
+        """
+        Boolean array over food_ids (or just the given positions in it):
+        can_place_food for every food, i.e. the gap is checked against later
+        days too (and foods used on the day itself are excluded).
+        """
+        usage_counts = self.usage_counts
+        day_masks = self.day_masks
+        if positions is not None:
+            usage_counts = usage_counts[positions]
+            day_masks = day_masks[positions]
+        return (
+            (usage_counts < self.max_repetitions)
+            & ((day_masks & self._window(day_number)) == 0)
+        )
+
+    def get_available_foods(self, all_food_ids, day_number):
+        """
+        Get list of foods that can be used on a given day.
+
+        Args:
+            all_food_ids (list): All available food IDs from database
+            day_number (int): Day number (1-7)
+
+        Returns:
+            list: Food IDs that can be used without violating variety rules
+        """
+        mask = self.usage_counts < self.max_repetitions
+        mask &= day_number - self.last_used_day > self.consecutive_day_gap
+
+        if all_food_ids is self.food_ids or all_food_ids == self.food_ids:
+            return [self.food_ids[i] for i in np.flatnonzero(mask).tolist()]
+
+        available = []
+        for food_id in all_food_ids:
+            position = self.positions.get(food_id)
+            if position is None or mask[position]:
+                available.append(food_id)
+        return available
+
+    def get_usage_count(self, food_id):
+        """Number of times a food is used in the plan."""
+        position = self.positions.get(food_id)
+        return 0 if position is None else int(self.usage_counts[position])
+
+    def get_usage_days(self, food_id):
+        """Sorted days a food is used on (repeated for each use on a day)."""
+        position = self.positions.get(food_id)
+        if position is None:
+            return []
+        mask = int(self.day_masks[position])
+        return [
+            day
+            for day in range(mask.bit_length()) if mask & (1 << day)
+            for _ in range(1 + self.repeats.get((position, day), 0))
+        ]
+
+    @property
+    def food_usage(self):
+        """{food_id: [days]} snapshot, as in VarietyManager."""
+        return {
+            self.food_ids[i]: self.get_usage_days(self.food_ids[i])
+            for i in np.flatnonzero(self.usage_counts).tolist()
+        }
+
+    @property
+    def day_foods(self):
+        """{day: [food_ids]} snapshot, as in VarietyManager."""
+        days = {}
+        for i in np.flatnonzero(self.day_masks).tolist():
+            for day in self.get_usage_days(self.food_ids[i]):
+                days.setdefault(day, []).append(self.food_ids[i])
+        return days
+
+    def get_food_usage_summary(self):
+        """
+        Get summary of food usage across the plan.
+
+        Returns:
+            dict: {food_id: count, food_id: count, ...}
+        """
+        return {
+            self.food_ids[i]: int(self.usage_counts[i])
+            for i in np.flatnonzero(self.usage_counts).tolist()
+        }
+
+    def get_day_foods(self, day_number):
+        """
+        Get all foods used on a specific day.
+
+        Args:
+            day_number (int): Day number (1-7)
+
+        Returns:
+            list: Food IDs used on that day
+        """
+        used = np.flatnonzero(self.day_masks & (1 << day_number))
+        return [self.food_ids[i] for i in used.tolist()]
+
+    def reset(self):
+        """Reset all tracking data."""
+        self.usage_counts.fill(0)
+        self.last_used_day.fill(self.NEVER)
+        self.day_masks.fill(0)
+        self.repeats = {}
+        self.current_day = None
+        self._undo_log = []
+
+
 # Example usage (for testing):
 if __name__ == "__main__":
     # Initialize
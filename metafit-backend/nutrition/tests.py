@@ -1,3 +1,680 @@
-from django.test import TestCase
+from django.test import SimpleTestCase, override_settings
+from rest_framework.test import APIRequestFactory
+from datetime import date, datetime
+from decimal import Decimal
+from unittest import mock, skipIf
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+import copy
+import json
+import random
+import threading
+import time
 
-# Create your tests here.
+import pymysql
+
+from . import generation_pool
+from .database import (
+    DatabaseManager, DailyNutritionSummaryDatabase, FoodCatalog, FoodDatabase, UserFoodLogDatabase
+)
+from .db_pool import ConnectionPool, PoolTimeoutError
+from .utils import encode_cursor, decode_cursor
+from .plan_store import apply_plan_day
+from .serializers import MealPlanReplanSerializer
+from .views import FoodListView, MealPlanReplanView
+from .services.meal_plan_generator import MealPlanGenerator, MealPlanCatalog
+from .services.constraint_validator import ConstraintValidator
+from .services.lp_solver import milp
+from .services.plan_codec import MealPlanCodec
+from .services.variety_manager import VarietyManager, CompactVarietyManager
+
+
+def make_foods(count, seed=1):
+    """Synthetic allfood rows (per 100 g) for generator tests"""
+    rng = random.Random(seed)
+    foods = []
+    for food_id in range(1, count + 1):
+        protein = rng.uniform(0, 30)
+        carbs = rng.uniform(0, 80)
+        fat = rng.uniform(0, 40)
+        foods.append({
+            'FoodID': food_id,
+            'FoodName': f'Food {food_id}',
+            'BrandName': 'Test',
+            'Unit': 'g',
+            'Quantity': Decimal('100'),
+            'Calories': Decimal(str(round(protein * 4 + carbs * 4 + fat * 9, 2))),
+            'Protein': Decimal(str(round(protein, 2))),
+            'Carbs': Decimal(str(round(carbs, 2))),
+            'Fat': Decimal(str(round(fat, 2))),
+            'Sugar': Decimal(str(round(rng.uniform(0, carbs / 3), 2))),
+            'Fiber': Decimal(str(round(rng.uniform(0, 10), 2)))
+        })
+    return foods
+
+
+class ConnectionPoolTests(SimpleTestCase):
+    def setUp(self):
+        patcher = mock.patch('nutrition.db_pool.pymysql.connect', side_effect=lambda **kwargs: mock.MagicMock())
+        self.connect = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_released_connection_is_reused(self):
+        pool = ConnectionPool({}, max_size=2)
+        with pool.connection() as first:
+            pass
+        with pool.connection() as second:
+            pass
+        self.assertIs(first, second)
+        self.assertEqual(self.connect.call_count, 1)
+
+    def test_nested_use_shares_connection(self):
+        pool = ConnectionPool({}, max_size=1, checkout_timeout=0)
+        with pool.connection() as outer:
+            with pool.connection() as inner:
+                self.assertIs(inner, outer)
+
+    def test_checkout_times_out_at_max_size(self):
+        pool = ConnectionPool({}, max_size=1, checkout_timeout=0.01)
+        conn = pool.acquire()
+        with self.assertRaises(PoolTimeoutError):
+            pool.acquire()
+        pool.release(conn)
+        self.assertEqual(pool.stats()['timeouts'], 1)
+        self.assertIs(pool.acquire(), conn)
+
+    def test_idle_connections_are_reaped_down_to_min_idle(self):
+        pool = ConnectionPool({}, max_size=3, min_idle=1, idle_timeout=0)
+        conns = [pool.acquire() for _ in range(3)]
+        for conn in conns:
+            pool.release(conn)
+        pool.release(pool.acquire())
+        stats = pool.stats()
+        self.assertEqual(stats['reaped'], 2)
+        self.assertEqual(stats['size'], 1)
+        conns[0].close.assert_called_once()
+        conns[1].close.assert_called_once()
+
+    def test_broken_connection_is_discarded(self):
+        pool = ConnectionPool({}, max_size=1)
+        with self.assertRaises(pymysql.err.OperationalError):
+            with pool.connection() as conn:
+                raise pymysql.err.OperationalError(2006, 'gone away')
+        conn.close.assert_called_once()
+        self.assertEqual(pool.stats()['size'], 0)
+        self.assertIsNot(pool.acquire(), conn)
+
+    def test_transaction_rolls_back_on_error(self):
+        pool = ConnectionPool({})
+        with self.assertRaises(ValueError):
+            with pool.transaction() as conn:
+                with pool.transaction() as nested:
+                    self.assertIs(nested, conn)
+                raise ValueError
+        conn.begin.assert_called_once()
+        conn.rollback.assert_called_once()
+        conn.commit.assert_not_called()
+
+
+class BatchInsertTests(SimpleTestCase):
+    QUERY = "INSERT INTO t (A, B) VALUES (%s, %s)"
+
+    def setUp(self):
+        self.cursor = mock.MagicMock(lastrowid=41)
+
+        @contextmanager
+        def fake_cursor():
+            yield self.cursor
+
+        for target, replacement in (('get_cursor', fake_cursor), ('atomic', nullcontext)):
+            patcher = mock.patch(f'nutrition.database.{target}', replacement)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_execute_many_builds_one_multi_row_insert(self):
+        first_id = DatabaseManager.execute_many(self.QUERY, [(1, 'a'), (2, 'b'), (3, 'c')])
+        self.assertEqual(first_id, 41)
+        query, params = self.cursor.execute.call_args.args
+        self.assertEqual(query, "INSERT INTO t (A, B) VALUES (%s, %s), (%s, %s), (%s, %s)")
+        self.assertEqual(params, (1, 'a', 2, 'b', 3, 'c'))
+
+    def test_execute_many_without_rows(self):
+        self.assertIsNone(DatabaseManager.execute_many(self.QUERY, []))
+        self.cursor.execute.assert_not_called()
+
+    def test_execute_many_requires_values(self):
+        with self.assertRaises(ValueError):
+            DatabaseManager.execute_many("UPDATE t SET A = %s", [(1,)])
+
+    def test_create_logs_returns_consecutive_ids(self):
+        logs = [{'UserID': 7, 'FoodID': food_id} for food_id in (3, 4, 5)]
+        with mock.patch.object(DailyNutritionSummaryDatabase, 'apply_logs') as apply_logs:
+            log_ids = UserFoodLogDatabase.create_logs(logs)
+        self.assertEqual(log_ids, [41, 42, 43])
+        apply_logs.assert_called_once_with("ufl.LogID BETWEEN %s AND %s", (41, 43))
+
+    def test_create_logs_without_logs(self):
+        self.assertEqual(UserFoodLogDatabase.create_logs([]), [])
+        self.cursor.execute.assert_not_called()
+
+
+class SummaryRollupTests(SimpleTestCase):
+    def setUp(self):
+        patchers = [
+            mock.patch('nutrition.database.atomic', nullcontext),
+            mock.patch.object(DatabaseManager, 'execute_insert', return_value=9),
+            mock.patch.object(DatabaseManager, 'execute_update', return_value=1),
+            mock.patch.object(FoodDatabase, '_bump_catalog_version'),
+            mock.patch.object(FoodDatabase, '_expire_catalog_version'),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _updates(self):
+        """(statement, params) of each execute_update call; rollup upserts as ('rollup', sign, filter params)"""
+        updates = []
+        for call in DatabaseManager.execute_update.call_args_list:
+            query, params = call.args
+            if 'dailynutritionsummary' in query:
+                self.assertEqual(params[:7], params[-7:])
+                updates.append(('rollup', params[0], params[7:-7]))
+            else:
+                updates.append((query.split()[0], params))
+        return updates
+
+    def test_create_log_adds_delta(self):
+        log_id = UserFoodLogDatabase.create_log({'UserID': 7, 'FoodID': 3})
+        self.assertEqual(log_id, 9)
+        self.assertEqual(self._updates(), [('rollup', 1, (9,))])
+
+    def test_update_log_moves_delta(self):
+        UserFoodLogDatabase.update_log(9, {'FoodID': 4, 'LogDateTime': None})
+        updates = self._updates()
+        self.assertEqual(updates[0], ('rollup', -1, (9,)))
+        self.assertEqual(updates[1][0], 'UPDATE')
+        self.assertEqual(updates[2], ('rollup', 1, (9,)))
+        self.assertEqual(len(updates), 3)
+
+    def test_delete_log_subtracts_delta_first(self):
+        UserFoodLogDatabase.delete_log(9)
+        self.assertEqual(self._updates(), [('rollup', -1, (9,)), ('DELETE', (9,))])
+
+    def test_update_food_rederives_its_logs(self):
+        FoodDatabase.update_food(3, {'FoodName': 'Oats'})
+        updates = self._updates()
+        self.assertEqual(updates[0], ('rollup', -1, (3,)))
+        self.assertEqual(updates[1][0], 'UPDATE')
+        self.assertEqual(updates[2], ('rollup', 1, (3,)))
+        self.assertEqual(len(updates), 3)
+
+    def test_delete_food_subtracts_its_logs(self):
+        FoodDatabase.delete_food(3)
+        self.assertEqual(self._updates(), [('rollup', -1, (3,)), ('DELETE', (3,))])
+
+
+class FoodPaginationTests(SimpleTestCase):
+    """Keyset pagination of the food catalog"""
+
+    def _rows(self, count):
+        return [{'FoodID': food_id, 'FoodName': f'Food {food_id:03d}'} for food_id in range(1, count + 1)]
+
+    def _get(self, params):
+        request = APIRequestFactory().get('/foods/', params)
+        return FoodListView.as_view()(request)
+
+    def test_cursor_round_trip(self):
+        self.assertEqual(decode_cursor(encode_cursor(['Oats, rolled', 42])), ['Oats, rolled', 42])
+
+    def test_next_page_starts_after_cursor(self):
+        with mock.patch('nutrition.database.DatabaseManager.execute_query', return_value=self._rows(3)) as query:
+            foods, next_cursor = FoodDatabase.get_foods_page(limit=2)
+        self.assertEqual([food['FoodID'] for food in foods], [1, 2])
+        self.assertEqual(decode_cursor(next_cursor), ['Food 002', 2])
+        self.assertEqual(query.call_args[0][1], (3,))
+
+        with mock.patch('nutrition.database.DatabaseManager.execute_query', return_value=self._rows(1)) as query:
+            foods, last_cursor = FoodDatabase.get_foods_page(limit=2, cursor=next_cursor)
+        self.assertIsNone(last_cursor)
+        self.assertEqual(query.call_args[0][1], ('Food 002', 'Food 002', 2, 3))
+
+    def test_bad_cursor(self):
+        for values in ([], ['Food', 1, 2], [1, 'Food'], ['Food', '1'], ['Food', True], ['Food', 1.5]):
+            with self.subTest(values=values):
+                with self.assertRaises(ValueError):
+                    FoodDatabase.get_foods_page(cursor=encode_cursor(values))
+        with self.assertRaises(ValueError):
+            FoodDatabase.get_foods_page(cursor='not a cursor!')
+
+    def test_bad_limit(self):
+        with mock.patch('nutrition.database.DatabaseManager.execute_query') as query:
+            for params in ({'cursor': '', 'limit': 0}, {'cursor': '', 'limit': -2}, {'limit': 0},
+                           {'limit': FoodListView.MAX_LIMIT + 1}, {'limit': 'ten'}, {'offset': -1}):
+                with self.subTest(params=params):
+                    self.assertEqual(self._get(params).status_code, 400)
+            query.assert_not_called()
+
+
+class MealPlanReplanTests(SimpleTestCase):
+    """MealPlanGenerator.replan"""
+
+    def setUp(self):
+        self.foods = make_foods(100)
+
+    def _plan(self, vectorized):
+        generator = MealPlanGenerator(self.foods, 2000, 'female', vectorized=vectorized)
+        return generator.generate()['meal_plan']
+
+    def test_replan_with_deleted_food(self):
+        """Plans may reference foods deleted from the catalog since they were made"""
+        for vectorized in (False, True):
+            for meal_type in ('lunch', None):
+                with self.subTest(vectorized=vectorized, meal_type=meal_type):
+                    plan = copy.deepcopy(self._plan(vectorized))
+                    plan[2]['meals']['lunch'][0]['food_id'] = 99999
+                    plan[0]['meals']['dinner'][0]['food_id'] = 99998
+
+                    generator = MealPlanGenerator(self.foods, 2000, 'female', vectorized=vectorized)
+                    result = generator.replan(plan, 3, meal_type)
+
+                    lunch_ids = [item['food_id'] for item in result['meal_plan'][2]['meals']['lunch']]
+                    self.assertTrue(lunch_ids)
+                    self.assertNotIn(99999, lunch_ids)
+
+    def test_replan_with_out_of_range_day(self):
+        """Days that don't fit the compact variety bitsets are a ValueError"""
+        plan = copy.deepcopy(self._plan(True))
+        plan[6]['day'] = 100
+        generator = MealPlanGenerator(self.foods, 2000, 'female', vectorized=True)
+        with self.assertRaises(ValueError):
+            generator.replan(plan, 3)
+
+    def test_serializer_rejects_bad_days(self):
+        plan = json.loads(json.dumps(self._plan(False)))
+        request = {'user_id': 1, 'calorie_target': 2000, 'gender': 'female', 'day': 3}
+
+        self.assertTrue(MealPlanReplanSerializer(data=dict(request, meal_plan=plan)).is_valid())
+
+        for day in (0, 8, 100):
+            with self.subTest(day=day):
+                bad_plan = copy.deepcopy(plan)
+                bad_plan[6]['day'] = day
+                serializer = MealPlanReplanSerializer(data=dict(request, meal_plan=bad_plan))
+                self.assertFalse(serializer.is_valid())
+                self.assertIn('meal_plan', serializer.errors)
+
+        duplicate_plan = copy.deepcopy(plan)
+        duplicate_plan[6]['day'] = 1
+        serializer = MealPlanReplanSerializer(data=dict(request, meal_plan=duplicate_plan))
+        self.assertFalse(serializer.is_valid())
+        self.assertIn('meal_plan', serializer.errors)
+
+
+class MealPlanReplanViewTests(SimpleTestCase):
+    """MealPlanReplanView with a saved plan"""
+
+    def setUp(self):
+        self.catalog = MealPlanCatalog(make_foods(100))
+        self.plan = MealPlanGenerator(self.catalog, 1800, 'male').generate()['meal_plan']
+        self.saved_plan = {
+            'PlanID': 5, 'UserID': 1, 'StartDate': date(2026, 1, 5),
+            'CalorieTarget': 1800, 'Gender': 'male', 'CustomMacros': {'protein': 150.0}
+        }
+
+    def _post(self, data):
+        request = APIRequestFactory().post('/meal-plans/replan/', data, format='json')
+        return MealPlanReplanView.as_view()(request)
+
+    def test_replan_uses_saved_plan_settings(self):
+        with mock.patch('nutrition.views.MealPlanDatabase.get_plan', return_value=self.saved_plan), \
+                mock.patch('nutrition.views.load_meal_plan', return_value={'meal_plan': self.plan}), \
+                mock.patch('nutrition.views.get_generator_catalog', return_value=self.catalog), \
+                mock.patch('nutrition.views.save_meal_plan', return_value=5) as save:
+            response = self._post({'user_id': 1, 'plan_id': 5, 'day': 2})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['target_macros']['calorie_target'], 1800)
+        args, kwargs = save.call_args
+        self.assertEqual(args[2:], (1800, 'male', {'protein': 150.0}))
+        self.assertEqual(kwargs['start_date'], date(2026, 1, 5))
+
+    def test_plan_id_rejects_settings(self):
+        serializer = MealPlanReplanSerializer(data={
+            'user_id': 1, 'plan_id': 5, 'day': 2, 'calorie_target': 2500, 'gender': 'female'
+        })
+        self.assertFalse(serializer.is_valid())
+
+    def test_meal_plan_requires_settings(self):
+        serializer = MealPlanReplanSerializer(data={'user_id': 1, 'day': 2, 'meal_plan': []})
+        self.assertFalse(serializer.is_valid())
+
+
+class CompactVarietyManagerTests(SimpleTestCase):
+    """CompactVarietyManager against VarietyManager"""
+
+    def _managers(self):
+        return VarietyManager(), CompactVarietyManager([1, 2, 3])
+
+    def _assert_same(self, reference, compact, day_number):
+        for food_id in (1, 2, 3):
+            self.assertEqual(compact.get_usage_count(food_id), reference.get_usage_count(food_id))
+            self.assertEqual(compact.get_usage_days(food_id), reference.get_usage_days(food_id))
+            self.assertEqual(compact.can_use_food(food_id, day_number), reference.can_use_food(food_id, day_number))
+            self.assertEqual(compact.can_place_food(food_id, day_number), reference.can_place_food(food_id, day_number))
+
+    def test_duplicate_registration_on_a_day(self):
+        reference, compact = self._managers()
+        for manager in (reference, compact):
+            manager.register_food(1, 1)
+            manager.register_food(1, 1)
+            manager.unregister_food(1, 1)
+
+        self._assert_same(reference, compact, 2)
+        self.assertEqual(compact.get_usage_days(1), [1])
+        self.assertFalse(compact.can_place_food(1, 2))
+        self.assertIn(1, compact.get_day_foods(1))
+
+        for manager in (reference, compact):
+            manager.unregister_food(1, 1)
+        self._assert_same(reference, compact, 2)
+        self.assertEqual(compact.get_day_foods(1), [])
+
+    def test_rollback_duplicates(self):
+        reference, compact = self._managers()
+        for manager in (reference, compact):
+            manager.register_food(2, 3)
+            checkpoint = manager.checkpoint()
+            manager.register_food(2, 3)
+            manager.register_food(2, 3)
+            manager.unregister_food(2, 3)
+            manager.rollback(checkpoint)
+        self._assert_same(reference, compact, 4)
+        self.assertEqual(compact.get_usage_days(2), [3])
+
+
+class MealPlanDeadlineTests(SimpleTestCase):
+    """generate() and iter_generate() with deadline_ms"""
+
+    def setUp(self):
+        self.foods = make_foods(100)
+
+    def test_generate_past_deadline(self):
+        for vectorized in (False, True):
+            with self.subTest(vectorized=vectorized):
+                generator = MealPlanGenerator(self.foods, 2000, 'female', vectorized=vectorized)
+                result = generator.generate(deadline_ms=1e-6)
+                self.assertEqual(len(result['meal_plan']), 7)
+                self.assertTrue(result['stopped_early'])
+
+    def test_iter_generate_past_deadline(self):
+        generator = MealPlanGenerator(self.foods, 2000, 'female')
+        events = list(generator.iter_generate(deadline_ms=1e-6))
+        self.assertEqual([kind for kind, _ in events], ['day'] * 7 + ['summary'])
+        self.assertTrue(events[-1][1]['stopped_early'])
+
+    def test_generate_within_deadline(self):
+        generator = MealPlanGenerator(self.foods, 2000, 'female')
+        self.assertFalse(generator.generate(deadline_ms=60000)['stopped_early'])
+
+
+class MealPlanStrategyTests(SimpleTestCase):
+    def test_lp_requires_vectorized(self):
+        with self.assertRaises(ValueError):
+            MealPlanGenerator(make_foods(20), 2000, 'female', strategy='lp', vectorized=False)
+
+    def test_explicit_vectorized_false_is_kept(self):
+        generator = MealPlanGenerator(make_foods(20), 2000, 'female', vectorized=False)
+        self.assertFalse(generator.vectorized)
+
+    @skipIf(milp is None, 'SciPy is not installed')
+    def test_lp_solves_a_valid_day(self):
+        generator = MealPlanGenerator(make_foods(200), 2000, 'female', strategy='lp')
+        meals = generator.lp_solver.solve_day(1, time_limit=5)
+        self.assertIsNotNone(meals)
+
+        items = [item for meal_type in MealPlanGenerator.MEAL_TYPES for item in meals[meal_type]]
+        food_ids = [item['food_id'] for item in items]
+        self.assertEqual(len(food_ids), len(set(food_ids)))
+        for meal_type in MealPlanGenerator.MEAL_TYPES:
+            self.assertTrue(1 <= len(meals[meal_type]) <= generator.lp_solver.MAX_ITEMS_PER_MEAL)
+        for item in items:
+            min_quantity, max_quantity = generator._portion_bounds(item['food_id'])
+            self.assertTrue(min_quantity - 0.01 <= item['quantity'] <= max_quantity + 0.01)
+        for item in meals['snack']:
+            stats = generator.food_stats[item['food_id']]
+            self.assertLessEqual(stats['calories'] / stats['quantity'], 6)
+        calories = sum(item['calories'] for item in items)
+        self.assertAlmostEqual(calories, 2000, delta=2000 * ConstraintValidator.CALORIE_VARIANCE_TOLERANCE)
+
+
+class PlanRefinerTests(SimpleTestCase):
+    def test_hill_climb_never_raises_cost(self):
+        for seed in (1, 2, 3):
+            with self.subTest(seed=seed):
+                generator = MealPlanGenerator(
+                    make_foods(200, seed=seed), 2000, 'female', seed=seed,
+                    refinement='hill_climb', refinement_iterations=500
+                )
+                refiner = generator.refiner
+                refresh_day = refiner._refresh_day
+                costs = {}
+
+                def checked_refresh(day):
+                    refresh_day(day)
+                    previous = costs.get(day['number'])
+                    if previous is not None:
+                        self.assertLessEqual(day['cost'], previous + 1e-9)
+                    costs[day['number']] = day['cost']
+
+                with mock.patch.object(refiner, '_refresh_day', checked_refresh):
+                    stats = generator.generate()['refinement']
+
+                self.assertGreater(stats['accepted_moves'], 0)
+                self.assertLessEqual(stats['final_cost'], stats['initial_cost'])
+                # Incremental deltas agree with costs recomputed from the final plan
+                recomputed = sum(refiner._day_state(day_plan)['cost'] for day_plan in generator.meal_plan)
+                self.assertAlmostEqual(recomputed, stats['final_cost'], places=3)
+
+
+class MealPlanCodecTests(SimpleTestCase):
+    def setUp(self):
+        self.foods = make_foods(200)
+        self.foods_by_id = {food['FoodID']: food for food in self.foods}
+        self.result = MealPlanGenerator(self.foods, 2000, 'female', seed=2).generate()
+        self.start_date = date.fromisoformat(self.result['meal_plan'][0]['date'])
+
+    def _expand(self, rows, get_food):
+        return MealPlanCodec.expand(rows, get_food, self.start_date, 2000, 'female')
+
+    def test_round_trip(self):
+        rows = MealPlanCodec.compact(self.result['meal_plan'])
+        expanded = self._expand(rows, self.foods_by_id.get)
+
+        self.assertEqual(expanded['missing_food_ids'], [])
+        self.assertEqual(expanded['target_macros'], self.result['target_macros'])
+        for original, rebuilt in zip(self.result['meal_plan'], expanded['meal_plan']):
+            self.assertEqual(rebuilt['day'], original['day'])
+            self.assertEqual(rebuilt['date'], original['date'])
+            self.assertEqual(rebuilt['meals'], original['meals'])
+            self.assertEqual(rebuilt['daily_totals'], original['daily_totals'])
+        self.assertEqual(MealPlanCodec.compact(expanded['meal_plan']), rows)
+
+    def test_missing_foods_are_dropped(self):
+        rows = MealPlanCodec.compact(self.result['meal_plan'])
+        gone = rows[0][3]
+        expanded = self._expand(rows, lambda food_id: None if food_id == gone else self.foods_by_id[food_id])
+
+        self.assertEqual(expanded['missing_food_ids'], [gone])
+        kept = [row for row in rows if row[3] != gone]
+        self.assertEqual(len(MealPlanCodec.compact(expanded['meal_plan'])), len(kept))
+
+
+class ApplyPlanDayTests(SimpleTestCase):
+    def setUp(self):
+        rows = [tuple(food.get(column) for column in FoodCatalog.CATALOG_COLUMNS) for food in make_foods(3)]
+        self.plan = {
+            'UserID': 7,
+            'Days': 7,
+            'StartDate': date(2026, 1, 5),
+            'Items': [
+                (1, 'breakfast', 0, 1, 80.0),
+                (1, 'lunch', 0, 404, 100.0),
+                (1, 'dinner', 0, 2, 120.0),
+                (2, 'breakfast', 0, 3, 50.0),
+            ]
+        }
+        patchers = [
+            mock.patch.object(FoodDatabase, 'get_catalog', return_value=FoodCatalog(1, rows)),
+            mock.patch.object(UserFoodLogDatabase, 'create_logs', return_value=[10, 11]),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_logs_the_day_at_meal_times(self):
+        result = apply_plan_day(self.plan, 1)
+
+        logs = UserFoodLogDatabase.create_logs.call_args.args[0]
+        self.assertEqual(
+            [(log['FoodID'], log['Quantity'], log['MealType'], log['LogDateTime']) for log in logs],
+            [(1, 80.0, 'Breakfast', datetime(2026, 1, 5, 8, 0)), (2, 120.0, 'Dinner', datetime(2026, 1, 5, 19, 0))]
+        )
+        self.assertEqual([log['LogID'] for log in result['logs']], [10, 11])
+        self.assertEqual(result['logs'][0]['FoodName'], 'Food 1')
+        self.assertEqual(result['logs'][1]['UserID'], 7)
+        self.assertEqual(result['log_date'], date(2026, 1, 5))
+        self.assertEqual(result['missing_food_ids'], [404])
+
+    def test_log_datetime_overrides_meal_times(self):
+        log_datetime = datetime(2026, 2, 1, 12, 30)
+        result = apply_plan_day(self.plan, 1, log_datetime)
+
+        logs = UserFoodLogDatabase.create_logs.call_args.args[0]
+        self.assertEqual({log['LogDateTime'] for log in logs}, {log_datetime})
+        self.assertEqual(result['log_date'], date(2026, 2, 1))
+
+    def test_day_outside_plan(self):
+        with self.assertRaises(ValueError):
+            apply_plan_day(self.plan, 8)
+        UserFoodLogDatabase.create_logs.assert_not_called()
+
+
+class MealPlanCatalogTests(SimpleTestCase):
+    """MealPlanCatalog shared across generators"""
+
+    def setUp(self):
+        self.foods = make_foods(200)
+
+    def _food_ids(self, result):
+        return [
+            [item['food_id'] for meal_type in MealPlanGenerator.MEAL_TYPES for item in day_plan['meals'][meal_type]]
+            for day_plan in result['meal_plan']
+        ]
+
+    def test_same_plans_as_food_list(self):
+        catalog = MealPlanCatalog(self.foods)
+        for kwargs in ({'vectorized': False}, {'vectorized': True}, {'seed': 3}, {'scoring': 'macro'}):
+            with self.subTest(**kwargs):
+                expected = MealPlanGenerator(self.foods, 2000, 'female', **kwargs).generate()
+                shared = MealPlanGenerator(catalog, 2000, 'female', **kwargs).generate()
+                self.assertEqual(self._food_ids(shared), self._food_ids(expected))
+
+    def test_generators_leave_catalog_unchanged(self):
+        catalog = MealPlanCatalog(self.foods)
+        fields = set(catalog.food_arrays)
+        MealPlanGenerator(catalog, 2000, 'female', seed=1, scoring='macro').generate()
+        self.assertEqual(set(catalog.food_arrays), fields)
+
+    def test_food_catalog_builds_derived_once(self):
+        food_catalog = FoodCatalog(1, [])
+        builds = []
+        first = food_catalog.derived('key', lambda catalog: builds.append(catalog) or object())
+        second = food_catalog.derived('key', lambda catalog: builds.append(catalog) or object())
+        self.assertIs(first, second)
+        self.assertEqual(builds, [food_catalog])
+
+
+class GenerationPoolTests(SimpleTestCase):
+    def test_worker_skips_expired_run(self):
+        with mock.patch('nutrition.generation_pool.generate_meal_plan') as generate:
+            self.assertIsNone(generation_pool._generate_in_worker({}, 5000, time.time() - 1))
+        generate.assert_not_called()
+
+    def test_worker_deadline_is_remaining_budget(self):
+        with mock.patch('nutrition.generation_pool.generate_meal_plan', return_value={}) as generate:
+            generation_pool._generate_in_worker({}, 5000, time.time() + 1)
+        deadline_ms = generate.call_args.args[1]
+        self.assertLessEqual(deadline_ms, 1000)
+        self.assertGreater(deadline_ms, 0)
+
+    @override_settings(MEAL_PLAN_GENERATION={'PROCESS_POOL_ENABLED': True, 'PROCESS_POOL_TIMEOUT_GRACE_MS': 0})
+    def test_runs_past_the_timeout_are_dropped(self):
+        release = threading.Event()
+        self.addCleanup(release.set)
+
+        def fake_worker(generator_kwargs, deadline_ms, expires_at):
+            if generator_kwargs['seed'] == 2:
+                release.wait()
+            return {'seed': generator_kwargs['seed']}
+
+        executor = ThreadPoolExecutor(max_workers=2)
+        self.addCleanup(executor.shutdown, wait=False)
+        with mock.patch.object(generation_pool, 'get_executor', return_value=executor), \
+                mock.patch.object(generation_pool, '_generate_in_worker', fake_worker):
+            results = generation_pool._run_uncached([{'seed': 1}, {'seed': 2}], deadline_ms=50)
+            self.assertEqual(results, [{'seed': 1}])
+
+            with self.assertRaises(generation_pool.GenerationTimeoutError):
+                generation_pool._run_uncached([{'seed': 2}], deadline_ms=50)
+
+
+@override_settings(MEAL_PLAN_GENERATION={'RESULT_CACHE_SIZE': 4})
+class ResultCacheTests(SimpleTestCase):
+    def setUp(self):
+        patchers = [
+            mock.patch.object(FoodDatabase, 'get_catalog_version', return_value=3),
+            mock.patch('nutrition.utils.local_today', return_value=date(2026, 1, 5)),
+            mock.patch.dict(generation_pool._result_cache, clear=True),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _kwargs(self, **request_data):
+        return generation_pool.build_generator_kwargs(dict({'calorie_target': 2000, 'gender': 'female'}, **request_data))
+
+    def test_equivalent_requests_share_a_key(self):
+        key = generation_pool.result_cache_key(self._kwargs(custom_macros={'protein': 150}))
+        self.assertEqual(key, generation_pool.result_cache_key(self._kwargs(custom_macros={'protein': 150.0})))
+        self.assertEqual(
+            generation_pool.result_cache_key(self._kwargs(gender='Female', custom_macros={})),
+            generation_pool.result_cache_key(self._kwargs())
+        )
+
+    def test_key_covers_version_date_and_starts(self):
+        kwargs = self._kwargs()
+        key = generation_pool.result_cache_key(kwargs)
+        self.assertEqual(key[:2], (3, '2026-01-05'))
+        self.assertNotEqual(key, generation_pool.result_cache_key(kwargs, starts=2))
+        self.assertNotEqual(key, generation_pool.result_cache_key(self._kwargs(seed=1)))
+
+    @override_settings(MEAL_PLAN_GENERATION={'RESULT_CACHE_SIZE': 0})
+    def test_no_key_when_disabled(self):
+        self.assertIsNone(generation_pool.result_cache_key(self._kwargs()))
+
+    def test_finished_plans_are_cached(self):
+        with mock.patch.object(generation_pool, '_run_uncached', return_value=[{'stopped_early': False}]) as run:
+            first = generation_pool.run_generation(self._kwargs())
+            second = generation_pool.run_generation(self._kwargs())
+            generation_pool.run_generation(self._kwargs(), use_cache=False)
+        self.assertEqual(run.call_count, 2)
+        self.assertNotIn('cached', first)
+        self.assertTrue(second['cached'])
+
+    def test_stopped_early_plans_bypass_the_cache(self):
+        with mock.patch.object(generation_pool, '_run_uncached', return_value=[{'stopped_early': True}]) as run:
+            generation_pool.run_generation(self._kwargs())
+            second = generation_pool.run_generation(self._kwargs())
+        self.assertEqual(run.call_count, 2)
+        self.assertNotIn('cached', second)
+        self.assertEqual(generation_pool._result_cache, {})
@@ -2,9 +2,11 @@ from django.urls import path
 from .views import (
     FoodListView, FoodDetailView, FoodSearchView,
     UserFoodLogListView, UserFoodLogDetailView, BulkFoodLogView,
-    DailySummaryView, MealTypeLogsView,
+    DailySummaryView, DailySummaryRangeView, MealTypeLogsView,
     PresetMealListView, PresetMealDetailView,
-    MealPlanGeneratorView  # ADD THIS
+    MealPlanGeneratorView,  # ADD THIS
+    MealPlanJobListView, MealPlanJobDetailView, MealPlanReplanView,
+    SavedMealPlanListView, SavedMealPlanDetailView, SavedMealPlanDayApplyView
 )
 from django.http import JsonResponse
 
@@ -22,9 +24,16 @@ def api_root(request):
             "logs/<int:log_id>/",
             "logs/bulk/",
             "logs/summary/",
+            "logs/summary/range/",
             "logs/meal-type/",
             "presets/",
-            "presets/<int:preset_id>/"
+            "presets/<int:preset_id>/",
+            "meal-plans/jobs/",
+            "meal-plans/jobs/<int:job_id>/",
+            "meal-plans/replan/",
+            "meal-plans/saved/",
+            "meal-plans/saved/<int:plan_id>/",
+            "meal-plans/saved/<int:plan_id>/days/<int:day>/apply/"
         ]
     })
 
@@ -42,6 +51,7 @@ urlpatterns = [
     path('logs/<int:log_id>/', UserFoodLogDetailView.as_view(), name='log-detail'),
     path('logs/bulk/', BulkFoodLogView.as_view(), name='log-bulk'),
     path('logs/summary/', DailySummaryView.as_view(), name='daily-summary'),
+    path('logs/summary/range/', DailySummaryRangeView.as_view(), name='daily-summary-range'),
     path('logs/meal-type/', MealTypeLogsView.as_view(), name='meal-type-logs'),
 
     # Preset meal endpoints
@@ -49,6 +59,13 @@ urlpatterns = [
     path('presets/<int:preset_id>/', PresetMealDetailView.as_view(), name='preset-detail'),
     # Meal Plan endpoints
     path('meal-plans/generate/', MealPlanGeneratorView.as_view(), name='meal-plan-generate'),
+    path('meal-plans/jobs/', MealPlanJobListView.as_view(), name='meal-plan-job-list'),
+    path('meal-plans/jobs/<int:job_id>/', MealPlanJobDetailView.as_view(), name='meal-plan-job-detail'),
+    path('meal-plans/replan/', MealPlanReplanView.as_view(), name='meal-plan-replan'),
+    path('meal-plans/saved/', SavedMealPlanListView.as_view(), name='saved-meal-plan-list'),
+    path('meal-plans/saved/<int:plan_id>/', SavedMealPlanDetailView.as_view(), name='saved-meal-plan-detail'),
+    path('meal-plans/saved/<int:plan_id>/days/<int:day>/apply/', SavedMealPlanDayApplyView.as_view(),
+         name='saved-meal-plan-day-apply'),
 
 
 ]
\ No newline at end of file
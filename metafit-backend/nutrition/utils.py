@@ -3,6 +3,10 @@
 from rest_framework.views import exception_handler
 from rest_framework.response import Response
 from rest_framework import status
+from django.utils import timezone
+from datetime import date, datetime, time, timedelta
+import base64
+import json
 import logging
 
 logger = logging.getLogger(__name__)
@@ -77,4 +81,47 @@ def validate_datetime_format(datetime_string: str) -> bool:
         datetime.strptime(datetime_string, '%Y-%m-%d %H:%M:%S')
         return True
     except ValueError:
-        return False
\ No newline at end of file
+        return False
+
+
+def local_day_bounds(start_date: date, end_date: date = None) -> tuple:
+    """
+    Half-open [start, end) datetime range covering start_date..end_date (inclusive)
+    
+    LogDateTime is stored as naive wall-clock time in settings.TIME_ZONE (Asia/Dhaka),
+    so the bounds are local midnights returned as naive datetimes. Comparing the raw
+    column against them keeps the predicate sargable, unlike DATE(LogDateTime).
+    """
+    end_date = end_date or start_date
+    start = datetime.combine(start_date, time.min)
+    end = datetime.combine(end_date + timedelta(days=1), time.min)
+    return start, end
+
+
+def local_today() -> date:
+    """Current date in settings.TIME_ZONE"""
+    return timezone.localdate()
+
+
+def encode_cursor(values: list) -> str:
+    """Encode keyset pagination values as an opaque URL-safe token"""
+    raw = json.dumps(values, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(token: str) -> list:
+    """
+    Decode a token produced by encode_cursor
+    
+    Raises:
+        ValueError: If the token is malformed
+    """
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {e}")
+    
+    if not isinstance(values, list):
+        raise ValueError("Invalid cursor")
+    return values
@@ -1,19 +1,35 @@
 # nutrition/views.py
 
+from django.conf import settings
+from django.http import StreamingHttpResponse
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
+from rest_framework.utils.encoders import JSONEncoder
 from datetime import datetime, date
+import json
 import logging
 
-from .database import FoodDatabase, UserFoodLogDatabase, PresetMealDatabase
+from .database import (
+    FoodDatabase, UserFoodLogDatabase, PresetMealDatabase, MealPlanJobDatabase, MealPlanDatabase
+)
+from .utils import local_today
 from .serializers import (
     FoodSerializer, FoodSearchSerializer, UserFoodLogSerializer,
     BulkFoodLogSerializer, DailySummarySerializer, PresetMealSerializer,
-    DateRangeSerializer, MealTypeFilterSerializer, PresetWithFoodsSerializer
+    DateRangeSerializer, MealTypeFilterSerializer, PresetWithFoodsSerializer,
+    SummaryRangeSerializer
+)
+from .generation_pool import (
+    run_generation, build_generator_kwargs, get_generator_catalog, GenerationTimeoutError
 )
+from .plan_store import save_meal_plan, load_meal_plan, plan_metadata, apply_plan_day
 from .services.meal_plan_generator import MealPlanGenerator
-from .serializers import MealPlanRequestSerializer, MealPlanResponseSerializer
+from .serializers import (
+    MealPlanRequestSerializer, MealPlanResponseSerializer,
+    DayPlanSerializer, MealPlanSummarySerializer, MealPlanReplanSerializer,
+    SavedMealPlanSerializer, SavedMealPlanQuerySerializer, ApplyPlanDaySerializer
+)
 
 logger = logging.getLogger(__name__)
 
@@ -21,14 +37,35 @@ logger = logging.getLogger(__name__)
 class FoodListView(APIView):
     """
     GET: List all foods with optional search
+         Pass `cursor` (empty for the first page) for keyset pagination
+         instead of limit/offset; responses then include `next_cursor`.
     POST: Create new food
     """
     
+    # Largest page a single request may ask for
+    MAX_LIMIT = 1000
+    
     def get(self, request):
         try:
             search = request.query_params.get('search', '')
             limit = int(request.query_params.get('limit', 100))
+            if not 1 <= limit <= self.MAX_LIMIT:
+                raise ValueError(f"limit must be between 1 and {self.MAX_LIMIT}")
+            
+            if 'cursor' in request.query_params:
+                cursor = request.query_params.get('cursor') or None
+                foods, next_cursor = FoodDatabase.get_foods_page(search, limit, cursor)
+                
+                return Response({
+                    'success': True,
+                    'count': len(foods),
+                    'next_cursor': next_cursor,
+                    'data': foods
+                }, status=status.HTTP_200_OK)
+            
             offset = int(request.query_params.get('offset', 0))
+            if offset < 0:
+                raise ValueError("offset must not be negative")
             
             foods = FoodDatabase.get_all_foods(search, limit, offset)
             
@@ -38,6 +75,11 @@ class FoodListView(APIView):
                 'data': foods
             }, status=status.HTTP_200_OK)
             
+        except ValueError as e:
+            return Response({
+                'success': False,
+                'error': str(e)
+            }, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             logger.error(f"Error fetching foods: {e}")
             return Response({
@@ -83,7 +125,7 @@ class FoodDetailView(APIView):
     
     def get(self, request, food_id):
         try:
-            food = FoodDatabase.get_food_by_id(food_id)
+            food = FoodDatabase.get_cached_food(food_id)
             
             if not food:
                 return Response({
@@ -375,10 +417,8 @@ class BulkFoodLogView(APIView):
                 log_datetime = serializer.validated_data['LogDateTime']
                 foods = serializer.validated_data['foods']
                 
-                created_logs = []
-                
-                for food in foods:
-                    log_data = {
+                logs_data = [
+                    {
                         'UserID': user_id,
                         'FoodID': food['FoodID'],
                         'Quantity': food['Quantity'],
@@ -386,10 +426,12 @@ class BulkFoodLogView(APIView):
                         'MealType': meal_type,
                         'LogDateTime': log_datetime
                     }
-                    
-                    log_id = UserFoodLogDatabase.create_log(log_data)
-                    created_log = UserFoodLogDatabase.get_log_by_id(log_id)
-                    created_logs.append(created_log)
+                    for food in foods
+                ]
+                
+                # One multi-row INSERT plus one SELECT, regardless of item count
+                log_ids = UserFoodLogDatabase.create_logs(logs_data)
+                created_logs = UserFoodLogDatabase.get_logs_by_ids(log_ids)
                 
                 return Response({
                     'success': True,
@@ -418,7 +460,7 @@ class DailySummaryView(APIView):
     def get(self, request):
         try:
             user_id = int(request.query_params.get('user_id'))
-            log_date_str = request.query_params.get('date', datetime.now().strftime('%Y-%m-%d'))
+            log_date_str = request.query_params.get('date', local_today().strftime('%Y-%m-%d'))
             
             log_date = datetime.strptime(log_date_str, '%Y-%m-%d').date()
             
@@ -443,6 +485,44 @@ class DailySummaryView(APIView):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+class DailySummaryRangeView(APIView):
+    """
+    GET: Get per-day nutrition summaries for a date range (zero-filled)
+    """
+    
+    def get(self, request):
+        try:
+            serializer = SummaryRangeSerializer(data=request.query_params)
+            
+            if not serializer.is_valid():
+                return Response({
+                    'success': False,
+                    'errors': serializer.errors
+                }, status=status.HTTP_400_BAD_REQUEST)
+            
+            user_id = serializer.validated_data['user_id']
+            start_date = serializer.validated_data['start_date']
+            end_date = serializer.validated_data['end_date']
+            by_meal_type = serializer.validated_data['by_meal_type']
+            
+            days = UserFoodLogDatabase.get_range_summary(user_id, start_date, end_date, by_meal_type)
+            
+            return Response({
+                'success': True,
+                'start_date': start_date.strftime('%Y-%m-%d'),
+                'end_date': end_date.strftime('%Y-%m-%d'),
+                'count': len(days),
+                'data': days
+            }, status=status.HTTP_200_OK)
+            
+        except Exception as e:
+            logger.error(f"Error fetching summary range: {e}")
+            return Response({
+                'success': False,
+                'error': str(e)
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
 class MealTypeLogsView(APIView):
     """
     GET: Get logs filtered by meal type
@@ -661,8 +741,34 @@ class MealPlanGeneratorView(APIView):
                 "protein": 150,
                 "carbs": 300,
                 "fat": 83
-            }
+            },
+            "strategy": "greedy",   // optional: "greedy" (default) or "lp"
+            "refinement": "none",   // optional: "none" (default), "hill_climb" or "annealing"
+            "refinement_iterations": 2000,   // optional
+            "deadline_ms": 2000,   // optional, capped by MEAL_PLAN_GENERATION['MAX_DEADLINE_MS']
+            "stream": "none",   // optional: "none" (default), "ndjson" or "sse"
+            "seed": 42,   // optional, makes the plan reproducible
+            "starts": 1,   // optional: best of N seeded runs (lowest weekly macro variance)
+            "fresh": false,   // optional: true skips the result cache
+            "scoring": "calorie",   // optional: "calorie" (default) or "macro" (track the daily macro deficit)
+            "score_weights": {"calorie": 0.4, "variety": 0.2, "macro": 0.4},   // optional
+            "save": false   // optional: true also saves the plan (see meal-plans/saved/)
         }
+
+        Identical requests (same inputs, seed, food catalog version and day)
+        are answered from a result cache with "cached": true.
+
+        With "save", the plan is stored as the user's plan for its start date
+        and the response includes its "plan_id".
+
+        When the deadline runs out the best plan found so far is returned
+        with "stopped_early": true.
+
+        With "stream", each day is sent as soon as it is built
+        ({"type": "day", "data": {...}} lines, or SSE "day" events), followed by
+        a "summary" event with the weekly summary, or an "error" event.
+        Streamed plans are generated in the request process, not the pool,
+        as a single start.
         """
         try:
             # Validate request
@@ -676,31 +782,34 @@ class MealPlanGeneratorView(APIView):
 
             validated_data = serializer.validated_data
             user_id = validated_data['user_id']
-            calorie_target = validated_data['calorie_target']
-            gender = validated_data['gender']
-            custom_macros = validated_data.get('custom_macros', None)
 
-            # Fetch all foods from database
-            logger.info(f"Fetching foods from database...")
-            foods = FoodDatabase.get_all_foods('', 1000, 0)
-
-            if not foods:
-                return Response({
-                    'success': False,
-                    'error': 'No foods available in database'
-                }, status=status.HTTP_400_BAD_REQUEST)
+            generation_settings = getattr(settings, 'MEAL_PLAN_GENERATION', {})
+            deadline_ms = min(
+                validated_data.get('deadline_ms', generation_settings.get('DEFAULT_DEADLINE_MS', 5000)),
+                generation_settings.get('MAX_DEADLINE_MS', 30000)
+            )
 
             logger.info(f"Generating meal plan for user {user_id}...")
-            
-            # Generate meal plan
-            generator = MealPlanGenerator(
-                foods_list=foods,
-                calorie_target=calorie_target,
-                gender=gender,
-                custom_macros=custom_macros
+
+            if validated_data.get('stream', 'none') != 'none':
+                return self._stream_response(validated_data, deadline_ms)
+            
+            # Generate meal plan (in the generation process pool when enabled)
+            meal_plan_result = run_generation(
+                build_generator_kwargs(validated_data),
+                deadline_ms=deadline_ms,
+                use_cache=not validated_data.get('fresh', False),
+                starts=validated_data.get('starts', 1)
             )
-            
-            meal_plan_result = generator.generate()
+
+            if validated_data.get('save'):
+                meal_plan_result['plan_id'] = save_meal_plan(
+                    user_id,
+                    meal_plan_result['meal_plan'],
+                    validated_data['calorie_target'],
+                    validated_data['gender'],
+                    validated_data.get('custom_macros')
+                )
 
             # Validate response with serializer
             response_serializer = MealPlanResponseSerializer(data=meal_plan_result)
@@ -726,10 +835,498 @@ class MealPlanGeneratorView(APIView):
                 'error': str(e)
             }, status=status.HTTP_400_BAD_REQUEST)
 
+        except GenerationTimeoutError as e:
+            logger.error(f"Meal plan generation timed out: {str(e)}")
+            return Response({
+                'success': False,
+                'error': 'Meal plan generation timed out'
+            }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+
         except Exception as e:
             logger.error(f"Error generating meal plan: {str(e)}", exc_info=True)
             return Response({
                 'success': False,
                 'error': 'Failed to generate meal plan',
                 'details': str(e)
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    def _stream_response(self, validated_data, deadline_ms):
+        """Stream the plan day by day as NDJSON or Server-Sent Events."""
+        foods = get_generator_catalog()
+
+        if not foods:
+            return Response({
+                'success': False,
+                'error': 'No foods available in database'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        generator = MealPlanGenerator(foods_list=foods, **build_generator_kwargs(validated_data))
+        stream_format = validated_data['stream']
+
+        response = StreamingHttpResponse(
+            self._stream_events(generator, deadline_ms, stream_format),
+            content_type='text/event-stream' if stream_format == 'sse' else 'application/x-ndjson'
+        )
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'  # don't let a proxy hold events back
+        return response
+
+    @staticmethod
+    def _stream_events(generator, deadline_ms, stream_format):
+        """Yield encoded 'day' events, then a 'summary' (or 'error') event."""
+        def encode(event, data):
+            if stream_format == 'sse':
+                return f"event: {event}\ndata: {json.dumps(data, cls=JSONEncoder)}\n\n"
+            return json.dumps({'type': event, 'data': data}, cls=JSONEncoder) + '\n'
+
+        try:
+            for event, data in generator.iter_generate(deadline_ms=deadline_ms):
+                if event == 'day':
+                    serializer = DayPlanSerializer(data=data)
+                else:
+                    serializer = MealPlanSummarySerializer(data=data)
+
+                if not serializer.is_valid():
+                    logger.error(f"Response validation error: {serializer.errors}")
+                    yield encode('error', {
+                        'error': 'Failed to serialize response',
+                        'details': serializer.errors
+                    })
+                    return
+
+                yield encode(event, serializer.data)
+
+        except Exception as e:
+            logger.error(f"Error streaming meal plan: {str(e)}", exc_info=True)
+            yield encode('error', {
+                'error': 'Failed to generate meal plan',
+                'details': str(e)
+            })
+
+
+class MealPlanJobListView(APIView):
+    """
+    Queue meal plan generation instead of running it in the request.
+
+    POST: Enqueue a job (same body as meal-plans/generate/) and return its ID.
+    Jobs are run by `python manage.py run_meal_plan_worker`.
+    """
+
+    def post(self, request):
+        try:
+            serializer = MealPlanRequestSerializer(data=request.data)
+
+            if not serializer.is_valid():
+                return Response({
+                    'success': False,
+                    'errors': serializer.errors
+                }, status=status.HTTP_400_BAD_REQUEST)
+
+            validated_data = dict(serializer.validated_data)
+            job_id = MealPlanJobDatabase.create_job(validated_data['user_id'], validated_data)
+
+            return Response({
+                'success': True,
+                'message': 'Meal plan job queued',
+                'data': {
+                    'job_id': job_id,
+                    'status': MealPlanJobDatabase.STATUS_QUEUED
+                }
+            }, status=status.HTTP_202_ACCEPTED)
+
+        except Exception as e:
+            logger.error(f"Error queueing meal plan job: {e}")
+            return Response({
+                'success': False,
+                'error': str(e)
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class MealPlanJobDetailView(APIView):
+    """
+    GET: Job status and progress (days completed), plus the plan once it has succeeded
+    """
+
+    def get(self, request, job_id):
+        try:
+            job = MealPlanJobDatabase.get_job(job_id)
+
+            if not job:
+                return Response({
+                    'success': False,
+                    'error': 'Job not found'
+                }, status=status.HTTP_404_NOT_FOUND)
+
+            data = {
+                'job_id': job['JobID'],
+                'user_id': job['UserID'],
+                'status': job['Status'],
+                'progress': {
+                    'days_completed': job['DaysCompleted'],
+                    'total_days': job['TotalDays']
+                },
+                'attempts': job['Attempts'],
+                'created_at': job['CreatedAt'],
+                'started_at': job['StartedAt'],
+                'finished_at': job['FinishedAt']
+            }
+            if job['Status'] == MealPlanJobDatabase.STATUS_SUCCEEDED:
+                data['result'] = job['Result']
+            elif job['Status'] == MealPlanJobDatabase.STATUS_FAILED:
+                data['error'] = job['Error']
+
+            return Response({
+                'success': True,
+                'data': data
+            }, status=status.HTTP_200_OK)
+
+        except Exception as e:
+            logger.error(f"Error fetching meal plan job: {e}")
+            return Response({
+                'success': False,
+                'error': str(e)
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class MealPlanReplanView(APIView):
+    """
+    POST: Regenerate one day, or one meal of a day, of an existing plan
+    without regenerating the rest of the week.
+    """
+
+    def post(self, request):
+        """
+        Replan a day or meal.
+
+        Request body: the meal-plans/generate/ settings, plus
+        {
+            "day": 3,
+            "meal_type": "lunch",   // optional: the whole day when omitted
+            "meal_plan": [...],   // the plan's "meal_plan" days, or:
+            "job_id": 12,   // a succeeded meal plan job of this user, or:
+            "plan_id": 5   // a saved plan of this user, which is updated in place
+        }
+
+        With plan_id, calorie_target, gender and custom_macros come from the
+        saved plan and must not be sent.
+
+        The replaced foods are not picked again, and the new ones respect
+        the variety rules against every other day. Only the replanned day
+        is re-validated before the weekly summary is recomputed.
+        """
+        try:
+            serializer = MealPlanReplanSerializer(data=request.data)
+
+            if not serializer.is_valid():
+                return Response({
+                    'success': False,
+                    'errors': serializer.errors
+                }, status=status.HTTP_400_BAD_REQUEST)
+
+            validated_data = dict(serializer.validated_data)
+            user_id = validated_data['user_id']
+
+            if 'job_id' in validated_data:
+                job = MealPlanJobDatabase.get_job(validated_data['job_id'])
+                if not job or job['UserID'] != user_id:
+                    return Response({
+                        'success': False,
+                        'error': 'Job not found'
+                    }, status=status.HTTP_404_NOT_FOUND)
+                if job['Status'] != MealPlanJobDatabase.STATUS_SUCCEEDED:
+                    return Response({
+                        'success': False,
+                        'error': f"Job is {job['Status']}, not {MealPlanJobDatabase.STATUS_SUCCEEDED}"
+                    }, status=status.HTTP_409_CONFLICT)
+                meal_plan = job['Result']['meal_plan']
+            elif 'plan_id' in validated_data:
+                saved_plan = MealPlanDatabase.get_plan(validated_data['plan_id'])
+                if not saved_plan or saved_plan['UserID'] != user_id:
+                    return Response({
+                        'success': False,
+                        'error': 'Meal plan not found'
+                    }, status=status.HTTP_404_NOT_FOUND)
+                meal_plan = load_meal_plan(saved_plan)['meal_plan']
+                validated_data.update(
+                    calorie_target=saved_plan['CalorieTarget'],
+                    gender=saved_plan['Gender'],
+                    custom_macros=saved_plan['CustomMacros']
+                )
+            else:
+                meal_plan = validated_data['meal_plan']
+
+            foods = get_generator_catalog()
+            if not foods:
+                return Response({
+                    'success': False,
+                    'error': 'No foods available in database'
+                }, status=status.HTTP_400_BAD_REQUEST)
+
+            generator = MealPlanGenerator(foods_list=foods, **build_generator_kwargs(validated_data))
+            result = generator.replan(
+                meal_plan,
+                validated_data['day'],
+                meal_type=validated_data.get('meal_type')
+            )
+
+            if 'plan_id' in validated_data:
+                result['plan_id'] = save_meal_plan(
+                    user_id,
+                    result['meal_plan'],
+                    validated_data['calorie_target'],
+                    validated_data['gender'],
+                    validated_data.get('custom_macros'),
+                    start_date=saved_plan['StartDate']
+                )
+
+            response_serializer = MealPlanResponseSerializer(data=result)
+
+            if response_serializer.is_valid():
+                logger.info(f"Meal plan day {validated_data['day']} replanned for user {user_id}")
+                return Response(response_serializer.data, status=status.HTTP_200_OK)
+            else:
+                logger.error(f"Response validation error: {response_serializer.errors}")
+                return Response({
+                    'success': False,
+                    'error': 'Failed to serialize response',
+                    'details': response_serializer.errors
+                }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        except ValueError as e:
+            logger.warning(f"Validation error: {str(e)}")
+            return Response({
+                'success': False,
+                'error': str(e)
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        except Exception as e:
+            logger.error(f"Error replanning meal plan: {str(e)}", exc_info=True)
+            return Response({
+                'success': False,
+                'error': 'Failed to replan meal plan',
+                'details': str(e)
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class SavedMealPlanListView(APIView):
+    """
+    GET: List a user's saved plans (?user_id=, optional start_date, limit, offset)
+    POST: Save a plan as the user's plan for its start date
+    """
+
+    def get(self, request):
+        try:
+            serializer = SavedMealPlanQuerySerializer(data=request.query_params)
+
+            if not serializer.is_valid():
+                return Response({
+                    'success': False,
+                    'errors': serializer.errors
+                }, status=status.HTTP_400_BAD_REQUEST)
+
+            params = serializer.validated_data
+            plans = MealPlanDatabase.get_user_plans(
+                params['user_id'],
+                start_date=params.get('start_date'),
+                limit=params['limit'],
+                offset=params['offset']
+            )
+
+            return Response({
+                'success': True,
+                'count': len(plans),
+                'data': [plan_metadata(plan) for plan in plans]
+            }, status=status.HTTP_200_OK)
+
+        except Exception as e:
+            logger.error(f"Error fetching saved meal plans: {e}")
+            return Response({
+                'success': False,
+                'error': str(e)
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    def post(self, request):
+        """
+        Save a plan.
+
+        Request body:
+        {
+            "user_id": 1,
+            "start_date": "2026-01-05",   // optional: the date of the plan's day 1
+            "calorie_target": 2500,   // with meal_plan
+            "gender": "male",   // with meal_plan
+            "custom_macros": {...},   // optional
+            "meal_plan": [...],   // the plan's "meal_plan" days, or:
+            "job_id": 12   // a succeeded meal plan job of this user
+        }
+
+        Only food IDs and quantities are stored; a plan already saved for the
+        same user and start date is replaced.
+        """
+        try:
+            serializer = SavedMealPlanSerializer(data=request.data)
+
+            if not serializer.is_valid():
+                return Response({
+                    'success': False,
+                    'errors': serializer.errors
+                }, status=status.HTTP_400_BAD_REQUEST)
+
+            validated_data = serializer.validated_data
+            user_id = validated_data['user_id']
+
+            if 'job_id' in validated_data:
+                job = MealPlanJobDatabase.get_job(validated_data['job_id'])
+                if not job or job['UserID'] != user_id:
+                    return Response({
+                        'success': False,
+                        'error': 'Job not found'
+                    }, status=status.HTTP_404_NOT_FOUND)
+                if job['Status'] != MealPlanJobDatabase.STATUS_SUCCEEDED:
+                    return Response({
+                        'success': False,
+                        'error': f"Job is {job['Status']}, not {MealPlanJobDatabase.STATUS_SUCCEEDED}"
+                    }, status=status.HTTP_409_CONFLICT)
+                settings_source = job['Request']
+                meal_plan = job['Result']['meal_plan']
+            else:
+                settings_source = validated_data
+                meal_plan = validated_data['meal_plan']
+
+            plan_id = save_meal_plan(
+                user_id,
+                meal_plan,
+                settings_source['calorie_target'],
+                settings_source['gender'],
+                settings_source.get('custom_macros'),
+                start_date=validated_data.get('start_date')
+            )
+
+            return Response({
+                'success': True,
+                'message': 'Meal plan saved successfully',
+                'data': load_meal_plan(MealPlanDatabase.get_plan(plan_id))
+            }, status=status.HTTP_201_CREATED)
+
+        except ValueError as e:
+            return Response({
+                'success': False,
+                'error': str(e)
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        except Exception as e:
+            logger.error(f"Error saving meal plan: {e}")
+            return Response({
+                'success': False,
+                'error': str(e)
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class SavedMealPlanDetailView(APIView):
+    """
+    GET: A saved plan, rebuilt from the food catalog
+    DELETE: Delete a saved plan
+    """
+
+    def get(self, request, plan_id):
+        try:
+            plan = MealPlanDatabase.get_plan(plan_id)
+
+            if not plan:
+                return Response({
+                    'success': False,
+                    'error': 'Meal plan not found'
+                }, status=status.HTTP_404_NOT_FOUND)
+
+            return Response({
+                'success': True,
+                'data': load_meal_plan(plan)
+            }, status=status.HTTP_200_OK)
+
+        except Exception as e:
+            logger.error(f"Error fetching saved meal plan: {e}")
+            return Response({
+                'success': False,
+                'error': str(e)
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    def delete(self, request, plan_id):
+        try:
+            rows_affected = MealPlanDatabase.delete_plan(plan_id)
+
+            if rows_affected == 0:
+                return Response({
+                    'success': False,
+                    'error': 'Meal plan not found'
+                }, status=status.HTTP_404_NOT_FOUND)
+
+            return Response({
+                'success': True,
+                'message': 'Meal plan deleted successfully'
+            }, status=status.HTTP_200_OK)
+
+        except Exception as e:
+            logger.error(f"Error deleting saved meal plan: {e}")
+            return Response({
+                'success': False,
+                'error': str(e)
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class SavedMealPlanDayApplyView(APIView):
+    """
+    POST: Log every item of one day of a saved plan to the food log
+    """
+
+    def post(self, request, plan_id, day):
+        """
+        Apply a plan day.
+
+        Request body:
+        {
+            "user_id": 1,
+            "log_datetime": "2026-01-05T12:00:00"   // optional: by default each meal is
+                                                     // logged at its usual time on the plan day
+        }
+
+        All items are inserted with one multi-row INSERT in one transaction,
+        together with the daily summary update. Returns the created logs and
+        the day's updated summary.
+        """
+        try:
+            serializer = ApplyPlanDaySerializer(data=request.data)
+
+            if not serializer.is_valid():
+                return Response({
+                    'success': False,
+                    'errors': serializer.errors
+                }, status=status.HTTP_400_BAD_REQUEST)
+
+            plan = MealPlanDatabase.get_plan(plan_id)
+            if not plan or plan['UserID'] != serializer.validated_data['user_id']:
+                return Response({
+                    'success': False,
+                    'error': 'Meal plan not found'
+                }, status=status.HTTP_404_NOT_FOUND)
+
+            applied = apply_plan_day(plan, day, serializer.validated_data.get('log_datetime'))
+            applied['daily_summary'] = UserFoodLogDatabase.get_daily_summary(plan['UserID'], applied['log_date'])
+
+            return Response({
+                'success': True,
+                'message': f"{len(applied['logs'])} food logs created successfully",
+                'data': applied
+            }, status=status.HTTP_201_CREATED)
+
+        except ValueError as e:
+            return Response({
+                'success': False,
+                'error': str(e)
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        except Exception as e:
+            logger.error(f"Error applying meal plan day: {e}")
+            return Response({
+                'success': False,
+                'error': str(e)
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
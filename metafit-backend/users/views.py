@@ -4,12 +4,13 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from django.contrib.auth.hashers import make_password, check_password
-from django.db import connection
 import hashlib
 import logging
 from django.contrib.auth.hashers import check_password
 import re
 
+from nutrition.db_pool import get_cursor
+
 logger = logging.getLogger(__name__)
 
 
@@ -20,7 +21,7 @@ class DatabaseHelper:
     def execute_query(query, params=None, fetch_one=False):
         """Execute SELECT query"""
         try:
-            with connection.cursor() as cursor:
+            with get_cursor() as cursor:
                 cursor.execute(query, params or ())
                 if fetch_one:
                     result = cursor.fetchone()
@@ -42,7 +43,7 @@ class DatabaseHelper:
     def execute_update(query, params=None):
         """Execute INSERT, UPDATE, DELETE"""
         try:
-            with connection.cursor() as cursor:
+            with get_cursor() as cursor:
                 cursor.execute(query, params or ())
                 return cursor.rowcount
         except Exception as e:
@@ -54,7 +55,7 @@ class DatabaseHelper:
     def execute_insert(query, params=None):
         """Execute INSERT and return last ID"""
         try:
-            with connection.cursor() as cursor:
+            with get_cursor() as cursor:
                 cursor.execute(query, params or ())
                 return cursor.lastrowid
         except Exception as e:
@@ -236,7 +237,7 @@ class RegisterView(APIView):
                 SELECT UserID FROM userdetails 
                 WHERE LOWER(Username) = LOWER(%s) OR LOWER(Email) = LOWER(%s)
             """
-            with connection.cursor() as cursor:
+            with get_cursor() as cursor:
                 cursor.execute(check_query, (username, email))
                 result = cursor.fetchone()
             
@@ -251,7 +252,7 @@ class RegisterView(APIView):
             
             # ========== BEGIN TRANSACTION: INSERT USER DATA ==========
             try:
-                with connection.cursor() as cursor:
+                with get_cursor() as cursor:
                     # Step 1: Insert into userdetails
                     insert_user_query = """
                         INSERT INTO userdetails 
@@ -290,7 +291,7 @@ class RegisterView(APIView):
                         'Initial weight entry during signup'
                     ))
                     
-                    # Commit is automatic with connection.cursor() context manager
+                    # Commit is automatic (autocommit connection)
                 
                 # ========== FETCH COMPLETE DATA ==========
                 fetch_query = """
@@ -311,7 +312,7 @@ class RegisterView(APIView):
                     WHERE ud.UserID = %s
                 """
                 
-                with connection.cursor() as cursor:
+                with get_cursor() as cursor:
                     cursor.execute(fetch_query, (user_id,))
                     result = cursor.fetchone()
                     
@@ -422,7 +423,7 @@ class CheckUsernameView(APIView):
             
             # Check if username exists in database (case-insensitive)
             query = "SELECT UserID FROM userdetails WHERE LOWER(Username) = LOWER(%s) LIMIT 1"
-            with connection.cursor() as cursor:
+            with get_cursor() as cursor:
                 cursor.execute(query, (username,))
                 result = cursor.fetchone()
             
@@ -484,7 +485,7 @@ class CheckEmailView(APIView):
             
             # Check if email exists in database (case-insensitive)
             query = "SELECT UserID FROM userdetails WHERE LOWER(Email) = LOWER(%s) LIMIT 1"
-            with connection.cursor() as cursor:
+            with get_cursor() as cursor:
                 cursor.execute(query, (email,))
                 result = cursor.fetchone()
             
@@ -1074,7 +1075,7 @@ class UserProfileView(APIView):
                 FROM userdetails
                 WHERE UserID = %s
             """
-            with connection.cursor() as cursor:
+            with get_cursor() as cursor:
                 cursor.execute(user_query, (user_id,))
                 user_result = cursor.fetchone()
                 
@@ -1094,7 +1095,7 @@ class UserProfileView(APIView):
                 FROM userphysicalinfo
                 WHERE UserID = %s
             """
-            with connection.cursor() as cursor:
+            with get_cursor() as cursor:
                 cursor.execute(physical_query, (user_id,))
                 physical_result = cursor.fetchone()
                 
@@ -1115,7 +1116,7 @@ class UserProfileView(APIView):
                 ORDER BY DateTime DESC
                 LIMIT 1
             """
-            with connection.cursor() as cursor:
+            with get_cursor() as cursor:
                 cursor.execute(weight_query, (user_id,))
                 weight_result = cursor.fetchone()
                 